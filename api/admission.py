@@ -0,0 +1,182 @@
+# Standard Library
+import fcntl
+import functools
+import logging
+import math
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# Third Parties
+from rest_framework.exceptions import Throttled
+
+logger = logging.getLogger("main_logger")
+
+
+class MmapLeaseTable:
+    """Leases of in-flight work kept in a memory-mapped file shared by the
+    workers of a host.
+
+    The file is a fixed table of `(lease id, cost, expires_at)` slots, a
+    lease takes an empty or expired slot & gives it back when released.
+    Expired leases stop counting on their own, so work leaked by a killed
+    worker never holds capacity for longer than its lease. The table is
+    locked with `fcntl` across processes & with a thread lock within a
+    process.
+    """
+
+    SLOT = struct.Struct("<Qqd")
+
+    def __init__(self, path: str, slots: int) -> None:
+        self.path = path
+        self.slots = max(1, slots)
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+        self._memory: mmap.mmap | None = None
+
+    def _open(self) -> None:
+        size = self.slots * self.SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._memory = mmap.mmap(fd, size)
+        self._fd = fd
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if self._memory is None:
+                self._open()
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _iter_slots(self) -> Iterator[tuple[int, int, int, float]]:
+        for index in range(self.slots):
+            offset = index * self.SLOT.size
+            yield (offset, *self.SLOT.unpack_from(self._memory, offset))
+
+    def _get_usage(self, now: float) -> tuple[int, int | None]:
+        """Return the cost of the live leases & the offset of a free slot."""
+        inflight, free_offset = 0, None
+        for offset, lease_id, cost, expires_at in self._iter_slots():
+            if lease_id and expires_at > now:
+                inflight += cost
+            elif free_offset is None:
+                free_offset = offset
+        return inflight, free_offset
+
+    def acquire(self, cost: int, capacity: int, ttl: float) -> tuple[int | None, int]:
+        """Lease `cost` while the live leases fit `capacity`, a lease is
+        always granted when there are none.
+
+        Returns:
+            tuple[int | None, int]: The lease ID, None when denied & the cost
+                of the live leases including this one
+        """
+        # 0 marks empty slots
+        lease_id = secrets.randbits(64) or 1
+        with self._locked():
+            now = time.time()
+            inflight, free_offset = self._get_usage(now)
+            if free_offset is None or (inflight and inflight + cost > capacity):
+                return None, inflight + cost
+            self.SLOT.pack_into(self._memory, free_offset, lease_id, cost, now + ttl)
+        return lease_id, inflight + cost
+
+    def release(self, lease_id: int) -> None:
+        """Give back the slot of the lease, unless it expired & was taken by
+        another lease since."""
+        with self._locked():
+            for offset, slot_lease_id, _, _ in self._iter_slots():
+                if slot_lease_id == lease_id:
+                    self.SLOT.pack_into(self._memory, offset, 0, 0, 0.0)
+                    return
+
+    def get_inflight(self) -> int:
+        with self._locked():
+            return self._get_usage(time.time())[0]
+
+    def clear(self) -> None:
+        with self._locked():
+            self._memory[:] = bytes(len(self._memory))
+
+
+@functools.lru_cache(maxsize=None)
+def get_lease_table(path: str, slots: int) -> MmapLeaseTable:
+    return MmapLeaseTable(path, slots)
+
+
+class EncodeAdmissionController:
+    """Admit encode work while the in-flight pixels of all workers of the
+    host fit the configured capacity, otherwise shed the request with 429.
+
+    Each admitted request holds a lease of its pixels in the memory-mapped
+    `ENCODE_ADMISSION_MMAP_PATH` table shared by the workers, a lease
+    expires after `ENCODE_ADMISSION_LEASE_TTL` seconds so work leaked by a
+    killed worker can't block admission forever.
+
+    Usage:
+        with EncodeAdmissionController(cost=width * height):
+            ...
+    """
+
+    THROUGHPUT_KEY = "admission:encode:pixels_per_second"
+
+    def __init__(self, cost: int) -> None:
+        # An image bigger than the whole capacity is still admitted when the workers are idle
+        self.cost = max(1, min(cost, settings.ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS))
+        self.lease_id: int | None = None
+        self.started_at: float | None = None
+
+    @staticmethod
+    def get_leases() -> MmapLeaseTable:
+        return get_lease_table(settings.ENCODE_ADMISSION_MMAP_PATH, settings.ENCODE_ADMISSION_MMAP_SLOTS)
+
+    @classmethod
+    def get_inflight_pixels(cls) -> int:
+        """Pixels being encoded by all the workers of the host."""
+        return cls.get_leases().get_inflight()
+
+    def _retry_after(self, excess_pixels: int) -> int:
+        """Estimate seconds until `excess_pixels` of in-flight work drain
+        based on the observed encoding throughput."""
+        throughput = cache.get(self.THROUGHPUT_KEY) or settings.ENCODE_ADMISSION_INITIAL_THROUGHPUT
+        retry_after = math.ceil(excess_pixels / throughput)
+        return min(max(retry_after, 1), settings.ENCODE_ADMISSION_MAX_RETRY_AFTER)
+
+    def _record_throughput(self, elapsed: float) -> None:
+        if elapsed <= 0:
+            return
+        previous = cache.get(self.THROUGHPUT_KEY) or settings.ENCODE_ADMISSION_INITIAL_THROUGHPUT
+        current = self.cost / elapsed
+        # Exponentially weighted average, races between workers only skew the estimate slightly
+        cache.set(self.THROUGHPUT_KEY, 0.8 * previous + 0.2 * current, timeout=None)
+
+    def __enter__(self) -> "EncodeAdmissionController":
+        capacity = settings.ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS
+        self.lease_id, inflight = self.get_leases().acquire(
+            self.cost, capacity, ttl=settings.ENCODE_ADMISSION_LEASE_TTL
+        )
+        if self.lease_id is None:
+            retry_after = self._retry_after(inflight - capacity)
+            logger.warning(f"Encoding capacity is full ({inflight}/{capacity} pixels), shedding request...")
+            raise Throttled(wait=retry_after, detail="Encoding capacity is full.")
+        self.started_at = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.get_leases().release(self.lease_id)
+        if exc_type is None and self.started_at is not None:
+            self._record_throughput(time.monotonic() - self.started_at)
@@ -1,7 +1,14 @@
 # Django
 from django.apps import AppConfig
+from django.core import checks
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self) -> None:
+        # Face Embeddings
+        from api.checks import check_shared_caches
+
+        checks.register(check_shared_caches)
@@ -1,19 +1,43 @@
 # Third Parties
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from rest_framework_api_key.models import APIKey
+from rest_framework.permissions import BasePermission
+from rest_framework_api_key.models import AbstractAPIKey, APIKey
+
+# Face Embeddings
+from face_images.models import Gallery, GalleryAPIKey
 
 
 class ApiKeyAuthentication(BaseAuthentication):
+    """Authenticate global API keys & API keys scoped to a gallery, the
+    matching key is set as `request.auth`."""
+
+    API_KEY_MODELS = (APIKey, GalleryAPIKey)
+
     def authenticate(self, request):
         api_key = request.META.get("HTTP_AUTHORIZATION")
 
         if not api_key:
             return None
 
-        try:
-            APIKey.objects.get_from_key(api_key.split()[1])
-        except APIKey.DoesNotExist:
-            raise AuthenticationFailed("Invalid API key.")
+        for api_key_model in self.API_KEY_MODELS:
+            try:
+                return (None, api_key_model.objects.get_from_key(api_key.split()[1]))
+            except api_key_model.DoesNotExist:
+                continue
+
+        raise AuthenticationFailed("Invalid API key.")
+
+
+class HasAnyAPIKey(BasePermission):
+    """Allow requests authenticated by a non expired global or gallery API
+    key, reusing the key looked up by `ApiKeyAuthentication`."""
+
+    def has_permission(self, request, view):
+        return isinstance(request.auth, AbstractAPIKey) and not request.auth.has_expired
+
 
-        return (None, None)
+def get_request_gallery(request) -> Gallery | None:
+    """Return the gallery the request's API key is scoped to, None for
+    global API keys."""
+    return getattr(request.auth, "gallery", None)
@@ -0,0 +1,32 @@
+# Django
+from django.conf import settings
+from django.core.checks import Error
+
+# Caches only the process using them sees
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# Settings naming a cache every worker must share
+SHARED_CACHE_SETTINGS = ("IDEMPOTENCY_CACHE", "MEMORY_WATCHDOG_CACHE")
+
+
+def check_shared_caches(app_configs, **kwargs) -> list[Error]:
+    """Fail startup when state every worker must see is kept in a
+    process-local cache."""
+    errors = []
+    for setting_name in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, setting_name)
+        backend = settings.CACHES.get(alias, {}).get("BACKEND")
+        if backend is None:
+            errors.append(Error(f"`{setting_name}` names an unknown cache `{alias}`.", id="api.E001"))
+        elif backend in PROCESS_LOCAL_CACHE_BACKENDS:
+            errors.append(
+                Error(
+                    f"`{setting_name}` cache `{alias}` is process-local, other workers can't see its state.",
+                    hint="Point it at a cache shared by every worker, e.g. `dbcache://` or `rediscache://`.",
+                    id="api.E001",
+                )
+            )
+    return errors
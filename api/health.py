@@ -0,0 +1,115 @@
+# Standard Library
+import logging
+import os
+import threading
+import time
+
+# Django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+
+# Face Embeddings
+from api.admission import EncodeAdmissionController
+
+logger = logging.getLogger("main_logger")
+
+
+class HealthProbe:
+    """Keep the readiness of the service components fresh from a background
+    thread, so probes only read the latest results and never wait for I/O.
+
+    Gunicorn workers refresh the results & start the thread before serving
+    requests (`post_worker_init` in `config/gunicorn.conf.py`), other
+    servers start it lazily with the first probe. Results older than `HEALTH_PROBE_STALE_AFTER` seconds count as not
+    ready, which covers a stuck or dead refresh thread.
+    """
+
+    _lock = threading.Lock()
+    _thread: threading.Thread | None = None
+    _components: dict = {}
+    _refreshed_at: float | None = None
+
+    @staticmethod
+    def _check_db() -> dict:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+        except Exception:
+            # Reconnect on the next refresh
+            connection.close()
+            raise
+        return {}
+
+    @staticmethod
+    def _check_storage() -> dict:
+        probe_path = os.path.join(settings.MEDIA_ROOT, ".health", f"probe-{os.getpid()}")
+        default_storage.save(probe_path, ContentFile(b"ok"))
+        default_storage.delete(probe_path)
+        return {}
+
+    @staticmethod
+    def _check_models() -> dict:
+        # Third Parties
+        import face_recognition
+
+        if face_recognition.api.face_encoder is None or face_recognition.api.face_detector is None:
+            raise RuntimeError("Face recognition models aren't loaded.")
+        return {}
+
+    @staticmethod
+    def _check_encode_queue() -> dict:
+        inflight_pixels = EncodeAdmissionController.get_inflight_pixels()
+        capacity = settings.ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS
+        if inflight_pixels >= capacity:
+            raise RuntimeError(f"Encode queue is full ({inflight_pixels}/{capacity} pixels).")
+        return {"inflight_pixels": inflight_pixels, "capacity_pixels": capacity}
+
+    @classmethod
+    def refresh(cls) -> None:
+        """Run all component checks and store their results."""
+        checks = {
+            "database": cls._check_db,
+            "storage": cls._check_storage,
+            "models": cls._check_models,
+            "encode_queue": cls._check_encode_queue,
+        }
+        components = {}
+        for name, check in checks.items():
+            try:
+                components[name] = {"healthy": True, **check()}
+            except Exception as error:
+                logger.critical(f"Health check of {name} failed. [Reason: {error}]", exc_info=True)
+                components[name] = {"healthy": False, "reason": str(error)}
+        with cls._lock:
+            cls._components = components
+            cls._refreshed_at = time.monotonic()
+
+    @classmethod
+    def _run(cls) -> None:
+        while True:
+            cls.refresh()
+            time.sleep(settings.HEALTH_PROBE_INTERVAL)
+
+    @classmethod
+    def ensure_started(cls) -> None:
+        if cls._thread is not None and cls._thread.is_alive():
+            return
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._run, name="health-probe", daemon=True)
+                cls._thread.start()
+
+    @classmethod
+    def snapshot(cls) -> tuple[bool, dict]:
+        """Return whether the service is ready with the status of each
+        component from the latest refresh."""
+        with cls._lock:
+            components, refreshed_at = dict(cls._components), cls._refreshed_at
+        if refreshed_at is None:
+            return False, {"probe": {"healthy": False, "reason": "Health probe is starting."}}
+        age = time.monotonic() - refreshed_at
+        if age > settings.HEALTH_PROBE_STALE_AFTER:
+            components["probe"] = {"healthy": False, "reason": f"Health results are stale ({age:.0f}s old)."}
+        return all(component["healthy"] for component in components.values()), components
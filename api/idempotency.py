@@ -0,0 +1,119 @@
+# Standard Library
+import hashlib
+import logging
+import time
+from functools import wraps
+
+# Django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import UploadedFile
+
+# Third Parties
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+logger = logging.getLogger("main_logger")
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with the same Idempotency-Key is still being processed."
+    default_code = "idempotency_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "Idempotency-Key was already used with a different request payload."
+    default_code = "idempotency_key_reused"
+
+
+class IdempotentRequest:
+    """Coordinate retries of the same request through the `IDEMPOTENCY_CACHE`
+    cache shared by every worker.
+
+    The first request carrying a key claims a lock and runs the view, a
+    successful response is then stored for `IDEMPOTENCY_KEY_TTL` seconds
+    and replayed to any retry. Retries arriving while the first request is
+    still running wait for its response instead of running the view again.
+    """
+
+    def __init__(self, request, idempotency_key: str) -> None:
+        self.cache = caches[settings.IDEMPOTENCY_CACHE]
+        scope = f"{request.META.get('HTTP_AUTHORIZATION', '')}:{request.method}:{request.path}:{idempotency_key}"
+        base_key = f"idempotency:{hashlib.sha256(scope.encode()).hexdigest()}"
+        self.lock_key = f"{base_key}:lock"
+        self.response_key = f"{base_key}:response"
+        self.fingerprint = self._fingerprint(request)
+
+    @staticmethod
+    def _fingerprint(request) -> str:
+        """Hash the parsed request payload, uploaded files are hashed by
+        content and rewound so the view can still read them."""
+        digest = hashlib.sha256()
+        for field_name in sorted(request.data.keys()):
+            value = request.data[field_name]
+            digest.update(field_name.encode())
+            if isinstance(value, UploadedFile):
+                for chunk in value.chunks():
+                    digest.update(chunk)
+                value.seek(0)
+            else:
+                digest.update(str(value).encode())
+        return digest.hexdigest()
+
+    def _replay(self, stored_response: dict) -> Response:
+        if stored_response["fingerprint"] != self.fingerprint:
+            raise IdempotencyKeyReused()
+        logger.info("Replaying stored response for idempotent request...")
+        return Response(
+            stored_response["data"], status=stored_response["status"], headers={"Idempotent-Replayed": "true"}
+        )
+
+    def _store(self, response: Response) -> None:
+        if status.is_success(response.status_code):
+            stored_response = {
+                "fingerprint": self.fingerprint,
+                "status": response.status_code,
+                "data": dict(response.data),
+            }
+            self.cache.set(self.response_key, stored_response, timeout=settings.IDEMPOTENCY_KEY_TTL)
+        self.cache.delete(self.lock_key)
+
+    def execute(self, view_func, *args, **kwargs) -> Response:
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            stored_response = self.cache.get(self.response_key)
+            if stored_response is not None:
+                return self._replay(stored_response)
+
+            if self.cache.add(self.lock_key, self.fingerprint, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                try:
+                    response = view_func(*args, **kwargs)
+                except Exception:
+                    self.cache.delete(self.lock_key)
+                    raise
+                self._store(response)
+                return response
+
+            in_flight_fingerprint = self.cache.get(self.lock_key)
+            if in_flight_fingerprint is not None and in_flight_fingerprint != self.fingerprint:
+                raise IdempotencyKeyReused()
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict()
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+
+def idempotent(view_method):
+    """Make an APIView method safe to retry with an `Idempotency-Key`
+    header, requests without the header are processed as usual."""
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        idempotency_key = request.headers.get(settings.IDEMPOTENCY_HEADER_NAME)
+        if not idempotency_key:
+            return view_method(view, request, *args, **kwargs)
+        return IdempotentRequest(request, idempotency_key).execute(view_method, view, request, *args, **kwargs)
+
+    return wrapper
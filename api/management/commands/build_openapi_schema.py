@@ -0,0 +1,20 @@
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# Face Embeddings
+from api.schema import OpenAPISchemaArtifact
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once & store it as the artifact served by the schema views."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--validate", action="store_true", help="Validate the schema against the OpenAPI spec.")
+
+    def handle(self, *args, **options):
+        try:
+            paths = OpenAPISchemaArtifact.build(validate=options["validate"])
+        except Exception as exc:
+            raise CommandError(f"Exception occurred while building the OpenAPI schema: {exc}")
+        for path in paths:
+            self.stdout.write(f"OpenAPI schema written to {path}.")
@@ -0,0 +1,62 @@
+# Standard Library
+import os
+import pstats
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Face Embeddings
+from api.profiling import list_profiles, sign_profile_request
+
+
+class Command(BaseCommand):
+    help = "List captured request profiles, summarize one of them or sign a request to be profiled."
+
+    def add_arguments(self, parser):
+        parser.add_argument("profile", nargs="?", help="Correlation-id or name of the profile to summarize.")
+        parser.add_argument("--limit", type=int, default=25, help="Profiles listed or functions summarized.")
+        parser.add_argument(
+            "--sort", default="cumulative", choices=["cumulative", "tottime", "ncalls"], help="Functions order."
+        )
+        parser.add_argument(
+            "--sign",
+            nargs=2,
+            metavar=("METHOD", "PATH"),
+            help=f"Print the {settings.REQUEST_PROFILING_HEADER} header value profiling this request.",
+        )
+
+    def _list(self, limit: int) -> None:
+        profiles = list_profiles()
+        if not profiles:
+            self.stdout.write("No profiles captured.")
+            return
+        for profile in profiles[:limit]:
+            self.stdout.write(
+                f"{profile['correlation_id']}  {profile['method']:<6} {profile['path']:<40} "
+                f"{profile['status']}  {profile['duration_ms']:>10.1f}ms  {profile['trigger']}"
+            )
+        self.stdout.write(f"{len(profiles)} profiles in {settings.REQUEST_PROFILING_DIR}.")
+
+    def _summarize(self, profile_id: str, limit: int, sort: str) -> None:
+        matches = [profile for profile in list_profiles() if profile_id in (profile["correlation_id"], profile["name"])]
+        if not matches:
+            raise CommandError(f"Profile {profile_id} doesn't exist.")
+        profile = matches[0]
+        self.stdout.write(
+            f"{profile['method']} {profile['path']} -> {profile['status']} in {profile['duration_ms']:.1f}ms "
+            f"(correlation-id {profile['correlation_id']}, {profile['trigger']})"
+        )
+        stats = pstats.Stats(
+            os.path.join(settings.REQUEST_PROFILING_DIR, f"{profile['name']}.prof"), stream=self.stdout
+        )
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+
+    def handle(self, *args, **options):
+        if options["sign"]:
+            method, path = options["sign"]
+            self.stdout.write(f"{settings.REQUEST_PROFILING_HEADER}: {sign_profile_request(method, path)}")
+        elif options["profile"]:
+            self._summarize(options["profile"], options["limit"], options["sort"])
+        else:
+            self._list(options["limit"])
@@ -0,0 +1,96 @@
+# Standard Library
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Third Parties
+import urllib3
+
+# Face Embeddings
+from api.replay import RequestTraceReplayer, read_trace
+
+
+class Command(BaseCommand):
+    help = "Replay a recorded request trace and report throughput, error rates & latency percentiles per endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--trace", default=settings.REQUEST_TRACE_PATH, help="Trace recorded by the RequestTraceMiddleware."
+        )
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server the trace is replayed to.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once at most.")
+        parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier, 2 replays twice faster.")
+        parser.add_argument("--api-key", default=None, help="API key sent with every request.")
+        parser.add_argument("--output", default=None, help="Write the report as JSON to this file.")
+        parser.add_argument(
+            "--start-server",
+            action="store_true",
+            help="Start the server on the port of --base-url for the replay and stop it afterwards.",
+        )
+        parser.add_argument(
+            "--server-command",
+            default=(
+                f"{sys.executable} -m gunicorn config.wsgi:application --bind {{bind}} "
+                "--config config/gunicorn.conf.py --workers 2 --threads 4 --worker-class gthread --timeout 90"
+            ),
+            help="Command starting the server, `{bind}` is replaced by the host:port of --base-url.",
+        )
+
+    def _start_server(self, base_url: str, server_command: str) -> subprocess.Popen:
+        parsed_url = urllib3.util.parse_url(base_url)
+        bind = f"{parsed_url.host}:{parsed_url.port or 80}"
+        server = subprocess.Popen(shlex.split(server_command.format(bind=bind)), cwd=settings.BASE_DIR)
+        liveness_url = f"{base_url.rstrip('/')}/api/health-check/live/"
+        http = urllib3.PoolManager(retries=False)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"Server exited with code {server.returncode}.")
+            try:
+                if http.request("GET", liveness_url).status == 200:
+                    return server
+            except urllib3.exceptions.HTTPError:
+                pass
+            time.sleep(0.5)
+        server.terminate()
+        raise CommandError("Server didn't start in 60 seconds.")
+
+    def _write_report(self, report: dict) -> None:
+        columns = ["requests", "throughput_rps", "error_rate", "client_error_rate", "p50_ms", "p90_ms", "p99_ms"]
+        width = max([len("endpoint")] + [len(endpoint) for endpoint in report])
+        self.stdout.write(f"{'endpoint':<{width}}  " + "  ".join(f"{column:>17}" for column in columns))
+        for endpoint, stats in report.items():
+            self.stdout.write(f"{endpoint:<{width}}  " + "  ".join(f"{stats[column]:>17}" for column in columns))
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["trace"]):
+            raise CommandError(f"Trace {options['trace']} doesn't exist.")
+        entries = read_trace(options["trace"])
+
+        server = self._start_server(options["base_url"], options["server_command"]) if options["start_server"] else None
+        try:
+            replayer = RequestTraceReplayer(
+                options["base_url"],
+                concurrency=options["concurrency"],
+                speed=options["speed"],
+                api_key=options["api_key"],
+            )
+            duration = replayer.replay(entries)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+        report = replayer.report(duration)
+        self._write_report(report)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                json.dump({"duration_seconds": duration, "endpoints": report}, output_file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Replayed {len(entries)} requests in {duration:.2f}s."))
@@ -0,0 +1,205 @@
+# Standard Library
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+# Django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+
+logger = logging.getLogger("main_logger")
+
+MB = 1024 * 1024
+
+
+def get_rss() -> int | None:
+    """Return the resident set size of the process in bytes, None when
+    `/proc` isn't available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_peak_rss() -> int | None:
+    """Return the peak resident set size (VmHWM) of the process in bytes."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size to the current one.
+
+    Returns:
+        bool: Whether the kernel supports resetting it
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class MemoryWatchdog:
+    """Track the RSS of the worker process & the peak memory of tracked
+    requests, and recycle the worker once its RSS grows past
+    `MEMORY_WATCHDOG_MAX_RSS_MB`.
+
+    Recycling sends SIGTERM to the worker itself: gunicorn stops accepting
+    requests on it, drains the in-flight ones within its graceful timeout
+    and starts a fresh worker. Requests peaks are measured from the
+    process peak RSS, which is reset when no other tracked request is in
+    flight, so concurrent requests make a peak an upper bound.
+
+    Worker stats are published to the `MEMORY_WATCHDOG_CACHE` every
+    `MEMORY_WATCHDOG_PUBLISH_INTERVAL` seconds, keyed by host & PID, so any
+    worker of any replica reads the stats of all of them.
+    """
+
+    WORKERS_KEY = "memory:workers"
+    WORKER_KEY = "memory:worker:{worker}"
+    RECYCLES_KEY = "memory:recycles"
+
+    _lock = threading.Lock()
+    _pid: int | None = None
+    _tracked_inflight = 0
+    _requests = 0
+    _last_request_peak: int | None = None
+    _max_request_peak: int | None = None
+    _recycling = False
+    _published_at = 0.0
+
+    @staticmethod
+    def get_cache() -> BaseCache:
+        return caches[settings.MEMORY_WATCHDOG_CACHE]
+
+    @staticmethod
+    def get_worker() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        """Start from clean counters in each worker forked from a preloaded
+        master."""
+        if cls._pid != os.getpid():
+            cls._pid = os.getpid()
+            cls._tracked_inflight, cls._requests = 0, 0
+            cls._last_request_peak, cls._max_request_peak = None, None
+            cls._recycling, cls._published_at = False, 0.0
+
+    @classmethod
+    def start_request(cls, tracked: bool) -> int | None:
+        """Count a request in, resetting the peak RSS when it's the only
+        tracked request in flight.
+
+        Returns:
+            int | None: RSS at the start of a tracked request
+        """
+        with cls._lock:
+            cls._reset_after_fork()
+            if not tracked:
+                return None
+            if not cls._tracked_inflight:
+                reset_peak_rss()
+            cls._tracked_inflight += 1
+        return get_rss()
+
+    @classmethod
+    def finish_request(cls, started_rss: int | None, can_recycle: bool) -> None:
+        """Record a finished request & recycle the worker when its RSS
+        crossed the threshold."""
+        rss = get_rss()
+        with cls._lock:
+            cls._requests += 1
+            if started_rss is not None:
+                cls._tracked_inflight -= 1
+                request_peak = max((get_peak_rss() or 0) - started_rss, 0)
+                cls._last_request_peak = request_peak
+                cls._max_request_peak = max(cls._max_request_peak or 0, request_peak)
+            recycle = (
+                can_recycle
+                and not cls._recycling
+                and rss is not None
+                and rss > settings.MEMORY_WATCHDOG_MAX_RSS_MB * MB
+            )
+            if recycle:
+                cls._recycling = True
+
+        if recycle:
+            cls._recycle(rss)
+        elif time.monotonic() - cls._published_at >= settings.MEMORY_WATCHDOG_PUBLISH_INTERVAL:
+            cls.publish()
+
+    @classmethod
+    def _recycle(cls, rss: int) -> None:
+        logger.warning(
+            f"Worker {os.getpid()} RSS {rss / MB:.0f}MB crossed {settings.MEMORY_WATCHDOG_MAX_RSS_MB}MB, "
+            "recycling it once its in-flight requests drain..."
+        )
+        cache = cls.get_cache()
+        cache.add(cls.RECYCLES_KEY, 0, timeout=None)
+        try:
+            # Atomic on Redis & Memcached, the database cache may miss a recycle racing another one
+            cache.incr(cls.RECYCLES_KEY)
+        except ValueError:
+            # Counter evicted between `add` and `incr`
+            cache.set(cls.RECYCLES_KEY, 1, timeout=None)
+        cls.publish()
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        rss, peak_rss = get_rss(), get_peak_rss()
+        return {
+            "worker": cls.get_worker(),
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "rss_mb": round(rss / MB, 1) if rss is not None else None,
+            "peak_rss_mb": round(peak_rss / MB, 1) if peak_rss is not None else None,
+            "requests": cls._requests,
+            "last_request_peak_mb": round(cls._last_request_peak / MB, 1)
+            if cls._last_request_peak is not None
+            else None,
+            "max_request_peak_mb": round(cls._max_request_peak / MB, 1) if cls._max_request_peak is not None else None,
+            "recycling": cls._recycling,
+            "updated_at": time.time(),
+        }
+
+    @classmethod
+    def publish(cls) -> None:
+        """Publish the worker stats to the shared cache, races between
+        workers updating the workers list only hide a worker until its next
+        publish."""
+        cls._published_at = time.monotonic()
+        cache, worker = cls.get_cache(), cls.get_worker()
+        cache.set(cls.WORKER_KEY.format(worker=worker), cls.get_stats(), timeout=settings.MEMORY_WATCHDOG_STATS_TTL)
+        workers = cache.get(cls.WORKERS_KEY) or []
+        if worker not in workers:
+            cache.set(cls.WORKERS_KEY, [*workers, worker], timeout=None)
+
+    @classmethod
+    def get_metrics(cls) -> dict:
+        """Return the last published stats of the live workers & the number
+        of recycled workers."""
+        cache = cls.get_cache()
+        workers = cache.get(cls.WORKERS_KEY) or []
+        keys = [cls.WORKER_KEY.format(worker=worker) for worker in workers]
+        stats = cache.get_many(keys)
+        live_stats = [stats[key] for key in keys if key in stats]
+        live_workers = [worker_stats["worker"] for worker_stats in live_stats]
+        if live_workers != workers:
+            # Forget workers whose stats expired
+            cache.set(cls.WORKERS_KEY, live_workers, timeout=None)
+        return {"workers": live_stats, "recycles": cache.get(cls.RECYCLES_KEY) or 0}
@@ -0,0 +1,161 @@
+# Standard Library
+import cProfile
+import json
+import logging
+import random
+import time
+import uuid
+
+# Django
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Third Parties
+from django_guid import get_guid
+
+# Face Embeddings
+from api.memory import MemoryWatchdog, get_rss
+from api.profiling import verify_profile_request, write_profile
+
+logger = logging.getLogger("main_logger")
+trace_logger = logging.getLogger("request_trace")
+
+
+class RequestTraceMiddleware:
+    """Record a trace entry per request as a JSON line, to replay the traffic
+    later with the `replay_request_trace` command.
+
+    Entries keep the endpoint, payload size & timing of each request. Bodies
+    are only kept for small JSON requests, uploads are replayed with a
+    stand-in file of the recorded size and credentials are never kept.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TRACE_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    @staticmethod
+    def _get_body(request) -> str | None:
+        if request.content_type != "application/json":
+            return None
+        if int(request.META.get("CONTENT_LENGTH") or 0) > settings.REQUEST_TRACE_MAX_BODY_BYTES:
+            return None
+        # Reading it here keeps it available to the views
+        return request.body.decode("utf-8", errors="replace")
+
+    def __call__(self, request):
+        started_at = time.time()
+        body = self._get_body(request)
+        response = self.get_response(request)
+        duration = time.time() - started_at
+
+        resolver_match = getattr(request, "resolver_match", None)
+        entry = {
+            "timestamp": round(started_at, 6),
+            "method": request.method,
+            "path": request.path,
+            "query_string": request.META.get("QUERY_STRING", ""),
+            "route": resolver_match.route if resolver_match else None,
+            "content_type": request.content_type,
+            "request_size": int(request.META.get("CONTENT_LENGTH") or 0),
+            "body": body,
+            "accept": request.META.get("HTTP_ACCEPT", ""),
+            "status": response.status_code,
+            "response_size": None if response.streaming else len(response.content),
+            "duration_ms": round(duration * 1000, 3),
+        }
+        trace_logger.info(json.dumps(entry))
+        return response
+
+
+class RequestProfilingMiddleware:
+    """Profile requests with cProfile on demand.
+
+    A request is profiled when it carries a valid `REQUEST_PROFILING_HEADER`
+    built by `sign_profile_request` (`list_profiles --sign METHOD PATH`),
+    or by sampling `REQUEST_PROFILING_SAMPLE_RATE` of the requests. The
+    profile is written to `REQUEST_PROFILING_DIR` under the request's
+    correlation-id, which is sent back in the `X-Profile-Id` header.
+
+    Note: Streamed responses are profiled until the view returns, the
+    streaming itself isn't part of the profile.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.header_name = "HTTP_" + settings.REQUEST_PROFILING_HEADER.upper().replace("-", "_")
+
+    def _get_trigger(self, request) -> str | None:
+        header_value = request.META.get(self.header_name)
+        if header_value and verify_profile_request(header_value, request.method, request.path):
+            return "header"
+        if random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return "sample"
+        return None
+
+    def __call__(self, request):
+        trigger = self._get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active
+            return self.get_response(request)
+
+        started_at = time.time()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.time() - started_at
+
+        correlation_id = get_guid() or uuid.uuid4().hex
+        metadata = {
+            "correlation_id": correlation_id,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "started_at": started_at,
+            "duration_ms": round(duration * 1000, 3),
+            "trigger": trigger,
+        }
+        try:
+            write_profile(profiler, metadata)
+            response["X-Profile-Id"] = correlation_id
+        except OSError as exc:
+            logger.warning(f"Profile of request {correlation_id} can't be written: {exc}")
+        return response
+
+
+class MemoryWatchdogMiddleware:
+    """Track the worker RSS & the peak memory of requests to the
+    `MEMORY_WATCHDOG_TRACKED_PATHS` (the encode path), see
+    `MemoryWatchdog`.
+
+    Workers are only recycled when served by gunicorn, which replaces
+    them, never under the development server.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_WATCHDOG_ENABLED:
+            raise MiddlewareNotUsed()
+        if get_rss() is None:
+            logger.warning("Memory watchdog disabled, the process RSS can't be read from /proc.")
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.tracked_paths = tuple(settings.MEMORY_WATCHDOG_TRACKED_PATHS)
+
+    def __call__(self, request):
+        tracked = request.method == "POST" and request.path.startswith(self.tracked_paths)
+        started_rss = MemoryWatchdog.start_request(tracked)
+        try:
+            return self.get_response(request)
+        finally:
+            can_recycle = request.META.get("SERVER_SOFTWARE", "").startswith("gunicorn")
+            MemoryWatchdog.finish_request(started_rss, can_recycle)
@@ -0,0 +1,78 @@
+# Standard Library
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+# Django
+from django.conf import settings
+
+logger = logging.getLogger("main_logger")
+
+
+def sign_profile_request(method: str, path: str, timestamp: int | None = None) -> str:
+    """Build the profiling header value allowing a request to be profiled.
+
+    Returns:
+        str: `<timestamp>:<hex hmac-sha256 of timestamp, method & path>`
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    signature = hmac.new(settings.REQUEST_PROFILING_SECRET.encode(), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}:{signature}"
+
+
+def verify_profile_request(header_value: str, method: str, path: str) -> bool:
+    """Check a profiling header value signed by `sign_profile_request` that
+    isn't older than `REQUEST_PROFILING_SIGNATURE_TTL` seconds."""
+    timestamp, _, _ = header_value.partition(":")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > settings.REQUEST_PROFILING_SIGNATURE_TTL:
+        return False
+    return hmac.compare_digest(header_value, sign_profile_request(method, path, int(timestamp)))
+
+
+def write_profile(profiler: cProfile.Profile, metadata: dict) -> str:
+    """Dump a profile & its metadata into `REQUEST_PROFILING_DIR`, keeping
+    the newest `REQUEST_PROFILING_MAX_PROFILES` profiles only.
+
+    Returns:
+        str: Profile name, shared by the `.prof` & `.json` files
+    """
+    os.makedirs(settings.REQUEST_PROFILING_DIR, exist_ok=True)
+    created_at = datetime.fromtimestamp(metadata["started_at"], tz=dt_timezone.utc)
+    path_slug = re.sub(r"[^A-Za-z0-9]+", "-", metadata["path"]).strip("-")[:60]
+    name = f"{created_at:%Y%m%dT%H%M%S%f}-{metadata['correlation_id']}-{metadata['method']}-{path_slug}"
+    profile_path = os.path.join(settings.REQUEST_PROFILING_DIR, name)
+    profiler.dump_stats(f"{profile_path}.prof")
+    with open(f"{profile_path}.json", "w") as metadata_file:
+        json.dump({"name": name, **metadata}, metadata_file)
+
+    for expired_name in [profile["name"] for profile in list_profiles()][settings.REQUEST_PROFILING_MAX_PROFILES :]:
+        for extension in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(settings.REQUEST_PROFILING_DIR, f"{expired_name}{extension}"))
+            except FileNotFoundError:
+                pass
+    return name
+
+
+def list_profiles() -> list[dict]:
+    """Return the metadata of the captured profiles, newest first."""
+    if not os.path.isdir(settings.REQUEST_PROFILING_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(settings.REQUEST_PROFILING_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path) as metadata_file:
+                profiles.append(json.load(metadata_file))
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Profile metadata: {entry.name} can't be read: {exc}")
+    return sorted(profiles, key=lambda profile: profile["started_at"], reverse=True)
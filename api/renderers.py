@@ -1,5 +1,20 @@
+# Standard Library
+import json
+from collections.abc import Iterable, Iterator
+
+# Django
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
 # Third Parties
-from rest_framework.renderers import JSONRenderer
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    # Third Parties
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 
 class APIRenderer(JSONRenderer):
@@ -25,3 +40,71 @@ class APIRenderer(JSONRenderer):
             response["error"] = data.get("error", data)
 
         return super().render(response, accepted_media_type, renderer_context)
+
+    def _dumps(self, data) -> bytes:
+        """Serialize a single value the same way `render` does, with orjson
+        when it's installed."""
+        if orjson is not None:
+            rendered = orjson.dumps(data, default=JSONEncoder().default)
+            return rendered.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        rendered = json.dumps(
+            data,
+            cls=self.encoder_class,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=(",", ":") if self.compact else (", ", ": "),
+        )
+        return rendered.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+    def render_stream(self, items: Iterable, message: str | None = None) -> Iterator[bytes]:
+        """Render a list response incrementally, the envelope is written
+        around the items as they are produced so the whole list is never held
+        in memory.
+
+        Args:
+            items (Iterable): Already serialized list items
+            message (str | None): Result message
+
+        Yields:
+            bytes: Chunks of `STREAMING_RESPONSE_CHUNK_SIZE` bytes at least
+        """
+        buffer = bytearray(b'{"result":{"message":' + self._dumps(message) + b',"data":[')
+        for index, item in enumerate(items):
+            if index:
+                buffer += b","
+            buffer += self._dumps(item)
+            if len(buffer) >= settings.STREAMING_RESPONSE_CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b']},"error":null}'
+        yield bytes(buffer)
+
+
+class StreamingAPIResponse(StreamingHttpResponse):
+    """Successful list response streamed in the `APIRenderer` structure.
+
+    Note: Errors raised while streaming can't change the already sent
+    status, so items should be validated before building the response.
+    """
+
+    def __init__(self, items: Iterable, message: str | None = None, status: int = 200, **kwargs) -> None:
+        super().__init__(
+            APIRenderer().render_stream(items, message), content_type=APIRenderer.media_type, status=status, **kwargs
+        )
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Negotiates `text/event-stream` for server-sent events views, the
+    views stream the events themselves so only errors are rendered here,
+    as a single `error` event."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    @staticmethod
+    def render_event(event: str, data) -> bytes:
+        return b"event: " + event.encode() + b"\ndata: " + APIRenderer()._dumps(data) + b"\n\n"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return self.render_event("error", data.get("error", data) if isinstance(data, dict) else data)
@@ -0,0 +1,146 @@
+# Standard Library
+import io
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+# Third Parties
+import urllib3
+from PIL import Image
+
+logger = logging.getLogger("main_logger")
+
+
+def read_trace(trace_path: str) -> list[dict]:
+    """Load the entries of a request trace sorted by their timestamp."""
+    with open(trace_path) as trace_file:
+        entries = [json.loads(line) for line in trace_file if line.strip()]
+    return sorted(entries, key=lambda entry: entry["timestamp"])
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RequestTraceReplayer:
+    """Replay a recorded request trace against a running server.
+
+    Requests are sent at their recorded offsets divided by `speed`, by at
+    most `concurrency` requests at once. Uploads are replaced by a
+    generated image of about the recorded size since traces never keep
+    them.
+    """
+
+    def __init__(self, base_url: str, concurrency: int = 8, speed: float = 1.0, api_key: str | None = None) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.speed = speed
+        self.headers = {"Authorization": f"Api-Key {api_key}"} if api_key else {}
+        self.http = urllib3.PoolManager(maxsize=concurrency, block=True, retries=False)
+        self._images: dict[int, bytes] = {}
+        self._images_lock = threading.Lock()
+        self.results: list[dict] = []
+
+    def _get_image(self, size: int) -> bytes:
+        """Return a PNG image of about `size` bytes, random pixels don't
+        compress so its side is derived from the size."""
+        side = max(16, int(math.sqrt(max(size, 1) / 3)))
+        with self._images_lock:
+            if side not in self._images:
+                image = Image.effect_noise((side, side), 64).convert("RGB")
+                image_file = io.BytesIO()
+                image.save(image_file, "png")
+                self._images[side] = image_file.getvalue()
+            return self._images[side]
+
+    def _build_request(self, entry: dict) -> dict:
+        url = f"{self.base_url}{entry['path']}"
+        if entry.get("query_string"):
+            url = f"{url}?{entry['query_string']}"
+        headers = dict(self.headers)
+        if entry.get("accept"):
+            headers["Accept"] = entry["accept"]
+        request = {"method": entry["method"], "url": url, "headers": headers}
+
+        content_type = entry.get("content_type") or ""
+        if content_type == "multipart/form-data":
+            image = self._get_image(entry.get("request_size") or 0)
+            request["fields"] = {"face_image": ("replay.png", image, "image/png")}
+        elif entry.get("body") is not None:
+            headers["Content-Type"] = content_type
+            request["body"] = entry["body"].encode()
+        return request
+
+    def _send(self, entry: dict) -> dict:
+        request = self._build_request(entry)
+        started_at = time.monotonic()
+        try:
+            response = self.http.request(**request)
+            status, error = response.status, None
+        except urllib3.exceptions.HTTPError as exc:
+            status, error = None, str(exc)
+        return {
+            "route": entry.get("route") or entry["path"],
+            "method": entry["method"],
+            "status": status,
+            "error": error,
+            "latency_ms": (time.monotonic() - started_at) * 1000,
+        }
+
+    def replay(self, entries: Iterable[dict]) -> float:
+        """Send the requests of the trace & keep their results.
+
+        Returns:
+            float: Wall-clock seconds taken by the replay
+        """
+        entries = list(entries)
+        if not entries:
+            return 0.0
+        trace_started_at, replay_started_at = entries[0]["timestamp"], time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            for entry in entries:
+                delay = (entry["timestamp"] - trace_started_at) / self.speed - (time.monotonic() - replay_started_at)
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self._send, entry))
+            self.results = [future.result() for future in futures]
+        return time.monotonic() - replay_started_at
+
+    def report(self, duration: float) -> dict:
+        """Summarize results per endpoint: throughput, error rate & latency
+        percentiles.
+
+        Requests failing with a connection error or a 5xx status count as
+        errors, 4xx are reported apart since they are usually part of the
+        recorded traffic.
+        """
+        results_by_endpoint = defaultdict(list)
+        for result in self.results:
+            results_by_endpoint[f"{result['method']} {result['route']}"].append(result)
+
+        report = {}
+        for endpoint, results in sorted(results_by_endpoint.items()):
+            latencies = sorted(result["latency_ms"] for result in results)
+            errors = sum(1 for result in results if result["status"] is None or result["status"] >= 500)
+            client_errors = sum(1 for result in results if result["status"] and 400 <= result["status"] < 500)
+            report[endpoint] = {
+                "requests": len(results),
+                "throughput_rps": round(len(results) / duration, 3) if duration else 0.0,
+                "error_rate": round(errors / len(results), 4),
+                "client_error_rate": round(client_errors / len(results), 4),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p90_ms": round(percentile(latencies, 90), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "max_ms": round(latencies[-1], 3),
+            }
+        return report
@@ -0,0 +1,76 @@
+# Standard Library
+import hashlib
+import logging
+import os
+import threading
+
+# Django
+from django.conf import settings
+
+# Third Parties
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.validation import validate_schema
+
+logger = logging.getLogger("main_logger")
+
+
+class OpenAPISchemaArtifact:
+    """OpenAPI schema generated once by the `build_openapi_schema` command
+    and stored per format as `openapi-<VERSION>.<format>` in
+    `OPENAPI_SCHEMA_DIR`.
+
+    Loaded artifacts are kept in memory with their ETag, the sha256 of
+    their content, until the file changes.
+    """
+
+    RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+    _lock = threading.Lock()
+    _loaded: dict[str, tuple[float, bytes, str]] = {}
+
+    @staticmethod
+    def get_path(schema_format: str) -> str:
+        return os.path.join(settings.OPENAPI_SCHEMA_DIR, f"openapi-{spectacular_settings.VERSION}.{schema_format}")
+
+    @classmethod
+    def build(cls, validate: bool = False) -> list[str]:
+        """Generate the schema & write it in every format, replacing the
+        previous artifacts atomically.
+
+        Returns:
+            list[str]: Written artifact paths
+        """
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+        if validate:
+            validate_schema(schema)
+
+        os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+        paths = []
+        for schema_format, renderer_class in cls.RENDERERS.items():
+            path = cls.get_path(schema_format)
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "wb") as artifact:
+                artifact.write(renderer_class().render(schema, renderer_context={}))
+            os.replace(temporary_path, path)
+            paths.append(path)
+        return paths
+
+    @classmethod
+    def load(cls, schema_format: str) -> tuple[bytes, str] | None:
+        """Return the artifact content & ETag, None when it isn't built."""
+        path = cls.get_path(schema_format)
+        try:
+            modified_at = os.stat(path).st_mtime
+        except OSError:
+            return None
+
+        with cls._lock:
+            loaded = cls._loaded.get(path)
+            if loaded is None or loaded[0] != modified_at:
+                with open(path, "rb") as artifact:
+                    content = artifact.read()
+                etag = f'"{hashlib.sha256(content).hexdigest()}"'
+                loaded = cls._loaded[path] = (modified_at, content, etag)
+        return loaded[1], loaded[2]
@@ -1,4 +1,572 @@
+# Standard Library
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
 # Django
-from django.test import TestCase  # noqa
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+    get_internal_wsgi_application,
+)
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+# Third Parties
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework_api_key.models import APIKey
+
+# Face Embeddings
+from api.admission import EncodeAdmissionController, MmapLeaseTable
+from api.checks import check_shared_caches
+from api.health import HealthProbe
+from api.memory import MemoryWatchdog
+from api.profiling import list_profiles, sign_profile_request, verify_profile_request
+from api.renderers import APIRenderer, StreamingAPIResponse
+from api.replay import RequestTraceReplayer, percentile, read_trace
+from api.throttling import (
+    CacheSlidingWindowBackend,
+    MmapTokenBucketBackend,
+    RateLimitBackend,
+    SharedAnonRateThrottle,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@patch.object(HealthProbe, "ensure_started")
+class HealthCheckViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse("readiness-check")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        HealthProbe._components, HealthProbe._refreshed_at = {}, None
+
+    def test_liveness_check(self, ensure_started):
+        response = self.client.get(reverse("liveness-check"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ensure_started.assert_not_called()
+
+    def test_readiness_check_starting(self, ensure_started):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        ensure_started.assert_called_once()
+
+    def test_readiness_check_ready(self, ensure_started):
+        HealthProbe.refresh()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["components"]), {"database", "storage", "models", "encode_queue"})
+
+    @override_settings(ENCODE_ADMISSION_MMAP_PATH=os.path.join(tempfile.mkdtemp(), "admission"))
+    def test_readiness_check_encode_queue_full(self, ensure_started):
+        leases = EncodeAdmissionController.get_leases()
+        lease_id, _ = leases.acquire(settings.ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS, capacity=1, ttl=60)
+        self.addCleanup(leases.release, lease_id)
+        HealthProbe.refresh()
+
+        response = self.client.get(reverse("health-check"))
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(response.data["error"]["extra"]["encode_queue"]["healthy"])
+
+    @override_settings(HEALTH_PROBE_STALE_AFTER=0)
+    def test_readiness_check_stale_results(self, ensure_started):
+        HealthProbe.refresh()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("stale", response.data["error"]["extra"]["probe"]["reason"])
+
+    def test_readiness_check_ready_after_worker_init(self, ensure_started):
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", settings.BASE_DIR / "config/gunicorn.conf.py")
+        gunicorn_conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(gunicorn_conf)
+
+        gunicorn_conf.post_worker_init(worker=None)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ensure_started.assert_called()
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_caches(None), [])
+
+    @override_settings(IDEMPOTENCY_CACHE="default")
+    def test_process_local_cache_fails(self):
+        errors = check_shared_caches(None)
+
+        self.assertEqual([error.id for error in errors], ["api.E001"])
+        self.assertIn("`IDEMPOTENCY_CACHE` cache `default` is process-local", errors[0].msg)
+
+    @override_settings(MEMORY_WATCHDOG_CACHE="default")
+    def test_process_local_memory_watchdog_cache_fails(self):
+        errors = check_shared_caches(None)
+
+        self.assertEqual([error.id for error in errors], ["api.E001"])
+        self.assertIn("`MEMORY_WATCHDOG_CACHE` cache `default` is process-local", errors[0].msg)
+
+    @override_settings(IDEMPOTENCY_CACHE="missing")
+    def test_unknown_cache_fails(self):
+        self.assertEqual([error.id for error in check_shared_caches(None)], ["api.E001"])
+
+
+class StreamingAPIResponseTests(SimpleTestCase):
+    items = [
+        {"public_id": "5c3b6f0e", "encoding_status": "SUCCESS", "count": 3},
+        {"public_id": "a0e1\u2028", "encoding_status": "FAILED", "ratio": 0.1},
+    ]
+
+    def render(self, data):
+        return APIRenderer().render(data, renderer_context={"response": Response(status=status.HTTP_200_OK)})
+
+    @patch("api.renderers.orjson", None)
+    def test_streamed_list_matches_rendered_list(self):
+        response = StreamingAPIResponse(iter(self.items))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(b"".join(response.streaming_content), self.render(list(self.items)))
+
+    @patch("api.renderers.orjson", None)
+    def test_streamed_empty_list_matches_rendered_list(self):
+        response = StreamingAPIResponse(iter([]))
+
+        self.assertEqual(b"".join(response.streaming_content), self.render([]))
+
+    @override_settings(STREAMING_RESPONSE_CHUNK_SIZE=1)
+    def test_streamed_list_flushed_in_chunks(self):
+        chunks = list(APIRenderer().render_stream(iter(self.items)))
+
+        self.assertEqual(len(chunks), len(self.items) + 1)
+        self.assertEqual(json.loads(b"".join(chunks)), {"result": {"message": None, "data": self.items}, "error": None})
+
+
+@override_settings(REQUEST_TRACE_ENABLED=True)
+class RequestTraceMiddlewareTests(SimpleTestCase):
+    client_class = APIClient
+
+    def test_request_is_traced(self):
+        with self.assertLogs("request_trace", level="INFO") as logs:
+            response = self.client.post(reverse("liveness-check"), {"key": "value"}, format="json")
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["method"], "POST")
+        self.assertEqual(entry["path"], reverse("liveness-check"))
+        self.assertEqual(entry["route"], "api/health-check/live/")
+        self.assertEqual(entry["body"], '{"key":"value"}')
+        self.assertEqual(entry["request_size"], len(entry["body"]))
+        self.assertEqual(entry["status"], response.status_code)
+        self.assertEqual(entry["response_size"], len(response.content))
+        self.assertIn("duration_ms", entry)
+
+    @override_settings(REQUEST_TRACE_MAX_BODY_BYTES=4)
+    def test_big_body_is_not_traced(self):
+        with self.assertLogs("request_trace", level="INFO") as logs:
+            self.client.post(reverse("liveness-check"), {"key": "value"}, format="json")
+
+        self.assertIsNone(json.loads(logs.records[0].getMessage())["body"])
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class RequestTraceReplayerTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadedWSGIServer(("127.0.0.1", 0), QuietWSGIRequestHandler)
+        cls.server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.server_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_replay_reports_per_endpoint(self):
+        liveness_path = reverse("liveness-check")
+        entries = [
+            {"timestamp": 100.0 + index / 10, "method": "GET", "path": liveness_path, "route": "api/health-check/live/"}
+            for index in range(4)
+        ]
+        entries.append({"timestamp": 100.2, "method": "GET", "path": "/api/unknown/", "route": None})
+        trace_path = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+        with open(trace_path, "w") as trace_file:
+            trace_file.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+        replayer = RequestTraceReplayer(self.server_url, concurrency=2, speed=10)
+        duration = replayer.replay(read_trace(trace_path))
+        report = replayer.report(duration)
+
+        self.assertEqual(report["GET api/health-check/live/"]["requests"], 4)
+        self.assertEqual(report["GET api/health-check/live/"]["error_rate"], 0)
+        self.assertEqual(report["GET /api/unknown/"]["client_error_rate"], 1)
+        self.assertGreater(report["GET api/health-check/live/"]["throughput_rps"], 0)
+        self.assertLessEqual(
+            report["GET api/health-check/live/"]["p50_ms"], report["GET api/health-check/live/"]["p99_ms"]
+        )
+        shutil.rmtree(os.path.dirname(trace_path), ignore_errors=True)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 99), 0.0)
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_DIR=tempfile.mkdtemp())
+class RequestProfilingMiddlewareTests(SimpleTestCase):
+    def tearDown(self):
+        shutil.rmtree(settings.REQUEST_PROFILING_DIR, ignore_errors=True)
+
+    def test_signed_request_is_profiled(self):
+        path = reverse("liveness-check")
+        header_value = sign_profile_request("GET", path)
+        response = self.client.get(path, HTTP_X_PROFILE_REQUEST=header_value, HTTP_CORRELATION_ID="a" * 32)
+
+        self.assertEqual(response["X-Profile-Id"], "a" * 32)
+        profile = list_profiles()[0]
+        self.assertEqual(profile["correlation_id"], "a" * 32)
+        self.assertEqual(profile["trigger"], "header")
+        self.assertEqual(profile["status"], 200)
+        self.assertTrue(os.path.exists(os.path.join(settings.REQUEST_PROFILING_DIR, f"{profile['name']}.prof")))
+
+        stdout = io.StringIO()
+        call_command("list_profiles", "a" * 32, stdout=stdout)
+        self.assertIn("function calls", stdout.getvalue())
+
+    def test_invalid_signature_is_not_profiled(self):
+        path = reverse("liveness-check")
+        header_value = sign_profile_request("GET", "/api/other/")
+        response = self.client.get(path, HTTP_X_PROFILE_REQUEST=header_value)
+
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list_profiles(), [])
+
+    def test_expired_signature_is_rejected(self):
+        header_value = sign_profile_request("GET", "/api/", timestamp=int(time.time()) - 3600)
+
+        self.assertFalse(verify_profile_request(header_value, "GET", "/api/"))
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_PROFILING_MAX_PROFILES=2)
+    def test_sampled_requests_are_profiled_and_pruned(self):
+        for _ in range(3):
+            self.client.get(reverse("liveness-check"))
+
+        profiles = list_profiles()
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual({profile["trigger"] for profile in profiles}, {"sample"})
+        self.assertEqual(len(os.listdir(settings.REQUEST_PROFILING_DIR)), 4)
+
+
+@override_settings(MEMORY_WATCHDOG_CACHE="default")
+@patch("api.memory.os.kill")
+class MemoryWatchdogMiddlewareTests(SimpleTestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        MemoryWatchdog.get_cache().clear()
+        MemoryWatchdog._pid = None
+
+    def test_tracked_request_peak_is_recorded(self, kill):
+        self.client.post(reverse("encode-face-image"))
+
+        stats = MemoryWatchdog.get_stats()
+        self.assertEqual(stats["requests"], 1)
+        self.assertIsNotNone(stats["last_request_peak_mb"])
+        self.assertGreater(stats["rss_mb"], 0)
+        kill.assert_not_called()
+
+    def test_untracked_request_peak_isnt_recorded(self, kill):
+        self.client.get(reverse("liveness-check"))
+
+        stats = MemoryWatchdog.get_stats()
+        self.assertEqual(stats["requests"], 1)
+        self.assertIsNone(stats["last_request_peak_mb"])
+
+    @override_settings(MEMORY_WATCHDOG_MAX_RSS_MB=1)
+    def test_worker_recycled_once_under_gunicorn(self, kill):
+        for _ in range(2):
+            self.client.get(reverse("liveness-check"), SERVER_SOFTWARE="gunicorn/20.1.0")
+
+        kill.assert_called_once_with(os.getpid(), signal.SIGTERM)
+        metrics = MemoryWatchdog.get_metrics()
+        self.assertEqual(metrics["recycles"], 1)
+        self.assertTrue(metrics["workers"][0]["recycling"])
+
+    @override_settings(MEMORY_WATCHDOG_MAX_RSS_MB=1)
+    def test_worker_not_recycled_without_gunicorn(self, kill):
+        self.client.get(reverse("liveness-check"))
+
+        kill.assert_not_called()
+
+
+class MemoryMetricsViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.url = reverse("memory-metrics")
+
+    @classmethod
+    def tearDownClass(cls):
+        APIKey.objects.all().delete()
+
+    def setUp(self):
+        MemoryWatchdog.get_cache().clear()
+
+    def test_unauthenticated_memory_metrics(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_memory_metrics(self):
+        shared_cache = MemoryWatchdog.get_cache()
+        other_worker = {**MemoryWatchdog.get_stats(), "worker": "replica-2:7", "host": "replica-2", "pid": 7}
+        shared_cache.set(MemoryWatchdog.WORKERS_KEY, ["replica-1:0", other_worker["worker"]], timeout=None)
+        shared_cache.set(MemoryWatchdog.WORKER_KEY.format(worker=other_worker["worker"]), other_worker, timeout=60)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["recycles"], 0)
+        # The stats of the stale worker expired, the worker of the other replica & the current one are left
+        workers = [worker["worker"] for worker in response.data["workers"]]
+        self.assertEqual(workers, ["replica-2:7", MemoryWatchdog.get_worker()])
+        self.assertEqual(shared_cache.get(MemoryWatchdog.WORKERS_KEY), workers)
+
+
+@override_settings(OPENAPI_SCHEMA_DIR=tempfile.mkdtemp())
+class OpenAPISchemaViewTests(SimpleTestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.url = reverse("schema")
+
+    def tearDown(self):
+        shutil.rmtree(settings.OPENAPI_SCHEMA_DIR, ignore_errors=True)
+
+    def build_schema(self) -> None:
+        stdout = io.StringIO()
+        call_command("build_openapi_schema", stdout=stdout)
+        self.assertEqual(stdout.getvalue().count("OpenAPI schema written"), 2)
+
+    def test_schema_served_from_artifact(self):
+        self.build_schema()
+        with open(os.path.join(settings.OPENAPI_SCHEMA_DIR, "openapi-0.1.0.yaml"), "rb") as artifact:
+            content = artifact.read()
+
+        with patch("drf_spectacular.generators.SchemaGenerator.get_schema") as get_schema:
+            response = self.client.get(self.url)
+
+        get_schema.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, content)
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi")
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(json.loads(response.content)["info"]["title"], "Face Embedding APIs")
+
+    def test_unchanged_schema_not_modified(self):
+        self.build_schema()
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    @override_settings(DEBUG=False)
+    def test_schema_without_artifact_not_found(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn("build_openapi_schema", str(response.data))
+
+    @override_settings(DEBUG=True)
+    def test_schema_generated_without_artifact_in_debug(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+        self.assertIn(b"openapi: 3.0.3", response.content)
+
+
+def hit_rate_limit(path: str, key: str, hits: int) -> None:
+    backend = MmapTokenBucketBackend(path=path, slots=64)
+    for _ in range(hits):
+        backend.hit(key, 5, 60)
+
+
+class MmapTokenBucketBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "rate_limits")
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+    def test_bucket_refills_over_time(self):
+        backend = MmapTokenBucketBackend(path=self.path, slots=64)
+
+        self.assertEqual([backend.hit("client", 2, 10)[0] for _ in range(3)], [True, True, False])
+        self.assertAlmostEqual(backend.hit("client", 2, 10)[1], 5, places=1)
+        self.assertTrue(backend.hit("other-client", 2, 10)[0])
+
+        with patch("api.throttling.time.time", return_value=time.time() + 5):
+            self.assertTrue(backend.hit("client", 2, 10)[0])
+            self.assertFalse(backend.hit("client", 2, 10)[0])
+
+    def test_bucket_shared_between_processes(self):
+        process = multiprocessing.get_context("fork").Process(target=hit_rate_limit, args=(self.path, "client", 4))
+        process.start()
+        process.join()
+
+        backend = MmapTokenBucketBackend(path=self.path, slots=64)
+        self.assertEqual([backend.hit("client", 5, 60)[0] for _ in range(2)], [True, False])
+
+    def test_full_group_evicts_least_recently_updated_key(self):
+        backend = MmapTokenBucketBackend(path=self.path, slots=MmapTokenBucketBackend.GROUP_SIZE)
+        backend.hit("client-0", 1, 60)
+        for index in range(1, MmapTokenBucketBackend.GROUP_SIZE + 1):
+            self.assertTrue(backend.hit(f"client-{index}", 1, 60)[0])
+
+        # client-0 was evicted & starts over with a full bucket, the last client is still tracked
+        self.assertTrue(backend.hit("client-0", 1, 60)[0])
+        self.assertFalse(backend.hit(f"client-{MmapTokenBucketBackend.GROUP_SIZE}", 1, 60)[0])
+
+
+def acquire_lease(path: str, cost: int) -> None:
+    MmapLeaseTable(path, slots=4).acquire(cost, capacity=100, ttl=60)
+
+
+class MmapLeaseTableTests(SimpleTestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "admission")
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+    def test_leases_fit_capacity(self):
+        leases = MmapLeaseTable(self.path, slots=4)
+
+        lease_id, inflight = leases.acquire(60, capacity=100, ttl=60)
+        self.assertIsNotNone(lease_id)
+        self.assertEqual(leases.acquire(60, capacity=100, ttl=60), (None, 120))
+
+        leases.release(lease_id)
+        self.assertIsNotNone(leases.acquire(60, capacity=100, ttl=60)[0])
+        self.assertEqual(leases.get_inflight(), 60)
+
+    def test_lease_bigger_than_capacity_admitted_when_idle(self):
+        leases = MmapLeaseTable(self.path, slots=4)
+
+        self.assertIsNotNone(leases.acquire(150, capacity=100, ttl=60)[0])
+        self.assertIsNone(leases.acquire(1, capacity=100, ttl=60)[0])
+
+    def test_full_table_denies_leases(self):
+        leases = MmapLeaseTable(self.path, slots=2)
+        leases.acquire(1, capacity=100, ttl=60)
+        leases.acquire(1, capacity=100, ttl=60)
+
+        self.assertEqual(leases.acquire(1, capacity=100, ttl=60), (None, 3))
+
+    def test_lease_expired_mid_request(self):
+        leases = MmapLeaseTable(self.path, slots=1)
+        expired_lease_id, _ = leases.acquire(60, capacity=100, ttl=60)
+
+        with patch("api.admission.time.time", return_value=time.time() + 61):
+            self.assertEqual(leases.get_inflight(), 0)
+            # The expired lease's slot is taken over, releasing the expired lease later leaves it alone
+            lease_id, _ = leases.acquire(70, capacity=100, ttl=60)
+            self.assertIsNotNone(lease_id)
+            leases.release(expired_lease_id)
+            self.assertEqual(leases.get_inflight(), 70)
+
+    def test_leases_shared_between_processes(self):
+        process = multiprocessing.get_context("fork").Process(target=acquire_lease, args=(self.path, 80))
+        process.start()
+        process.join()
+
+        leases = MmapLeaseTable(self.path, slots=4)
+        self.assertEqual(leases.get_inflight(), 80)
+        self.assertIsNone(leases.acquire(30, capacity=100, ttl=60)[0])
+
+
+class CacheSlidingWindowBackendTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_previous_window_weighted_by_overlap(self):
+        backend = CacheSlidingWindowBackend()
+        window_start = (time.time() // 10 + 1) * 10
+
+        with patch("api.throttling.time.time", return_value=window_start - 1):
+            self.assertEqual([backend.hit("client", 4, 10)[0] for _ in range(5)], [True] * 4 + [False])
+        with patch("api.throttling.time.time", return_value=window_start + 5):
+            # Half of the 4 previous requests still in the sliding window
+            self.assertEqual([backend.hit("client", 4, 10)[0] for _ in range(3)], [True, True, False])
+            allowed, wait = backend.hit("client", 4, 10)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 2.5)
+
+
+@override_settings(RATE_LIMIT_BACKEND="api.throttling.CacheSlidingWindowBackend")
+class SharedAnonRateThrottleTests(SimpleTestCase):
+    class Throttle(SharedAnonRateThrottle):
+        rate = "2/min"
+
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().get("/")
+        self.request.user = None
+
+    def test_requests_over_rate_throttled(self):
+        allowed = [self.Throttle().allow_request(self.request, None) for _ in range(3)]
+
+        self.assertEqual(allowed, [True, True, False])
+        throttle = self.Throttle()
+        throttle.allow_request(self.request, None)
+        self.assertGreater(throttle.wait(), 0)
+
+    def test_backend_without_hit_cant_be_created(self):
+        class IncompleteBackend(RateLimitBackend):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
 
-# Create your tests here.
+    def test_request_allowed_when_backend_fails(self):
+        with patch.object(CacheSlidingWindowBackend, "hit", side_effect=ConnectionError("down")):
+            self.assertTrue(self.Throttle().allow_request(self.request, None))
@@ -0,0 +1,188 @@
+# Standard Library
+import abc
+import fcntl
+import functools
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+# Django
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+# Third Parties
+from rest_framework.throttling import AnonRateThrottle
+
+logger = logging.getLogger("main_logger")
+
+
+class RateLimitBackend(abc.ABC):
+    """Rate limit counters shared by every worker enforcing the limits."""
+
+    @abc.abstractmethod
+    def hit(self, key: str, limit: int, duration: float) -> tuple[bool, float]:
+        """Count a request against `limit` requests per `duration` seconds.
+
+        Returns:
+            tuple[bool, float]: Whether the request is allowed & the seconds to
+                wait before the next one is allowed when it isn't
+        """
+
+
+class MmapTokenBucketBackend(RateLimitBackend):
+    """Token buckets kept in a memory-mapped file shared by the workers of a
+    host.
+
+    The file is a fixed table of `(key hash, tokens, updated_at)` slots
+    split in groups of `GROUP_SIZE`, a key lives in the group its hash maps
+    to. A group is locked with `fcntl` across processes & with a thread lock
+    within a process, a key missing from a full group takes the least
+    recently updated slot of the group.
+    """
+
+    SLOT = struct.Struct("<Qdd")
+    GROUP_SIZE = 8
+
+    def __init__(self, path: str | None = None, slots: int | None = None) -> None:
+        self.path = path or settings.RATE_LIMIT_MMAP_PATH
+        self.groups = max(1, (slots or settings.RATE_LIMIT_MMAP_SLOTS) // self.GROUP_SIZE)
+        self.group_bytes = self.GROUP_SIZE * self.SLOT.size
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+        self._memory: mmap.mmap | None = None
+
+    def _open(self) -> None:
+        size = self.groups * self.group_bytes
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._memory = mmap.mmap(fd, size)
+        self._fd = fd
+
+    @staticmethod
+    def get_key_hash(key: str) -> int:
+        # 0 marks empty slots
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _find_slot(self, group_offset: int, key_hash: int, limit: int, now: float) -> tuple[int, float, float]:
+        """Return the offset, tokens & update time of the key's slot, a new
+        slot starts with a full bucket."""
+        free_offset, free_updated_at = group_offset, math.inf
+        for index in range(self.GROUP_SIZE):
+            offset = group_offset + index * self.SLOT.size
+            slot_key_hash, tokens, updated_at = self.SLOT.unpack_from(self._memory, offset)
+            if slot_key_hash == key_hash:
+                return offset, tokens, updated_at
+            # Empty slots first, then the least recently updated one
+            updated_at = updated_at if slot_key_hash else -math.inf
+            if updated_at < free_updated_at:
+                free_offset, free_updated_at = offset, updated_at
+        return free_offset, float(limit), now
+
+    def hit(self, key: str, limit: int, duration: float) -> tuple[bool, float]:
+        key_hash = self.get_key_hash(key)
+        group_offset = (key_hash % self.groups) * self.group_bytes
+        refill_rate = limit / duration
+        with self._lock:
+            if self._memory is None:
+                self._open()
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.group_bytes, group_offset)
+            try:
+                now = time.time()
+                offset, tokens, updated_at = self._find_slot(group_offset, key_hash, limit, now)
+                tokens = min(float(limit), tokens + max(now - updated_at, 0.0) * refill_rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                self.SLOT.pack_into(self._memory, offset, key_hash, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.group_bytes, group_offset)
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_rate
+
+
+class CacheSlidingWindowBackend(RateLimitBackend):
+    """Sliding window counters kept in the `RATE_LIMIT_CACHE` cache, shared by
+    every replica when it's a network store (e.g. `rediscache://`).
+
+    Requests are counted per fixed window with atomic increments, the count
+    of the previous window is weighted by how much of it still overlaps the
+    sliding window. Denied requests aren't counted.
+    """
+
+    KEY = "throttle:{key}:{window}"
+
+    def __init__(self, cache_alias: str | None = None) -> None:
+        self.cache = caches[cache_alias or settings.RATE_LIMIT_CACHE]
+
+    def _increment(self, key: str, timeout: int) -> int:
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 0, timeout=timeout)
+            return self.cache.incr(key)
+
+    def hit(self, key: str, limit: int, duration: float) -> tuple[bool, float]:
+        now = time.time()
+        window, elapsed = divmod(now / duration, 1)
+        current_key = self.KEY.format(key=key, window=int(window))
+        count = self._increment(current_key, timeout=math.ceil(duration * 2) + 1)
+        previous_count = self.cache.get(self.KEY.format(key=key, window=int(window) - 1)) or 0
+        if previous_count * (1 - elapsed) + count <= limit:
+            return True, 0.0
+
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            # Window expired in the meantime
+            pass
+        count -= 1
+        if count + 1 <= limit:
+            # Allowed once the previous window overlaps less of the sliding window
+            allowed_at = 1 - (limit - count - 1) / previous_count
+        else:
+            # Allowed once this window became the previous one & overlaps less
+            allowed_at = 2 - (limit - 1) / count
+        return False, max(allowed_at - elapsed, 0.0) * duration
+
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limit_backend(backend_path: str) -> RateLimitBackend:
+    return import_string(backend_path)()
+
+
+class SharedRateThrottleMixin:
+    """Count throttled requests in the `RATE_LIMIT_BACKEND` shared by all the
+    workers instead of each worker's own cache.
+
+    Requests are let through when the backend fails, rate limits shouldn't
+    take the service down with them.
+    """
+
+    def allow_request(self, request, view) -> bool:
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        try:
+            backend = get_rate_limit_backend(settings.RATE_LIMIT_BACKEND)
+            allowed, self.wait_seconds = backend.hit(self.key, self.num_requests, self.duration)
+        except Exception as exc:
+            logger.warning(f"Exception occurred while checking rate limit, request allowed: {exc}")
+            return True
+        return allowed
+
+    def wait(self) -> float | None:
+        return getattr(self, "wait_seconds", None)
+
+
+class SharedAnonRateThrottle(SharedRateThrottleMixin, AnonRateThrottle):
+    """`AnonRateThrottle` enforced across all workers & replicas."""
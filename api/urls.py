@@ -2,21 +2,25 @@
 from django.urls import include, path
 
 # Third Parties
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
 
 # Face Embeddings
-from api.views import HealthCheckView
+from api.views import (
+    HealthCheckView,
+    LivenessCheckView,
+    MemoryMetricsView,
+    OpenAPISchemaView,
+)
 
 urlpatterns = [
     path("health-check/", HealthCheckView.as_view(), name="health-check"),
+    path("health-check/live/", LivenessCheckView.as_view(), name="liveness-check"),
+    path("health-check/ready/", HealthCheckView.as_view(), name="readiness-check"),
+    path("metrics/memory/", MemoryMetricsView.as_view(), name="memory-metrics"),
     # Collections
     path("face-image/", include("face_images.urls")),
     # API Doc Schema
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("schema/", OpenAPISchemaView.as_view(), name="schema"),
     path("schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
     path("schema/swagger-ui/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
 ]
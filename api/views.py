@@ -2,32 +2,51 @@
 import logging
 
 # Django
-from django.core.exceptions import RequestAborted
-from django.db import connection
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 
 # Third Parties
 from drf_spectacular.utils import extend_schema
-from rest_framework import status
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework import serializers, status
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+# Face Embeddings
+from api.health import HealthProbe
+from api.memory import MemoryWatchdog
+from api.schema import OpenAPISchemaArtifact
+
 logger = logging.getLogger("main_logger")
 
 
-class HealthCheckView(APIView):
+class LivenessCheckView(APIView):
     authentication_classes: list = []
     permission_classes = [AllowAny]
+    throttle_classes: list = []
     http_method_names = ["get"]
 
-    def _check_db(self):
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1;")
-                logger.info("Database working.")
-        except Exception as error:
-            logger.critical(f"Can't connect to db. [Reason: {error}]", exc_info=True)
-            raise RequestAborted("Database failure!")
+    @extend_schema(
+        auth=[],
+        operation_id="Liveness-Check",
+        tags=["Health Check"],
+        responses={200: {}},
+    )
+    def get(self, request, *args, **kwargs):
+        """Validate Service process is alive, it doesn't check any
+        component."""
+        return Response(status=status.HTTP_200_OK)
+
+
+class HealthCheckView(APIView):
+    authentication_classes: list = []
+    permission_classes = [AllowAny]
+    throttle_classes: list = []
+    http_method_names = ["get"]
 
     @extend_schema(
         auth=[],
@@ -36,12 +55,73 @@ class HealthCheckView(APIView):
         responses={200: {}},
     )
     def get(self, request, *args, **kwargs):
-        """Validate Service Health-check & its components."""
-        try:
-            logger.info("Starting health-check.")
-            self._check_db()
-            logger.info("health-check passed")
-            return Response(status=status.HTTP_200_OK)
-        except Exception as error:
-            error_response = {"error": {"message": error.args[0], "extra": None}}
-            return Response(error_response, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        """Validate Service readiness & its components from the background
+        refreshed health probe."""
+        HealthProbe.ensure_started()
+        is_ready, components = HealthProbe.snapshot()
+        if is_ready:
+            return Response({"components": components}, status=status.HTTP_200_OK)
+        logger.warning(f"health-check failed: {components}")
+        error_response = {"error": {"message": "Service isn't ready!", "extra": components}}
+        return Response(error_response, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class MemoryMetricsView(APIView):
+    http_method_names = ["get"]
+
+    class WorkerSerializer(serializers.Serializer):
+        worker = serializers.CharField()
+        host = serializers.CharField()
+        pid = serializers.IntegerField()
+        rss_mb = serializers.FloatField(allow_null=True)
+        peak_rss_mb = serializers.FloatField(allow_null=True)
+        requests = serializers.IntegerField()
+        last_request_peak_mb = serializers.FloatField(allow_null=True)
+        max_request_peak_mb = serializers.FloatField(allow_null=True)
+        recycling = serializers.BooleanField()
+        updated_at = serializers.FloatField()
+
+    class OutputSerializer(serializers.Serializer):
+        workers = serializers.ListField()
+        recycles = serializers.IntegerField()
+
+    @extend_schema(
+        operation_id="Memory-Metrics",
+        tags=["Health Check"],
+        responses={200: OutputSerializer},
+    )
+    def get(self, request, *args, **kwargs):
+        """Retrieve the RSS & request memory peaks of each worker and the
+        number of workers recycled by the memory watchdog."""
+        MemoryWatchdog.publish()
+        metrics = MemoryWatchdog.get_metrics()
+        response_serializer = self.OutputSerializer(
+            {"workers": self.WorkerSerializer(metrics["workers"], many=True).data, "recycles": metrics["recycles"]}
+        )
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+
+class OpenAPISchemaView(SpectacularAPIView):
+    """Serve the OpenAPI schema artifact built by the `build_openapi_schema`
+    command, revalidated by ETag. The schema is only generated per request
+    in DEBUG when no artifact is built."""
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        artifact = OpenAPISchemaArtifact.load(renderer.format)
+        if artifact is None:
+            if settings.DEBUG:
+                return super().get(request, *args, **kwargs)
+            raise NotFound("OpenAPI schema isn't built, run the `build_openapi_schema` command.")
+
+        content, etag = artifact
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=renderer.media_type)
+            response["Content-Disposition"] = f'inline; filename="{self._get_filename(request, None)}"'
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
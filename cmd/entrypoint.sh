@@ -1,14 +1,23 @@
 #!/bin/bash
 
 
-echo "Step [1/4] Collecting static files .."
+echo "Step [1/7] Collecting static files .."
 python manage.py collectstatic --noinput
 
-echo "Step [2/4] Applying database migrations .."
+echo "Step [2/7] Building OpenAPI schema .."
+python manage.py build_openapi_schema
+
+echo "Step [3/7] Applying database migrations .."
 python manage.py migrate --noinput
 
-echo "Step [3/4] Seeding database .."
+echo "Step [4/7] Creating cache tables .."
+python manage.py createcachetable
+
+echo "Step [5/7] Creating face image partitions .."
+python manage.py create_face_image_partitions
+
+echo "Step [6/7] Seeding database .."
 python manage.py loaddata config/fixtures/super_users.json
 
-echo "Step [4/4] Starting server"
-gunicorn config.wsgi:application --bind 0.0.0.0:8000 --reload --timeout 90 --log-level debug  --workers=5 --threads=5 --worker-class=gthread
+echo "Step [7/7] Starting server"
+gunicorn config.wsgi:application --config config/gunicorn.conf.py --bind 0.0.0.0:8000 --reload --timeout 90 --graceful-timeout 90 --log-level debug  --workers=5 --threads=5 --worker-class=gthread
@@ -0,0 +1,157 @@
+# Standard Library
+import ipaddress
+import logging
+import os
+import socket
+import threading
+from urllib.parse import urljoin
+
+# Django
+from django.conf import settings
+
+# Third Parties
+import urllib3
+
+logger = logging.getLogger("main_logger")
+
+
+class RemoteFileError(Exception):
+    """Remote file can't be fetched or is refused by the fetch policy."""
+
+
+class RemoteFileFetcher:
+    """Download remote files through a pooled, keep-alive HTTP client.
+
+    Connections are kept per host, at most `REMOTE_FETCH_MAXSIZE_PER_HOST`
+    at once (further requests wait for a free one), so a batch of URLs on
+    the same host reuses a few connections instead of opening one each.
+    The pool is created lazily once per process, workers forked by
+    gunicorn never share sockets.
+
+    Only `REMOTE_FETCH_ALLOWED_SCHEMES` are fetched. When
+    `REMOTE_FETCH_ALLOWED_HOSTS` is set only these hosts are fetched,
+    otherwise hosts resolving to private, loopback or link-local addresses
+    are refused, and the request connects to the checked address with the
+    original Host & TLS server name, so the host can't resolve to another
+    address between the check and the connection (DNS rebinding).
+    Redirects are followed manually so each hop is checked.
+    """
+
+    _lock = threading.Lock()
+    _pool_manager: urllib3.PoolManager | None = None
+    _pool_manager_pid: int | None = None
+
+    @classmethod
+    def get_pool_manager(cls) -> urllib3.PoolManager:
+        if cls._pool_manager is None or cls._pool_manager_pid != os.getpid():
+            with cls._lock:
+                if cls._pool_manager is None or cls._pool_manager_pid != os.getpid():
+                    cls._pool_manager = urllib3.PoolManager(
+                        num_pools=settings.REMOTE_FETCH_NUM_POOLS,
+                        maxsize=settings.REMOTE_FETCH_MAXSIZE_PER_HOST,
+                        block=True,
+                        timeout=urllib3.Timeout(
+                            connect=settings.REMOTE_FETCH_CONNECT_TIMEOUT, read=settings.REMOTE_FETCH_READ_TIMEOUT
+                        ),
+                        retries=urllib3.Retry(total=settings.REMOTE_FETCH_RETRIES, redirect=False, backoff_factor=0.2),
+                    )
+                    cls._pool_manager_pid = os.getpid()
+        return cls._pool_manager
+
+    @staticmethod
+    def check_url(url: str) -> str | None:
+        """Raise `RemoteFileError` when the URL isn't allowed by the fetch
+        policy.
+
+        Returns:
+            str | None: Checked address to connect to, None for allowed hosts
+        """
+        try:
+            parsed_url = urllib3.util.parse_url(url)
+        except urllib3.exceptions.LocationParseError as exc:
+            raise RemoteFileError(f"URL is invalid: {exc}")
+        if parsed_url.scheme not in settings.REMOTE_FETCH_ALLOWED_SCHEMES:
+            raise RemoteFileError(f"URL scheme {parsed_url.scheme} isn't allowed.")
+        if not parsed_url.host:
+            raise RemoteFileError("URL has no host.")
+
+        allowed_hosts = settings.REMOTE_FETCH_ALLOWED_HOSTS
+        if allowed_hosts:
+            if parsed_url.host not in allowed_hosts:
+                raise RemoteFileError(f"Host {parsed_url.host} isn't allowed.")
+            return None
+
+        try:
+            addresses = [info[4][0] for info in socket.getaddrinfo(parsed_url.host, parsed_url.port or None)]
+        except (socket.gaierror, UnicodeError) as exc:
+            raise RemoteFileError(f"Host {parsed_url.host} can't be resolved: {exc}")
+        for address in addresses:
+            ip_address = ipaddress.ip_address(address.split("%")[0])
+            if not ip_address.is_global:
+                raise RemoteFileError(f"Host {parsed_url.host} resolves to the non-public address {address}.")
+        return addresses[0]
+
+    def _request(self, url: str, address: str | None) -> urllib3.HTTPResponse:
+        """Send the GET request, to `address` when given instead of
+        resolving the host again."""
+        if address is None:
+            return self.get_pool_manager().request("GET", url, preload_content=False, redirect=False)
+
+        parsed_url = urllib3.util.parse_url(url)
+        pool_kwargs = {"server_hostname": parsed_url.host} if parsed_url.scheme == "https" else None
+        pool = self.get_pool_manager().connection_from_host(
+            address, port=parsed_url.port, scheme=parsed_url.scheme, pool_kwargs=pool_kwargs
+        )
+        return pool.urlopen(
+            "GET",
+            parsed_url.request_uri,
+            headers={"Host": parsed_url.netloc},
+            preload_content=False,
+            redirect=False,
+            assert_same_host=False,
+        )
+
+    def fetch(self, url: str) -> bytes:
+        """Download a file, refusing it once it's bigger than
+        `REMOTE_FETCH_MAX_BYTES`.
+
+        Args:
+            url (str): http(s) URL of the file
+
+        Returns:
+            bytes: File content
+        """
+        max_bytes = settings.REMOTE_FETCH_MAX_BYTES
+        for _ in range(settings.REMOTE_FETCH_MAX_REDIRECTS + 1):
+            address = self.check_url(url)
+            try:
+                response = self._request(url, address)
+            except urllib3.exceptions.HTTPError as exc:
+                raise RemoteFileError(f"Request failed: {exc}")
+
+            try:
+                if response.get_redirect_location():
+                    url = urljoin(url, response.get_redirect_location())
+                    response.drain_conn()
+                    continue
+                if response.status != 200:
+                    response.drain_conn()
+                    raise RemoteFileError(f"Unexpected response status {response.status}.")
+                content_length = response.headers.get("Content-Length")
+                if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                    response.close()
+                    raise RemoteFileError(f"File is bigger than {max_bytes} bytes.")
+
+                content = bytearray()
+                for chunk in response.stream(64 * 1024):
+                    content += chunk
+                    if len(content) > max_bytes:
+                        # Unread data can't stay on a pooled connection
+                        response.close()
+                        raise RemoteFileError(f"File is bigger than {max_bytes} bytes.")
+                return bytes(content)
+            except urllib3.exceptions.HTTPError as exc:
+                raise RemoteFileError(f"Request failed: {exc}")
+            finally:
+                response.release_conn()
+        raise RemoteFileError("Too many redirects.")
@@ -0,0 +1,41 @@
+# Standard Library
+import os
+import tempfile
+
+# Django
+from django.core.files.storage import FileSystemStorage
+
+
+class AtomicFileSystemStorage(FileSystemStorage):
+    """File system storage for content-addressed names.
+
+    Names are expected to be unique by content, so saving never probes for
+    an available name and an existing file is replaced with the same
+    bytes. Content is written into a temporary file in the target
+    directory and moved into place with an atomic rename, so readers never
+    see a partially written file.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temporary_file:
+                for chunk in content.chunks():
+                    temporary_file.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+            os.chmod(temporary_path, self.file_permissions_mode or 0o644)
+            os.replace(temporary_path, full_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        # Ensure the saved path is always relative to the storage root.
+        name = os.path.relpath(full_path, self.location)
+        return str(name).replace("\\", "/")
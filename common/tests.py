@@ -1,4 +1,99 @@
+# Standard Library
+import ipaddress
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import PropertyMock, patch
+
 # Django
-from django.test import TestCase  # noqa: F401
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+
+# Face Embeddings
+from common.http import RemoteFileError, RemoteFileFetcher
+from common.storage import AtomicFileSystemStorage
+
+
+class AtomicFileSystemStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.storage = AtomicFileSystemStorage(location=self.location)
+
+    def tearDown(self):
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def test_save_creates_sharded_directories(self):
+        name = self.storage.save("ab/cd/abcd.png", ContentFile(b"image"))
+
+        self.assertEqual(name, "ab/cd/abcd.png")
+        with open(os.path.join(self.location, name), "rb") as stored_file:
+            self.assertEqual(stored_file.read(), b"image")
+
+    def test_save_same_name_is_idempotent(self):
+        first_name = self.storage.save("ab/cd/abcd.png", ContentFile(b"image"))
+        second_name = self.storage.save("ab/cd/abcd.png", ContentFile(b"image"))
+
+        self.assertEqual(first_name, second_name)
+        self.assertEqual(os.listdir(os.path.join(self.location, "ab", "cd")), ["abcd.png"])
+
+
+class HostEchoRequestHandler(BaseHTTPRequestHandler):
+    """Answer with the Host header the request was sent with."""
+
+    def do_GET(self):
+        body = self.headers["Host"].encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RemoteFileFetcherTests(SimpleTestCase):
+    @override_settings(REMOTE_FETCH_ALLOWED_HOSTS=[])
+    def test_check_url_refuses_private_addresses(self):
+        with self.assertRaisesMessage(RemoteFileError, "non-public address"):
+            RemoteFileFetcher.check_url("http://127.0.0.1/face.jpg")
+
+    def test_check_url_refuses_scheme(self):
+        with self.assertRaisesMessage(RemoteFileError, "URL scheme file isn't allowed."):
+            RemoteFileFetcher.check_url("file:///etc/passwd")
+
+    @override_settings(REMOTE_FETCH_ALLOWED_HOSTS=["images.example.com"])
+    def test_check_url_allowed_hosts(self):
+        RemoteFileFetcher.check_url("https://images.example.com/face.jpg")
+        with self.assertRaisesMessage(RemoteFileError, "Host other.example.com isn't allowed."):
+            RemoteFileFetcher.check_url("https://other.example.com/face.jpg")
+
+    def test_check_url_refuses_invalid_url(self):
+        with self.assertRaisesMessage(RemoteFileError, "URL is invalid"):
+            RemoteFileFetcher.check_url("http://images.example.com:99999/face.jpg")
+
+    @override_settings(REMOTE_FETCH_ALLOWED_HOSTS=[], REMOTE_FETCH_RETRIES=0)
+    def test_fetch_connects_to_checked_address(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), HostEchoRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        port = server.server_port
+        # The host resolves to the server when checked, then rebinds to an address nothing listens on
+        resolved = [("127.0.0.1", port), ("127.0.0.2", port)]
+
+        def getaddrinfo(host, port, *args, **kwargs):
+            if host == "images.example.com":
+                address = resolved.pop(0) if len(resolved) > 1 else resolved[0]
+            else:
+                address = (host, port)
+            return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", address)]
+
+        with patch("socket.getaddrinfo", side_effect=getaddrinfo), patch.object(
+            ipaddress.IPv4Address, "is_global", new_callable=PropertyMock, return_value=True
+        ):
+            content = RemoteFileFetcher().fetch(f"http://images.example.com:{port}/face.jpg")
 
-# Create your tests here.
+        self.assertEqual(content, f"images.example.com:{port}".encode())
@@ -0,0 +1,16 @@
+"""Gunicorn settings for config project.
+
+Loaded with `gunicorn --config config/gunicorn.conf.py`, server options
+stay on the command line.
+"""
+
+
+def post_worker_init(worker):
+    """Refresh the health checks once & start the background probe before
+    the worker accepts requests, so a new worker is ready from its first
+    readiness probe."""
+    # Face Embeddings
+    from api.health import HealthProbe
+
+    HealthProbe.refresh()
+    HealthProbe.ensure_started()
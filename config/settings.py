@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 
 # Standard Library
 import os
+import tempfile
 from pathlib import Path
 
 # Django
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     # Local Apps
+    "api",
     "face_images",
     # 3rd party
     "rest_framework",
@@ -62,6 +64,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django_guid.middleware.guid_middleware",
+    "api.middleware.RequestProfilingMiddleware",
+    "api.middleware.MemoryWatchdogMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,6 +74,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "request_logging.middleware.LoggingMiddleware",
+    "api.middleware.RequestTraceMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -150,6 +155,21 @@ STATIC_URL = "static/"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+DEFAULT_FILE_STORAGE = env.str("DEFAULT_FILE_STORAGE", default="common.storage.AtomicFileSystemStorage")
+"""Images are stored under content-addressed names, S3 storage must keep `AWS_S3_FILE_OVERWRITE` enabled."""
+FACE_IMAGE_STORAGE_POLICY = env.str("FACE_IMAGE_STORAGE_POLICY", default="original")
+"""What is kept of each new upload: `original` keeps the whole upload, `crop` only a face crop of the encoded
+face and `none` nothing, rows stored without image can't be re-encoded."""
+FACE_CROP_PADDING = env.float("FACE_CROP_PADDING", default=0.5)
+"""Margin added on each side of the face box, as a fraction of the box size."""
+FACE_CROP_MAX_DIMENSION = env.int("FACE_CROP_MAX_DIMENSION", default=512)
+"""Longest side of the stored crops, larger crops are downscaled."""
+FACE_CROP_JPEG_QUALITY = env.int("FACE_CROP_JPEG_QUALITY", default=90)
+FACE_IMAGE_COLD_STORAGE = env.str("FACE_IMAGE_COLD_STORAGE", default="")
+"""Storage class keeping the originals of uploads under the `crop` & `none` policies (e.g. an S3 storage with an
+archive storage class), empty keeps no original."""
+FACE_IMAGE_COLD_STORAGE_OPTIONS = env.json("FACE_IMAGE_COLD_STORAGE_OPTIONS", default={})
+"""Keyword arguments of the cold storage class, e.g. `{"location": "/mnt/cold"}`."""
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -161,12 +181,12 @@ REST_FRAMEWORK = {
         "api.authenticate.ApiKeyAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
-        "rest_framework_api_key.permissions.HasAPIKey",
+        "api.authenticate.HasAnyAPIKey",
     ],
     "DATETIME_FORMAT": DATETIME_FORMAT,
     "DATETIME_INPUT_FORMATS": DATETIME_INPUT_FORMATS,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
+        "api.throttling.SharedAnonRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10/sec"},
     "DEFAULT_RENDERER_CLASSES": ("api.renderers.APIRenderer",),
@@ -174,6 +194,195 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Face encoding pipeline
+FACE_DETECTION_MODEL = env.str("FACE_DETECTION_MODEL", default="hog")
+"""Face detection model, `hog` or `cnn`."""
+FACE_DETECTION_UPSAMPLE = env.int("FACE_DETECTION_UPSAMPLE", default=1)
+FACE_LANDMARK_MODEL = env.str("FACE_LANDMARK_MODEL", default="small")
+"""Landmark model used for encoding, `small` (5 points) or `large` (68 points)."""
+FACE_ENCODING_NUM_JITTERS = env.int("FACE_ENCODING_NUM_JITTERS", default=1)
+FACE_ENCODING_TIERS = {
+    "fast": {
+        "detection_model": "hog",
+        "upsample": 0,
+        "landmark_model": "small",
+        "num_jitters": 1,
+        "max_dimension": env.int("FACE_FAST_TIER_MAX_DIMENSION", default=640),
+    },
+    "balanced": {
+        "max_dimension": env.int("FACE_BALANCED_TIER_MAX_DIMENSION", default=None),
+    },
+    "accurate": {
+        "detection_model": env.str("FACE_ACCURATE_TIER_DETECTION_MODEL", default="cnn"),
+        "upsample": 1,
+        "landmark_model": "large",
+        "num_jitters": env.int("FACE_ACCURATE_TIER_NUM_JITTERS", default=10),
+        "max_dimension": None,
+    },
+}
+"""Encoding configuration per quality/latency tier, missing keys fall back to the FACE_* settings above.
+`max_dimension` bounds the longest image side used for detection, None keeps the full image."""
+FACE_ENCODING_DEFAULT_TIER = env.str("FACE_ENCODING_DEFAULT_TIER", default="balanced")
+FACE_STATS_CHUNK_SIZE = env.int("FACE_STATS_CHUNK_SIZE", default=2000)
+"""Encodings fetched & merged at once by the encoding statistics."""
+
+# Pre-screening rejecting hopeless images before face detection
+FACE_PRESCREEN_ENABLED = env.bool("FACE_PRESCREEN_ENABLED", default=True)
+FACE_PRESCREEN_MIN_DIMENSION = env.int("FACE_PRESCREEN_MIN_DIMENSION", default=48)
+"""Shortest image side in pixels, smaller images can't hold a detectable face."""
+FACE_PRESCREEN_MAX_PIXELS = env.int("FACE_PRESCREEN_MAX_PIXELS", default=40_000_000)
+FACE_PRESCREEN_SAMPLE_SIZE = env.int("FACE_PRESCREEN_SAMPLE_SIZE", default=256)
+"""Longest side of the grayscale copy the contrast & sharpness are measured on."""
+FACE_PRESCREEN_MIN_CONTRAST = env.float("FACE_PRESCREEN_MIN_CONTRAST", default=8.0)
+"""Minimum standard deviation of the gray levels, blank frames are close to 0."""
+FACE_PRESCREEN_MIN_SHARPNESS = env.float("FACE_PRESCREEN_MIN_SHARPNESS", default=10.0)
+"""Minimum variance of the Laplacian, heavily blurred images are close to 0."""
+
+# Near-duplicate check reusing the stored face closest to a new encoding
+FACE_NEAR_DUPLICATE_ENABLED = env.bool("FACE_NEAR_DUPLICATE_ENABLED", default=False)
+FACE_NEAR_DUPLICATE_THRESHOLD = env.float("FACE_NEAR_DUPLICATE_THRESHOLD", default=0.3)
+"""Encoding distance of a near duplicate, well below the 0.6 tolerance telling two people apart."""
+FACE_NEAR_DUPLICATE_WINDOW_SIZE = env.int("FACE_NEAR_DUPLICATE_WINDOW_SIZE", default=5000)
+"""Most recent encodings compared per gallery & tier, 512 bytes each."""
+FACE_NEAR_DUPLICATE_MAX_WINDOWS = env.int("FACE_NEAR_DUPLICATE_MAX_WINDOWS", default=32)
+"""Galleries & tiers whose window is kept in each worker."""
+
+# Monthly `created_at` partitions of `face_image`
+FACE_IMAGE_PARTITIONS_AHEAD = env.int("FACE_IMAGE_PARTITIONS_AHEAD", default=3)
+"""Months of partitions created ahead of the current one."""
+FACE_IMAGE_RETENTION_DAYS = env.int("FACE_IMAGE_RETENTION_DAYS", default=365)
+"""Days face images are kept before their partition is purged."""
+
+# Remote files fetched by URL
+REMOTE_FETCH_ALLOWED_SCHEMES = env.list("REMOTE_FETCH_ALLOWED_SCHEMES", default=["http", "https"])
+REMOTE_FETCH_ALLOWED_HOSTS = env.list("REMOTE_FETCH_ALLOWED_HOSTS", default=[])
+"""Hosts files are fetched from, when empty any host with a public address is allowed."""
+REMOTE_FETCH_MAX_BYTES = env.int("REMOTE_FETCH_MAX_BYTES", default=10 * 1024 * 1024)
+REMOTE_FETCH_CONNECT_TIMEOUT = env.float("REMOTE_FETCH_CONNECT_TIMEOUT", default=3)
+REMOTE_FETCH_READ_TIMEOUT = env.float("REMOTE_FETCH_READ_TIMEOUT", default=10)
+REMOTE_FETCH_RETRIES = env.int("REMOTE_FETCH_RETRIES", default=2)
+REMOTE_FETCH_MAX_REDIRECTS = 3
+REMOTE_FETCH_NUM_POOLS = env.int("REMOTE_FETCH_NUM_POOLS", default=50)
+"""Hosts whose connections are kept alive at once."""
+REMOTE_FETCH_MAXSIZE_PER_HOST = env.int("REMOTE_FETCH_MAXSIZE_PER_HOST", default=4)
+"""Concurrent connections to a single host, other requests wait for a free one."""
+REMOTE_FETCH_WORKERS = env.int("REMOTE_FETCH_WORKERS", default=8)
+"""Downloads running at once for a single request."""
+FACE_IMAGE_URLS_MAX_COUNT = env.int("FACE_IMAGE_URLS_MAX_COUNT", default=50)
+"""Image URLs accepted by a single ingestion request."""
+
+# Time-series of face images per minute or hour, read from the status rollups
+FACE_IMAGE_TIMESERIES_DEFAULT_BUCKETS = 60
+FACE_IMAGE_TIMESERIES_MAX_BUCKETS = env.int("FACE_IMAGE_TIMESERIES_MAX_BUCKETS", default=1440)
+
+# Bulk lookup of face images by public_id
+FACE_IMAGE_BULK_MAX_IDS = env.int("FACE_IMAGE_BULK_MAX_IDS", default=1000)
+
+# Watching face images until their encoding finishes
+FACE_IMAGE_WATCH_MAX_IDS = env.int("FACE_IMAGE_WATCH_MAX_IDS", default=100)
+FACE_IMAGE_WATCH_MAX_TIMEOUT = env.int("FACE_IMAGE_WATCH_MAX_TIMEOUT", default=60)
+"""Seconds a watch connection is held at most, kept under the gunicorn worker timeout."""
+FACE_IMAGE_WATCH_POLL_INTERVAL = env.float("FACE_IMAGE_WATCH_POLL_INTERVAL", default=5)
+"""Seconds between DB checks & keep-alives when no notification arrives."""
+
+# Change feed of created & updated face images
+FACE_IMAGE_CHANGES_MAX_LIMIT = env.int("FACE_IMAGE_CHANGES_MAX_LIMIT", default=1000)
+FACE_IMAGE_CHANGES_MAX_TIMEOUT = env.int("FACE_IMAGE_CHANGES_MAX_TIMEOUT", default=30)
+FACE_IMAGE_CHANGES_POLL_INTERVAL = env.float("FACE_IMAGE_CHANGES_POLL_INTERVAL", default=1)
+
+# Request traces replayed by the `replay_request_trace` command
+REQUEST_TRACE_ENABLED = env.bool("REQUEST_TRACE_ENABLED", default=False)
+REQUEST_TRACE_PATH = os.path.join(BASE_DIR, "logs/request_trace.jsonl")
+REQUEST_TRACE_MAX_BODY_BYTES = env.int("REQUEST_TRACE_MAX_BODY_BYTES", default=4096)
+"""JSON bodies up to this size are kept in the trace, bigger ones & uploads only keep their size."""
+
+# On-demand request profiling
+REQUEST_PROFILING_ENABLED = env.bool("REQUEST_PROFILING_ENABLED", default=False)
+REQUEST_PROFILING_HEADER = "X-Profile-Request"
+REQUEST_PROFILING_SECRET = env.str("REQUEST_PROFILING_SECRET", default=SECRET_KEY)
+"""Key signing the profiling header, a request with a valid signature is profiled."""
+REQUEST_PROFILING_SIGNATURE_TTL = 300
+"""Seconds a profiling header signature stays valid."""
+REQUEST_PROFILING_SAMPLE_RATE = env.float("REQUEST_PROFILING_SAMPLE_RATE", default=0.0)
+"""Share of the requests profiled without a signed header, 0.01 profiles 1% of them."""
+REQUEST_PROFILING_DIR = env.str("REQUEST_PROFILING_DIR", default=os.path.join(BASE_DIR, "logs/profiles"))
+REQUEST_PROFILING_MAX_PROFILES = env.int("REQUEST_PROFILING_MAX_PROFILES", default=200)
+
+# Worker memory watchdog, recycles gunicorn workers whose RSS grew too large
+MEMORY_WATCHDOG_ENABLED = env.bool("MEMORY_WATCHDOG_ENABLED", default=True)
+MEMORY_WATCHDOG_MAX_RSS_MB = env.int("MEMORY_WATCHDOG_MAX_RSS_MB", default=2048)
+"""Worker RSS after a request above which the worker is recycled."""
+MEMORY_WATCHDOG_TRACKED_PATHS = env.list("MEMORY_WATCHDOG_TRACKED_PATHS", default=["/api/face-image/"])
+"""Path prefixes of the POST requests whose peak memory is measured."""
+MEMORY_WATCHDOG_PUBLISH_INTERVAL = env.float("MEMORY_WATCHDOG_PUBLISH_INTERVAL", default=10)
+"""Seconds between publications of the worker stats to the shared cache."""
+MEMORY_WATCHDOG_STATS_TTL = env.int("MEMORY_WATCHDOG_STATS_TTL", default=300)
+"""Seconds the stats of a worker that stopped publishing are kept."""
+MEMORY_WATCHDOG_CACHE = env.str("MEMORY_WATCHDOG_CACHE", default="shared")
+"""Cache the workers publish their stats to, the metrics endpoint reads all of them so it can't be process-local."""
+
+# Streamed list responses are flushed in chunks of this size
+STREAMING_RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# Cache
+# Use a shared backend (e.g. `rediscache://` or `filecache://`) in production so
+# state kept in the cache is visible to every worker and replica.
+# The `shared` cache holds state every worker must see to be correct, it can't be
+# process-local (`locmemcache://`, `dummycache://`), the `api.E001` check fails startup otherwise.
+CACHES = {
+    "default": env.cache_url("CACHE_URL", default="locmemcache://"),
+    "shared": env.cache_url("SHARED_CACHE_URL", default="dbcache://shared_cache"),
+}
+
+# Throttling counters shared by every worker
+RATE_LIMIT_BACKEND = env.str("RATE_LIMIT_BACKEND", default="api.throttling.MmapTokenBucketBackend")
+"""`api.throttling.MmapTokenBucketBackend` shares the limits between the workers of a host,
+`api.throttling.CacheSlidingWindowBackend` between every replica through `RATE_LIMIT_CACHE`."""
+RATE_LIMIT_MMAP_PATH = env.str(
+    "RATE_LIMIT_MMAP_PATH",
+    default=os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "face_embeddings_rate_limits"
+    ),
+)
+RATE_LIMIT_MMAP_SLOTS = env.int("RATE_LIMIT_MMAP_SLOTS", default=65536)
+"""Clients tracked at once, 24 bytes each."""
+RATE_LIMIT_CACHE = env.str("RATE_LIMIT_CACHE", default="default")
+
+# Idempotency-Key support for retried requests
+IDEMPOTENCY_HEADER_NAME = "Idempotency-Key"
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=24 * 60 * 60)
+"""Seconds a successful response is kept and replayed for retries using the same key."""
+IDEMPOTENCY_LOCK_TIMEOUT = env.int("IDEMPOTENCY_LOCK_TIMEOUT", default=90)
+"""Seconds an in-flight request holds its key, matches the gunicorn worker timeout."""
+IDEMPOTENCY_WAIT_TIMEOUT = env.float("IDEMPOTENCY_WAIT_TIMEOUT", default=30)
+"""Seconds a retry waits for the in-flight request before answering with 409."""
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+IDEMPOTENCY_CACHE = env.str("IDEMPOTENCY_CACHE", default="shared")
+"""Cache holding the keys & stored responses, retries reach other workers so it can't be process-local."""
+
+# Encode admission control, in-flight work is measured in image pixels across all workers of the host
+ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS = env.int("ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS", default=60_000_000)
+"""Pixels being encoded at once by all workers before new encode requests are shed with 429."""
+ENCODE_ADMISSION_LEASE_TTL = env.int("ENCODE_ADMISSION_LEASE_TTL", default=300)
+"""Seconds before the lease of an in-flight request expires, bounds work leaked by killed workers."""
+ENCODE_ADMISSION_MMAP_PATH = env.str(
+    "ENCODE_ADMISSION_MMAP_PATH",
+    default=os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "face_embeddings_admission"
+    ),
+)
+ENCODE_ADMISSION_MMAP_SLOTS = env.int("ENCODE_ADMISSION_MMAP_SLOTS", default=1024)
+"""Requests in flight at once on the host, 24 bytes each, requests past it are shed."""
+ENCODE_ADMISSION_INITIAL_THROUGHPUT = 4_000_000
+"""Pixels per second assumed for `Retry-After` until the real throughput is observed."""
+ENCODE_ADMISSION_MAX_RETRY_AFTER = 60
+
+# Health probe
+HEALTH_PROBE_INTERVAL = env.float("HEALTH_PROBE_INTERVAL", default=5)
+"""Seconds between background refreshes of the readiness checks."""
+HEALTH_PROBE_STALE_AFTER = env.float("HEALTH_PROBE_STALE_AFTER", default=30)
+"""Seconds after which readiness results are too old to be trusted."""
+
 # Enable Debug-toolbar
 if DEBUG:
     INSTALLED_APPS.append("debug_toolbar")
@@ -234,6 +443,7 @@ LOGGING = {
         "require_debug_true": {"()": "django.utils.log.RequireDebugTrue"},
     },
     "formatters": {
+        "trace": {"format": "%(message)s"},
         "default": {
             "format": "%(asctime)s - %(levelname)-5s [%(name)s] [%(correlation_id)s] %(process)d %(thread)d  %(message)s %(module)s ",
             "datefmt": DATETIME_FORMAT,
@@ -250,6 +460,14 @@ LOGGING = {
         },
     },
     "handlers": {
+        "request_trace": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "maxBytes": 100 * 1024 * 1024,  # 100 MB
+            "backupCount": 5,
+            "filename": REQUEST_TRACE_PATH,
+            "delay": True,
+            "formatter": "trace",
+        },
         "sql_file": {
             "class": "logging.handlers.RotatingFileHandler",
             "maxBytes": 20 * 1024 * 1024,  # 20 MB
@@ -314,6 +532,11 @@ LOGGING = {
         },
     },
     "loggers": {
+        "request_trace": {
+            "handlers": ["request_trace"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "django.db.backends": {
             "handlers": ["sql_file"],
             "level": "DEBUG",
@@ -332,6 +555,9 @@ LOGGING = {
     },
 }
 
+# OpenAPI schema artifacts built by the `build_openapi_schema` command
+OPENAPI_SCHEMA_DIR = env.str("OPENAPI_SCHEMA_DIR", default=os.path.join(BASE_DIR, "schema"))
+
 # For drf-spectacular docs: https://drf-spectacular.readthedocs.io/
 SPECTACULAR_SETTINGS = {
     "TITLE": "Face Embedding APIs",
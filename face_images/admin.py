@@ -1,4 +1,21 @@
 # Django
-from django.contrib import admin  # noqa: F401
+from django.contrib import admin
 
-# Register your models here.
+# Third Parties
+from rest_framework_api_key.admin import APIKeyModelAdmin
+
+# Face Embeddings
+from face_images.models import Gallery, GalleryAPIKey
+
+
+@admin.register(Gallery)
+class GalleryAdmin(admin.ModelAdmin):
+    list_display = ["name", "public_id", "face_image_count", "encoded_count", "created_at"]
+    readonly_fields = ["public_id", "face_image_count", "encoded_count", "encoding_sum"]
+    search_fields = ["name"]
+
+
+@admin.register(GalleryAPIKey)
+class GalleryAPIKeyAdmin(APIKeyModelAdmin):
+    list_display = [*APIKeyModelAdmin.list_display, "gallery"]
+    list_filter = [*APIKeyModelAdmin.list_filter, "gallery"]
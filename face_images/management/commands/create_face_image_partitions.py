@@ -0,0 +1,24 @@
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Face Embeddings
+from face_images.services import FaceImagePartitionService
+
+
+class Command(BaseCommand):
+    help = "Create the monthly face_image partitions ahead of time."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.FACE_IMAGE_PARTITIONS_AHEAD,
+            help="Months of partitions created after the current one.",
+        )
+
+    def handle(self, *args, **options):
+        created = FaceImagePartitionService.create_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Created partition {name}.")
+        self.stdout.write(self.style.SUCCESS(f"Face image partitions ready: {len(created)} created."))
@@ -0,0 +1,55 @@
+# Standard Library
+import os
+
+# Django
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+# Face Embeddings
+from face_images.models import Gallery
+from face_images.services import FaceEncodingDistanceExportService
+
+
+class Command(BaseCommand):
+    help = "Export the pairwise encoding distances of SUCCESS face images, or their nearest neighbors, tile by tile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Directory the .npy & .csv files are written into.")
+        parser.add_argument(
+            "--top-k", type=int, default=0, help="Nearest face images kept per face image, 0 exports the whole matrix."
+        )
+        parser.add_argument("--tile-size", type=int, default=2048, help="Rows & columns of the tiles computed at once.")
+        parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+        parser.add_argument("--niceness", type=int, default=10, help="Priority increment of pool workers.")
+        parser.add_argument("--gallery", default=None, help="Only export the face images of this gallery public_id.")
+        parser.add_argument("--tier", choices=list(settings.FACE_ENCODING_TIERS), default=None)
+
+    def handle(self, *args, **options):
+        if options["top_k"] < 0 or options["tile_size"] < 1:
+            raise CommandError("--top-k can't be negative and --tile-size must be positive.")
+        gallery = None
+        if options["gallery"]:
+            try:
+                gallery = Gallery.objects.get(public_id=options["gallery"])
+            except (Gallery.DoesNotExist, ValidationError):
+                raise CommandError(f"Gallery {options['gallery']} doesn't exist.")
+
+        try:
+            result = FaceEncodingDistanceExportService(
+                options["output_dir"],
+                top_k=options["top_k"],
+                tile_size=options["tile_size"],
+                workers=options["workers"],
+                niceness=options["niceness"],
+                gallery=gallery,
+                tier=options["tier"],
+            ).perform()
+        except ValidationError as exc:
+            raise CommandError(exc.messages[0])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported distances of {result['face_images']} face images in {result['tiles']} tiles: "
+                f"{', '.join(result['files'])} written into {options['output_dir']}."
+            )
+        )
@@ -0,0 +1,86 @@
+# Standard Library
+import logging
+import os
+
+# Django
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Face Embeddings
+from face_images.models import FaceImage
+from face_images.services import FaceImageEncodingService
+
+logger = logging.getLogger("main_logger")
+
+
+class Command(BaseCommand):
+    help = "Move stored face images into the content-addressed, sharded media layout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows updated per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be moved without moving it.")
+
+    def _migrate_face_image(self, face_image: FaceImage) -> str | None:
+        """Copy the image of a row into its content-addressed path, an image
+        already stored there has the same content & is reused.
+
+        Returns:
+            str | None: Old path to delete once the batch is committed
+        """
+        with default_storage.open(face_image.image_url) as image_file:
+            content_hash = FaceImageEncodingService.get_content_hash(image_file)
+            image_name = FaceImageEncodingService.get_image_name(content_hash, face_image.image_url)
+            image_path = os.path.join(settings.MEDIA_ROOT, image_name)
+            face_image.content_hash = content_hash
+            if image_path == face_image.image_url:
+                return None
+            if not self.dry_run and not default_storage.exists(image_path):
+                default_storage.save(image_path, image_file)
+
+        old_path, face_image.image_url = face_image.image_url, image_path
+        return old_path
+
+    def _migrate_batch(self, face_images: list[FaceImage]) -> tuple[int, int]:
+        old_paths, skipped = [], 0
+        for face_image in face_images:
+            try:
+                old_path = self._migrate_face_image(face_image)
+            except OSError as exc:
+                logger.warning(f"FaceImage: {face_image.public_id} image can't be migrated: {exc}")
+                skipped += 1
+                continue
+            if old_path:
+                old_paths.append(old_path)
+
+        if self.dry_run:
+            return len(old_paths), skipped
+
+        with transaction.atomic():
+            FaceImage.objects.bulk_update(face_images, ["image_url", "content_hash"])
+        # Rows of later batches may still point at the same flat file
+        referenced_paths = set(FaceImage.objects.filter(image_url__in=old_paths).values_list("image_url", flat=True))
+        for old_path in set(old_paths) - referenced_paths:
+            default_storage.delete(old_path)
+        return len(old_paths), skipped
+
+    def handle(self, *args, **options):
+        self.dry_run = options["dry_run"]
+        batch_size = options["batch_size"]
+        last_id, moved, skipped = 0, 0, 0
+
+        while True:
+            # Face crops are stored under the layout from the start, named after the hash of their original
+            face_images = FaceImage.objects.filter(id__gt=last_id, image_storage=FaceImage.STORAGE_ORIGINAL)
+            face_images = face_images.order_by("id")
+            face_images = list(face_images.only("id", "public_id", "image_url", "content_hash")[:batch_size])
+            if not face_images:
+                break
+            batch_moved, batch_skipped = self._migrate_batch(face_images)
+            moved += batch_moved
+            skipped += batch_skipped
+            last_id = face_images[-1].id
+            self.stdout.write(f"Processed up to id {last_id}: {moved} moved, {skipped} skipped.")
+
+        self.stdout.write(self.style.SUCCESS(f"Media layout migrated: {moved} moved, {skipped} skipped."))
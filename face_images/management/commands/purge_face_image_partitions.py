@@ -0,0 +1,37 @@
+# Standard Library
+from datetime import timedelta
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Face Embeddings
+from face_images.services import FaceImagePartitionService
+
+
+class Command(BaseCommand):
+    help = "Drop face_image partitions past the retention period and delete their images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retention-days", type=int, default=settings.FACE_IMAGE_RETENTION_DAYS)
+        parser.add_argument("--workers", type=int, default=4, help="Threads deleting images.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Images deleted per task.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be dropped without dropping it.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["retention_days"])
+        if options["dry_run"]:
+            partitions = FaceImagePartitionService.get_expired_partitions(cutoff)
+            self.stdout.write(f"Partitions older than {cutoff:%Y-%m-%d}: {', '.join(partitions) or 'none'}.")
+            return
+
+        result = FaceImagePartitionService.purge_partitions(
+            cutoff, workers=options["workers"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {len(result['partitions'])} partitions: {result['purged_rows']} rows, "
+                f"{result['deleted_images']} images deleted."
+            )
+        )
@@ -0,0 +1,164 @@
+# Standard Library
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Django
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+# Face Embeddings
+from face_images.models import FaceImage
+from face_images.services import (
+    FaceEncodingPipeline,
+    FaceImageReEncodingService,
+    GalleryService,
+)
+
+logger = logging.getLogger("main_logger")
+
+
+def _init_worker(niceness: int) -> None:
+    """Lower the priority of pool workers so the live API keeps the CPU."""
+    os.nice(niceness)
+
+
+def _reencode_face_image(face_image: FaceImage, pipeline: FaceEncodingPipeline) -> tuple[FaceImage, str | None]:
+    """Re-encode a face image in a pool worker without touching the DB.
+
+    FAILED rows and rows detected under other detection parameters are
+    detected again, other rows start from their cached face locations and
+    landmarks.
+    """
+    redetect = face_image.encoding_status == FaceImage.ENCODE_FAILED or pipeline.is_detection_stale(
+        face_image.encoding_params
+    )
+    try:
+        return FaceImageReEncodingService(face_image, pipeline=pipeline, redetect=redetect).encode(), None
+    except ValidationError as exc:
+        return face_image, exc.messages[0]
+
+
+class Command(BaseCommand):
+    help = "Re-encode FAILED face images and face images encoded under old encoding parameters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Rows selected & updated per batch.")
+        parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+        parser.add_argument(
+            "--tier",
+            choices=list(settings.FACE_ENCODING_TIERS),
+            default=None,
+            help="Only re-encode face images of this tier, all tiers are processed one after another by default.",
+        )
+        parser.add_argument("--num-jitters", type=int, default=None, help="Defaults to the jitters of the tier.")
+        parser.add_argument("--landmark-model", choices=["small", "large"], default=None)
+        parser.add_argument(
+            "--checkpoint",
+            default=os.path.join(settings.BASE_DIR, "logs", "reencode_face_images.checkpoint"),
+            help="File keeping the last processed id.",
+        )
+        parser.add_argument("--resume", action="store_true", help="Continue after the last checkpointed id.")
+        parser.add_argument("--max-rows-per-second", type=float, default=None, help="Upper bound of the rate.")
+        parser.add_argument(
+            "--max-load", type=float, default=None, help="Pause while the 1 minute load average per CPU is above it."
+        )
+        parser.add_argument("--niceness", type=int, default=10, help="Priority increment of pool workers.")
+
+    def _read_checkpoint(self, checkpoint_path: str, tier: str, params: dict) -> int:
+        try:
+            with open(checkpoint_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return 0
+        if checkpoint.get("tier") != tier or checkpoint["params"] != params:
+            self.stdout.write(self.style.WARNING(f"Checkpoint wasn't written for the {tier} tier, starting over."))
+            return 0
+        return checkpoint["last_id"]
+
+    @staticmethod
+    def _write_checkpoint(checkpoint_path: str, last_id: int, tier: str, params: dict) -> None:
+        temporary_path = f"{checkpoint_path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump({"tier": tier, "last_id": last_id, "params": params}, checkpoint_file)
+        os.replace(temporary_path, checkpoint_path)
+
+    @staticmethod
+    def _throttle(batch_started_at: float, batch_size: int, max_rows_per_second: float | None, max_load: float | None):
+        if max_rows_per_second:
+            remaining = batch_size / max_rows_per_second - (time.monotonic() - batch_started_at)
+            if remaining > 0:
+                time.sleep(remaining)
+        if max_load:
+            while os.getloadavg()[0] / (os.cpu_count() or 1) > max_load:
+                time.sleep(1)
+
+    def _reencode_tier(self, executor: ProcessPoolExecutor, pipeline: FaceEncodingPipeline, options: dict):
+        checkpoint_path = options["checkpoint"]
+        last_id = self._read_checkpoint(checkpoint_path, pipeline.tier, pipeline.params) if options["resume"] else 0
+        targets = (
+            FaceImage.objects.filter(
+                Q(encoding_status=FaceImage.ENCODE_FAILED) | ~Q(encoding_params=pipeline.params), tier=pipeline.tier
+            )
+            .exclude(failure_reason__in=FaceImage.PRESCREEN_FAILURE_REASONS)
+            .exclude(image_storage=FaceImage.STORAGE_NONE)
+            .order_by("id")
+        )
+        # The encoding is replaced anyway and DB buffers can't be sent to the workers
+        targets = targets.defer("face_encoding")
+        updated, failed = 0, 0
+
+        while True:
+            batch_started_at = time.monotonic()
+            face_images = list(targets.filter(id__gt=last_id)[: options["batch_size"]])
+            if not face_images:
+                break
+
+            results = list(executor.map(_reencode_face_image, face_images, [pipeline] * len(face_images)))
+            reencoded = []
+            for face_image, error_message in results:
+                if error_message:
+                    logger.warning(f"FaceImage: {face_image.public_id} can't be re-encoded: {error_message}")
+                    failed += 1
+                else:
+                    reencoded.append(face_image)
+
+            with transaction.atomic():
+                FaceImage.objects.bulk_update(reencoded, FaceImageReEncodingService.UPDATE_FIELDS)
+            updated += len(reencoded)
+            self.gallery_ids.update(face_image.gallery_id for face_image in reencoded if face_image.gallery_id)
+            last_id = face_images[-1].id
+            self._write_checkpoint(checkpoint_path, last_id, pipeline.tier, pipeline.params)
+            self.stdout.write(f"[{pipeline.tier}] Processed up to id {last_id}: {updated} re-encoded, {failed} failed.")
+            self._throttle(batch_started_at, len(face_images), options["max_rows_per_second"], options["max_load"])
+        return updated, failed
+
+    def handle(self, *args, **options):
+        tiers = [options["tier"]] if options["tier"] else list(settings.FACE_ENCODING_TIERS)
+        updated, failed = 0, 0
+        self.gallery_ids: set[int] = set()
+
+        # Workers are forked with the loaded models, they never use the inherited DB connection
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(options["niceness"],),
+        ) as executor:
+            for tier in tiers:
+                pipeline = FaceEncodingPipeline(
+                    tier=tier, num_jitters=options["num_jitters"], landmark_model=options["landmark_model"]
+                )
+                tier_updated, tier_failed = self._reencode_tier(executor, pipeline, options)
+                updated += tier_updated
+                failed += tier_failed
+
+        # Bulk updates bypass the per face image aggregate updates
+        GalleryService.refresh_aggregates(self.gallery_ids)
+        self.stdout.write(self.style.SUCCESS(f"Re-encoding finished: {updated} re-encoded, {failed} failed."))
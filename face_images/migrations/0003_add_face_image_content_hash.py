@@ -0,0 +1,18 @@
+# Generated by Django 4.1.10 on 2026-10-19 13:26
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0002_alter_image_url_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name="Content Hash"),
+        ),
+    ]
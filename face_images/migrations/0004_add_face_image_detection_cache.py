@@ -0,0 +1,33 @@
+# Generated by Django 4.1.10 on 2026-10-19 13:29
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0003_add_face_image_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="face_landmarks",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Landmark points of the encoded face per landmark model.",
+                verbose_name="Face Landmarks",
+            ),
+        ),
+        migrations.AddField(
+            model_name="faceimage",
+            name="face_locations",
+            field=models.JSONField(
+                blank=True,
+                help_text="Detected face boxes in (top, right, bottom, left) order, null until detection runs.",
+                null=True,
+                verbose_name="Face Locations",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.10 on 2026-10-19 13:30
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0004_add_face_image_detection_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="encoding_params",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Pipeline parameters the face was encoded with.",
+                verbose_name="Encoding Parameters",
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Standard Library
+import uuid
+
+# Django
+from django.db import migrations, models
+
+# Rebuild `face_image` as a table partitioned by month on `created_at`, with a
+# default partition catching rows outside of the created partitions. Postgres
+# requires the partition key in every unique constraint, so the primary key
+# becomes (id, created_at) and `public_id` & `image_url` keep plain indexes.
+PARTITION_FACE_IMAGE_SQL = """
+CREATE TABLE face_image_partitioned (LIKE face_image INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);
+CREATE SEQUENCE face_image_partitioned_id_seq;
+ALTER TABLE face_image_partitioned ALTER COLUMN id SET DEFAULT nextval('face_image_partitioned_id_seq');
+ALTER TABLE face_image_partitioned ADD CONSTRAINT face_image_partitioned_pkey PRIMARY KEY (id, created_at);
+CREATE TABLE face_image_default PARTITION OF face_image_partitioned DEFAULT;
+
+DO $$
+DECLARE
+    month_start timestamptz := date_trunc('month', COALESCE((SELECT MIN(created_at) FROM face_image), now()));
+    last_month_start timestamptz := date_trunc('month', now()) + interval '3 months';
+BEGIN
+    WHILE month_start <= last_month_start LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF face_image_partitioned FOR VALUES FROM (%L) TO (%L)',
+            'face_image_p' || to_char(month_start, 'YYYYMM'),
+            month_start,
+            month_start + interval '1 month'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO face_image_partitioned SELECT * FROM face_image;
+SELECT setval('face_image_partitioned_id_seq', COALESCE((SELECT MAX(id) FROM face_image), 0) + 1, false);
+DROP TABLE face_image;
+
+ALTER TABLE face_image_partitioned RENAME TO face_image;
+ALTER TABLE face_image RENAME CONSTRAINT face_image_partitioned_pkey TO face_image_pkey;
+ALTER SEQUENCE face_image_partitioned_id_seq RENAME TO face_image_id_seq;
+ALTER SEQUENCE face_image_id_seq OWNED BY face_image.id;
+CREATE INDEX face_image_public__310785_idx ON face_image (public_id);
+CREATE INDEX face_image_image_url_5a72334e ON face_image (image_url);
+CREATE INDEX face_image_image_url_5a72334e_like ON face_image (image_url varchar_pattern_ops);
+CREATE INDEX face_image_content_hash_223e7289 ON face_image (content_hash);
+CREATE INDEX face_image_content_hash_223e7289_like ON face_image (content_hash varchar_pattern_ops);
+"""
+
+UNPARTITION_FACE_IMAGE_SQL = """
+CREATE TABLE face_image_plain (LIKE face_image);
+ALTER TABLE face_image_plain ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+INSERT INTO face_image_plain SELECT * FROM face_image;
+DROP TABLE face_image;
+ALTER TABLE face_image_plain RENAME TO face_image;
+ALTER SEQUENCE face_image_plain_id_seq RENAME TO face_image_id_seq;
+SELECT setval('face_image_id_seq', COALESCE((SELECT MAX(id) FROM face_image), 0) + 1, false);
+ALTER TABLE face_image ADD CONSTRAINT face_image_pkey PRIMARY KEY (id);
+ALTER TABLE face_image ADD CONSTRAINT face_image_public_id_key UNIQUE (public_id);
+ALTER TABLE face_image ADD CONSTRAINT face_image_image_url_5a72334e_uniq UNIQUE (image_url);
+CREATE INDEX face_image_public__310785_idx ON face_image (public_id);
+CREATE INDEX face_image_image_url_5a72334e_like ON face_image (image_url varchar_pattern_ops);
+CREATE INDEX face_image_content_hash_223e7289 ON face_image (content_hash);
+CREATE INDEX face_image_content_hash_223e7289_like ON face_image (content_hash varchar_pattern_ops);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0005_add_face_image_encoding_params"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_FACE_IMAGE_SQL, reverse_sql=UNPARTITION_FACE_IMAGE_SQL),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="faceimage",
+                    name="public_id",
+                    field=models.UUIDField(default=uuid.uuid4, editable=False, verbose_name="Public ID"),
+                ),
+                migrations.AlterField(
+                    model_name="faceimage",
+                    name="image_url",
+                    field=models.URLField(db_index=True, verbose_name="Image URL"),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Django
+from django.db import migrations
+
+# Notify `face_image_status` listeners with the public_id of rows whose
+# encoding finished, watchers wake up instead of polling the table.
+CREATE_NOTIFY_TRIGGER_SQL = """
+CREATE FUNCTION face_image_notify_status() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('face_image_status', NEW.public_id::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER face_image_notify_status
+AFTER INSERT OR UPDATE OF encoding_status ON face_image
+FOR EACH ROW WHEN (NEW.encoding_status <> 'PENDING')
+EXECUTE FUNCTION face_image_notify_status();
+"""
+
+DROP_NOTIFY_TRIGGER_SQL = """
+DROP TRIGGER face_image_notify_status ON face_image;
+DROP FUNCTION face_image_notify_status();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0006_partition_face_image_by_created_at"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_NOTIFY_TRIGGER_SQL, reverse_sql=DROP_NOTIFY_TRIGGER_SQL),
+    ]
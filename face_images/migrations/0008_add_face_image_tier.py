@@ -0,0 +1,38 @@
+# Generated by Django 4.1.10 on 2026-10-19 13:55
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0007_add_face_image_status_notify_trigger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="encoding_duration_ms",
+            field=models.FloatField(
+                blank=True,
+                help_text="Time spent loading & encoding the image.",
+                null=True,
+                verbose_name="Encoding Duration (ms)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="faceimage",
+            name="tier",
+            field=models.CharField(
+                choices=[
+                    ("fast", "Fast"),
+                    ("balanced", "Balanced"),
+                    ("accurate", "Accurate"),
+                ],
+                default="balanced",
+                help_text="Quality/latency tier the face was encoded with.",
+                max_length=20,
+                verbose_name="Tier",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.10 on 2026-10-19 13:59
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0008_add_face_image_tier"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="failure_reason",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("too_small", "Too small"),
+                    ("too_large", "Too large"),
+                    ("low_contrast", "Low contrast"),
+                    ("blurry", "Blurry"),
+                    ("unreadable", "Unreadable"),
+                    ("no_face", "No face"),
+                ],
+                help_text="Why the encoding FAILED, empty otherwise.",
+                max_length=20,
+                verbose_name="Failure Reason",
+            ),
+        ),
+        # Images failed before the pre-screening existed all went through detection
+        migrations.RunSQL(
+            "UPDATE face_image SET failure_reason = 'no_face' WHERE encoding_status = 'FAILED'",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
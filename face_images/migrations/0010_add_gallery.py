@@ -0,0 +1,170 @@
+# Generated by Django 4.1.10 on 2026-10-19 14:03
+
+# Standard Library
+import uuid
+
+# Django
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0009_add_face_image_failure_reason"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Gallery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "public_id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        unique=True,
+                        verbose_name="Public ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, unique=True, verbose_name="Name"),
+                ),
+                (
+                    "face_image_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Face Images Count"),
+                ),
+                (
+                    "encoded_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Face images with a SUCCESS encoding, summed into the encoding sum.",
+                        verbose_name="Encoded Face Images Count",
+                    ),
+                ),
+                (
+                    "encoding_sum",
+                    models.BinaryField(
+                        blank=True,
+                        default=bytes,
+                        help_text="Sum of the SUCCESS face encodings, empty until one is encoded.",
+                        verbose_name="Encoding Sum",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Gallery",
+                "verbose_name_plural": "Galleries",
+                "db_table": "gallery",
+            },
+        ),
+        migrations.CreateModel(
+            name="GalleryAPIKey",
+            fields=[
+                (
+                    "id",
+                    models.CharField(
+                        editable=False,
+                        max_length=150,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("prefix", models.CharField(editable=False, max_length=8, unique=True)),
+                ("hashed_key", models.CharField(editable=False, max_length=150)),
+                ("created", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "name",
+                    models.CharField(
+                        default=None,
+                        help_text="A free-form name for the API key. Need not be unique. 50 characters max.",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "revoked",
+                    models.BooleanField(
+                        blank=True,
+                        default=False,
+                        help_text="If the API key is revoked, clients cannot use it anymore. (This cannot be undone.)",
+                    ),
+                ),
+                (
+                    "expiry_date",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Once API key expires, clients cannot use it anymore.",
+                        null=True,
+                        verbose_name="Expires",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Gallery API Key",
+                "verbose_name_plural": "Gallery API Keys",
+                "db_table": "gallery_api_key",
+                "ordering": ("-created",),
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="galleryapikey",
+            name="gallery",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="api_keys",
+                to="face_images.gallery",
+                verbose_name="Gallery",
+            ),
+        ),
+        migrations.AddField(
+            model_name="faceimage",
+            name="gallery",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                help_text="Gallery of the face image, null for images added with a global API key.",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="face_images",
+                to="face_images.gallery",
+                verbose_name="Gallery",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(
+                fields=["gallery", "encoding_status"],
+                name="face_image_gallery_8d328a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(
+                fields=["gallery", "content_hash", "tier"],
+                name="face_image_gallery_9dfc01_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(fields=["gallery", "created_at"], name="face_image_gallery_75acaf_idx"),
+        ),
+    ]
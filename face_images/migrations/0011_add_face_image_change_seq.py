@@ -0,0 +1,58 @@
+# Generated by Django 4.1.10 on 2026-10-19 14:08
+
+# Django
+from django.db import migrations, models
+
+# Number every insert & update of `face_image` from a sequence, the change
+# feed reads rows in `change_seq` order after the cursor of a consumer.
+CREATE_CHANGE_SEQ_TRIGGER_SQL = """
+CREATE SEQUENCE face_image_change_seq;
+
+CREATE FUNCTION face_image_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('face_image_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER face_image_set_change_seq
+BEFORE INSERT OR UPDATE ON face_image
+FOR EACH ROW EXECUTE FUNCTION face_image_set_change_seq();
+
+-- Existing rows get numbered by the trigger
+UPDATE face_image SET change_seq = NULL;
+"""
+
+DROP_CHANGE_SEQ_TRIGGER_SQL = """
+DROP TRIGGER face_image_set_change_seq ON face_image;
+DROP FUNCTION face_image_set_change_seq();
+DROP SEQUENCE face_image_change_seq;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0010_add_gallery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="change_seq",
+            field=models.BigIntegerField(
+                editable=False,
+                help_text="Set by a trigger from the `face_image_change_seq` sequence on every insert & update.",
+                null=True,
+                verbose_name="Change Sequence",
+            ),
+        ),
+        migrations.RunSQL(CREATE_CHANGE_SEQ_TRIGGER_SQL, reverse_sql=DROP_CHANGE_SEQ_TRIGGER_SQL),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(fields=["change_seq"], name="face_image_change__f07523_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(fields=["gallery", "change_seq"], name="face_image_gallery_5a73b7_idx"),
+        ),
+    ]
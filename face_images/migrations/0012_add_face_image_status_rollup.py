@@ -0,0 +1,146 @@
+# Generated by Django 4.1.10 on 2026-10-19 14:24
+
+# Django
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# Count face images per minute & hour of `created_at`, gallery & status as they're
+# inserted or change status. The trigger is created before the backfill, its lock on
+# `face_image` holds writes until the migration commits so no insert is missed.
+CREATE_STATUS_ROLLUP_TRIGGER_SQL = """
+CREATE FUNCTION face_image_status_rollup_add(
+    _created_at timestamptz, _gallery_id bigint, _encoding_status varchar, _delta integer
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO face_image_status_rollup (granularity, bucket, gallery_id, encoding_status, count)
+    VALUES
+        ('minute', date_trunc('minute', _created_at, 'UTC'), _gallery_id, _encoding_status, _delta),
+        ('hour', date_trunc('hour', _created_at, 'UTC'), _gallery_id, _encoding_status, _delta)
+    ON CONFLICT (granularity, bucket, (COALESCE(gallery_id, 0)), encoding_status)
+    DO UPDATE SET count = face_image_status_rollup.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION face_image_update_status_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM face_image_status_rollup_add(NEW.created_at, NEW.gallery_id, NEW.encoding_status, 1);
+    ELSIF (NEW.encoding_status, NEW.gallery_id, NEW.created_at)
+        IS DISTINCT FROM (OLD.encoding_status, OLD.gallery_id, OLD.created_at) THEN
+        -- Rollup rows are always locked in status order, concurrent status changes can't deadlock
+        IF OLD.encoding_status <= NEW.encoding_status THEN
+            PERFORM face_image_status_rollup_add(OLD.created_at, OLD.gallery_id, OLD.encoding_status, -1);
+            PERFORM face_image_status_rollup_add(NEW.created_at, NEW.gallery_id, NEW.encoding_status, 1);
+        ELSE
+            PERFORM face_image_status_rollup_add(NEW.created_at, NEW.gallery_id, NEW.encoding_status, 1);
+            PERFORM face_image_status_rollup_add(OLD.created_at, OLD.gallery_id, OLD.encoding_status, -1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER face_image_status_rollup
+AFTER INSERT OR UPDATE ON face_image
+FOR EACH ROW EXECUTE FUNCTION face_image_update_status_rollup();
+
+INSERT INTO face_image_status_rollup (granularity, bucket, gallery_id, encoding_status, count)
+SELECT 'minute', date_trunc('minute', created_at, 'UTC'), gallery_id, encoding_status, count(*)
+FROM face_image GROUP BY 2, 3, 4
+UNION ALL
+SELECT 'hour', date_trunc('hour', created_at, 'UTC'), gallery_id, encoding_status, count(*)
+FROM face_image GROUP BY 2, 3, 4;
+"""
+
+DROP_STATUS_ROLLUP_TRIGGER_SQL = """
+DROP TRIGGER face_image_status_rollup ON face_image;
+DROP FUNCTION face_image_update_status_rollup();
+DROP FUNCTION face_image_status_rollup_add(timestamptz, bigint, varchar, integer);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0011_add_face_image_change_seq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FaceImageStatusRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("minute", "Minute"), ("hour", "Hour")],
+                        max_length=10,
+                        verbose_name="Granularity",
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.DateTimeField(
+                        help_text="Start of the UTC minute or hour.",
+                        verbose_name="Bucket",
+                    ),
+                ),
+                (
+                    "encoding_status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("SUCCESS", "Success"),
+                            ("FAILED", "Failed"),
+                        ],
+                        max_length=20,
+                        verbose_name="Encoding Status",
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0, verbose_name="Count")),
+                (
+                    "gallery",
+                    models.ForeignKey(
+                        blank=True,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_rollups",
+                        to="face_images.gallery",
+                        verbose_name="Gallery",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Face Image Status Rollup",
+                "verbose_name_plural": "Face Image Status Rollups",
+                "db_table": "face_image_status_rollup",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="faceimagestatusrollup",
+            index=models.Index(
+                fields=["gallery", "granularity", "bucket"],
+                name="face_image__gallery_84162a_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="faceimagestatusrollup",
+            constraint=models.UniqueConstraint(
+                models.F("granularity"),
+                models.F("bucket"),
+                django.db.models.functions.comparison.Coalesce("gallery", 0),
+                models.F("encoding_status"),
+                name="face_image_status_rollup_key",
+            ),
+        ),
+        migrations.RunSQL(CREATE_STATUS_ROLLUP_TRIGGER_SQL, reverse_sql=DROP_STATUS_ROLLUP_TRIGGER_SQL),
+    ]
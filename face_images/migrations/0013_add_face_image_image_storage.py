@@ -0,0 +1,28 @@
+# Generated by Django 4.1.10 on 2026-10-19 14:29
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0012_add_face_image_status_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faceimage",
+            name="image_storage",
+            field=models.CharField(
+                choices=[
+                    ("original", "Original"),
+                    ("crop", "Face crop"),
+                    ("none", "None"),
+                ],
+                default="original",
+                help_text="What is kept at the image URL, the original upload, a face crop or nothing.",
+                max_length=20,
+                verbose_name="Image Storage",
+            ),
+        ),
+    ]
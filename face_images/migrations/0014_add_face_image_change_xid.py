@@ -0,0 +1,55 @@
+# Generated by Django 4.1.10 on 2026-10-19 14:49
+
+# Django
+from django.db import migrations, models
+
+# Record the transaction of every change next to its `change_seq`, the
+# change feed only serves changes of transactions older than any running
+# one, which are final, in transaction order.
+SET_CHANGE_XID_SQL = """
+CREATE OR REPLACE FUNCTION face_image_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('face_image_change_seq');
+    NEW.change_xid := txid_current();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+UNSET_CHANGE_XID_SQL = """
+CREATE OR REPLACE FUNCTION face_image_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('face_image_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("face_images", "0013_add_face_image_image_storage"),
+    ]
+
+    operations = [
+        # A constant default is only stored in the catalog, existing rows aren't rewritten
+        migrations.AddField(
+            model_name="faceimage",
+            name="change_xid",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Set by a trigger to the ID of the transaction of every insert & update.",
+                verbose_name="Change Transaction ID",
+            ),
+        ),
+        migrations.RunSQL(SET_CHANGE_XID_SQL, reverse_sql=UNSET_CHANGE_XID_SQL),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(fields=["change_xid", "change_seq"], name="face_image_change__b360a5_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="faceimage",
+            index=models.Index(fields=["gallery", "change_xid", "change_seq"], name="face_image_gallery_79126d_idx"),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.1.10 on 2026-10-19 15:20
+
+# Django
+from django.db import migrations
+
+# Rows changed before 0014 get their `change_xid` by touching them, the
+# trigger stamps them again. A batch per transaction so the table is never
+# rewritten & locked at once.
+BACKFILL_BATCH_SIZE = 5000
+BACKFILL_CHANGE_XID_SQL = """
+UPDATE face_image SET change_seq = NULL
+WHERE (id, created_at) IN (SELECT id, created_at FROM face_image WHERE change_xid = 0 LIMIT %s)
+"""
+
+
+def backfill_change_xid(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(BACKFILL_CHANGE_XID_SQL, [BACKFILL_BATCH_SIZE])
+            if not cursor.rowcount:
+                break
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ("face_images", "0014_add_face_image_change_xid"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_change_xid, reverse_code=migrations.RunPython.noop),
+    ]
@@ -3,12 +3,81 @@ import uuid
 
 # Django
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
+# Third Parties
+from rest_framework_api_key.models import AbstractAPIKey, BaseAPIKeyManager
+
 # Face Embeddings
 from common.models import BaseModel
 
 
+class Gallery(BaseModel):
+    """Namespace of a tenant's face images.
+
+    Counters & the sum of the SUCCESS encodings are kept up to date as
+    face images are added, so gallery aggregates are read without scanning
+    its face images.
+    """
+
+    # DATABASE FIELDS
+    public_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        verbose_name=_("Public ID"),
+    )
+    name = models.CharField(max_length=100, unique=True, verbose_name=_("Name"))
+    face_image_count = models.PositiveIntegerField(default=0, verbose_name=_("Face Images Count"))
+    encoded_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Encoded Face Images Count"),
+        help_text=_("Face images with a SUCCESS encoding, summed into the encoding sum."),
+    )
+    encoding_sum = models.BinaryField(
+        default=bytes,
+        blank=True,
+        verbose_name=_("Encoding Sum"),
+        help_text=_("Sum of the SUCCESS face encodings, empty until one is encoded."),
+    )
+
+    # META CLASS
+    class Meta:
+        db_table = "gallery"
+        verbose_name = "Gallery"
+        verbose_name_plural = "Galleries"
+
+    # BUILT_IN METHODS
+    def __str__(self):
+        return f"{self.name}"
+
+
+class GalleryAPIKeyManager(BaseAPIKeyManager):
+    def get_usable_keys(self):
+        return super().get_usable_keys().select_related("gallery")
+
+
+class GalleryAPIKey(AbstractAPIKey):
+    """API key whose requests only reach the face images of its gallery."""
+
+    objects = GalleryAPIKeyManager()
+
+    # DATABASE FIELDS
+    gallery = models.ForeignKey(
+        Gallery,
+        on_delete=models.CASCADE,
+        related_name="api_keys",
+        verbose_name=_("Gallery"),
+    )
+
+    # META CLASS
+    class Meta(AbstractAPIKey.Meta):
+        db_table = "gallery_api_key"
+        verbose_name = "Gallery API Key"
+        verbose_name_plural = "Gallery API Keys"
+
+
 class FaceImage(BaseModel):
     # CHOICES
     ENCODE_PENDING = "PENDING"
@@ -19,22 +88,129 @@ class FaceImage(BaseModel):
         (ENCODE_SUCCESS, "Success"),
         (ENCODE_FAILED, "Failed"),
     )
+    TIER_FAST = "fast"
+    TIER_BALANCED = "balanced"
+    TIER_ACCURATE = "accurate"
+    TIER_CHOICES = (
+        (TIER_FAST, "Fast"),
+        (TIER_BALANCED, "Balanced"),
+        (TIER_ACCURATE, "Accurate"),
+    )
+    FAILURE_TOO_SMALL = "too_small"
+    FAILURE_TOO_LARGE = "too_large"
+    FAILURE_LOW_CONTRAST = "low_contrast"
+    FAILURE_BLURRY = "blurry"
+    FAILURE_UNREADABLE = "unreadable"
+    FAILURE_NO_FACE = "no_face"
+    FAILURE_REASON_CHOICES = (
+        (FAILURE_TOO_SMALL, "Too small"),
+        (FAILURE_TOO_LARGE, "Too large"),
+        (FAILURE_LOW_CONTRAST, "Low contrast"),
+        (FAILURE_BLURRY, "Blurry"),
+        (FAILURE_UNREADABLE, "Unreadable"),
+        (FAILURE_NO_FACE, "No face"),
+    )
+    # Reasons given by the pre-screening, before face detection runs
+    PRESCREEN_FAILURE_REASONS = (
+        FAILURE_TOO_SMALL,
+        FAILURE_TOO_LARGE,
+        FAILURE_LOW_CONTRAST,
+        FAILURE_BLURRY,
+        FAILURE_UNREADABLE,
+    )
+    STORAGE_ORIGINAL = "original"
+    STORAGE_CROP = "crop"
+    STORAGE_NONE = "none"
+    STORAGE_CHOICES = (
+        (STORAGE_ORIGINAL, "Original"),
+        (STORAGE_CROP, "Face crop"),
+        (STORAGE_NONE, "None"),
+    )
 
     # DATABASE FIELDS
+    gallery = models.ForeignKey(
+        Gallery,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="face_images",
+        db_index=False,
+        verbose_name=_("Gallery"),
+        help_text=_("Gallery of the face image, null for images added with a global API key."),
+    )
+    # `face_image` is partitioned by `created_at` (see migration 0006), Postgres can't enforce
+    # uniqueness without the partition key so `public_id` & `image_url` are only indexed.
     public_id = models.UUIDField(
-        unique=True,
         default=uuid.uuid4,
         editable=False,
         verbose_name=_("Public ID"),
     )
-    image_url = models.URLField(verbose_name=_("Image URL"), unique=True)
+    image_url = models.URLField(verbose_name=_("Image URL"), db_index=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, verbose_name=_("Content Hash"))
+    image_storage = models.CharField(
+        choices=STORAGE_CHOICES,
+        default=STORAGE_ORIGINAL,
+        max_length=20,
+        verbose_name=_("Image Storage"),
+        help_text=_("What is kept at the image URL, the original upload, a face crop or nothing."),
+    )
     face_encoding = models.BinaryField(verbose_name=_("Face Encoding"))
+    face_locations = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name=_("Face Locations"),
+        help_text=_("Detected face boxes in (top, right, bottom, left) order, null until detection runs."),
+    )
+    face_landmarks = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Face Landmarks"),
+        help_text=_("Landmark points of the encoded face per landmark model."),
+    )
     encoding_status = models.CharField(
         choices=ENCODE_STATUS_CHOICES,
         default=ENCODE_PENDING,
         max_length=20,
         verbose_name=_("Encoding Status"),
     )
+    encoding_params = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Encoding Parameters"),
+        help_text=_("Pipeline parameters the face was encoded with."),
+    )
+    tier = models.CharField(
+        choices=TIER_CHOICES,
+        default=TIER_BALANCED,
+        max_length=20,
+        verbose_name=_("Tier"),
+        help_text=_("Quality/latency tier the face was encoded with."),
+    )
+    encoding_duration_ms = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_("Encoding Duration (ms)"),
+        help_text=_("Time spent loading & encoding the image."),
+    )
+    failure_reason = models.CharField(
+        choices=FAILURE_REASON_CHOICES,
+        blank=True,
+        max_length=20,
+        verbose_name=_("Failure Reason"),
+        help_text=_("Why the encoding FAILED, empty otherwise."),
+    )
+    change_seq = models.BigIntegerField(
+        null=True,
+        editable=False,
+        verbose_name=_("Change Sequence"),
+        help_text=_("Set by a trigger from the `face_image_change_seq` sequence on every insert & update."),
+    )
+    change_xid = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Change Transaction ID"),
+        help_text=_("Set by a trigger to the ID of the transaction of every insert & update."),
+    )
 
     # META CLASS
     class Meta:
@@ -43,8 +219,75 @@ class FaceImage(BaseModel):
         verbose_name_plural = "Face Images"
         indexes = [
             models.Index(fields=["public_id"]),
+            # Gallery scoped lookups & aggregates only read the gallery's rows
+            models.Index(fields=["gallery", "encoding_status"]),
+            models.Index(fields=["gallery", "content_hash", "tier"]),
+            models.Index(fields=["gallery", "created_at"]),
+            # Change feed reads
+            models.Index(fields=["change_seq"]),
+            models.Index(fields=["gallery", "change_seq"]),
+            models.Index(fields=["change_xid", "change_seq"]),
+            models.Index(fields=["gallery", "change_xid", "change_seq"]),
         ]
 
     # BUILT_IN METHODS
     def __str__(self):
         return f"{self.public_id}"
+
+
+class FaceImageStatusRollup(models.Model):
+    """Count of face images per `created_at` bucket, gallery & encoding
+    status.
+
+    Rows are upserted by the `face_image_status_rollup` trigger as face
+    images are inserted or change status, so time-series reads never scan
+    `face_image`. Purged partitions keep their counts.
+    """
+
+    # CHOICES
+    GRANULARITY_MINUTE = "minute"
+    GRANULARITY_HOUR = "hour"
+    GRANULARITY_CHOICES = (
+        (GRANULARITY_MINUTE, "Minute"),
+        (GRANULARITY_HOUR, "Hour"),
+    )
+
+    # DATABASE FIELDS
+    granularity = models.CharField(choices=GRANULARITY_CHOICES, max_length=10, verbose_name=_("Granularity"))
+    bucket = models.DateTimeField(verbose_name=_("Bucket"), help_text=_("Start of the UTC minute or hour."))
+    gallery = models.ForeignKey(
+        Gallery,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="status_rollups",
+        db_index=False,
+        verbose_name=_("Gallery"),
+    )
+    encoding_status = models.CharField(
+        choices=FaceImage.ENCODE_STATUS_CHOICES, max_length=20, verbose_name=_("Encoding Status")
+    )
+    count = models.BigIntegerField(default=0, verbose_name=_("Count"))
+
+    # META CLASS
+    class Meta:
+        db_table = "face_image_status_rollup"
+        verbose_name = "Face Image Status Rollup"
+        verbose_name_plural = "Face Image Status Rollups"
+        constraints = [
+            # Upsert target of the trigger, face images without gallery share the 0 gallery
+            models.UniqueConstraint(
+                "granularity",
+                "bucket",
+                Coalesce("gallery", 0),
+                "encoding_status",
+                name="face_image_status_rollup_key",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["gallery", "granularity", "bucket"]),
+        ]
+
+    # BUILT_IN METHODS
+    def __str__(self):
+        return f"{self.granularity} {self.bucket} {self.encoding_status}"
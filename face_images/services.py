@@ -1,34 +1,496 @@
 # Standard Library
+import csv
+import hashlib
+import io
 import logging
+import multiprocessing
 import os
+import queue
+import re
+import select
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from itertools import islice
+from typing import IO
 
 # Django
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db.models import Count
+from django.db import connection, transaction
+from django.db.models import Aggregate, Avg, Count, F, FloatField, Q, QuerySet, Sum
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
 # Third Parties
+import dlib
 import face_recognition
 import numpy as np
+from PIL import Image
+from rest_framework.exceptions import Throttled
 
 # Face Embeddings
-from face_images.models import FaceImage
+from api.admission import EncodeAdmissionController
+from common.http import RemoteFileError, RemoteFileFetcher
+from face_images.models import FaceImage, FaceImageStatusRollup, Gallery
 
 logger = logging.getLogger("main_logger")
 
 
+class FaceEncodingPipeline:
+    """Detect, Extract landmarks & Encode faces as separate stages.
+
+    Each stage can start from the cached results of the previous one, so
+    re-encoding with other encoding parameters skips face detection.
+    Face locations are kept in (top, right, bottom, left) order and
+    landmarks of the encoded (first) face as (x, y) points per landmark
+    model.
+    """
+
+    # Parameters face locations depend on, cached locations are stale when one of them changes
+    DETECTION_PARAMS = ("detection_model", "upsample", "max_dimension")
+
+    def __init__(self, tier: str | None = None, num_jitters: int | None = None, landmark_model: str | None = None):
+        self.tier = tier or settings.FACE_ENCODING_DEFAULT_TIER
+        tier_config = {
+            "detection_model": settings.FACE_DETECTION_MODEL,
+            "upsample": settings.FACE_DETECTION_UPSAMPLE,
+            "landmark_model": settings.FACE_LANDMARK_MODEL,
+            "num_jitters": settings.FACE_ENCODING_NUM_JITTERS,
+            "max_dimension": None,
+            **settings.FACE_ENCODING_TIERS[self.tier],
+        }
+        self.num_jitters = tier_config["num_jitters"] if num_jitters is None else num_jitters
+        self.landmark_model = landmark_model or tier_config["landmark_model"]
+        self.detection_model = tier_config["detection_model"]
+        self.upsample = tier_config["upsample"]
+        self.max_dimension = tier_config["max_dimension"]
+
+    @property
+    def params(self) -> dict:
+        """Parameters the encodings depend on, stored with each FaceImage to
+        find rows encoded under old parameters."""
+        params = {
+            "detection_model": self.detection_model,
+            "upsample": self.upsample,
+            "landmark_model": self.landmark_model,
+            "num_jitters": self.num_jitters,
+        }
+        # Only set when used, so rows encoded before detection resizing existed aren't stale
+        if self.max_dimension:
+            params["max_dimension"] = self.max_dimension
+        return params
+
+    def is_detection_stale(self, encoding_params: dict) -> bool:
+        """Whether face locations cached under `encoding_params` were
+        detected differently than this pipeline detects faces."""
+        params = self.params
+        return any(encoding_params.get(key) != params.get(key) for key in self.DETECTION_PARAMS)
+
+    def detect(self, image: np.ndarray) -> list[list[int]]:
+        """Detect faces on the image downscaled to `max_dimension`, locations
+        are scaled back to the full image."""
+        height, width = image.shape[:2]
+        scale = 1.0
+        if self.max_dimension and max(height, width) > self.max_dimension:
+            scale = max(height, width) / self.max_dimension
+            resized = Image.fromarray(image).resize((round(width / scale), round(height / scale)), Image.BILINEAR)
+            image = np.asarray(resized)
+        locations = face_recognition.face_locations(image, self.upsample, self.detection_model)
+        return [
+            [
+                min(round(top * scale), height),
+                min(round(right * scale), width),
+                min(round(bottom * scale), height),
+                round(left * scale),
+            ]
+            for top, right, bottom, left in locations
+        ]
+
+    def extract_landmarks(self, image: np.ndarray, face_location: list[int]) -> list[list[int]]:
+        shape = face_recognition.api._raw_face_landmarks(image, [face_location], self.landmark_model)[0]
+        return [[point.x, point.y] for point in shape.parts()]
+
+    def encode(self, image: np.ndarray, face_location: list[int], landmarks: list[list[int]]) -> np.ndarray:
+        shape = dlib.full_object_detection(
+            face_recognition.api._css_to_rect(face_location), [dlib.point(x, y) for x, y in landmarks]
+        )
+        return np.array(face_recognition.api.face_encoder.compute_face_descriptor(image, shape, self.num_jitters))
+
+    def run(self, image: np.ndarray, face_locations: list | None = None, face_landmarks: dict | None = None) -> dict:
+        """Run the stages that have no cached results.
+
+        Args:
+            image (np.ndarray): Loaded RGB image
+            face_locations (list | None): Cached face locations, None runs detection
+            face_landmarks (dict | None): Cached landmarks per landmark model
+
+        Returns:
+            dict: FaceImage fields for the encoding results
+        """
+        if face_locations is None:
+            face_locations = self.detect(image)
+        face_landmarks = dict(face_landmarks or {})
+        if not face_locations:
+            return {
+                "face_locations": face_locations,
+                "face_landmarks": face_landmarks,
+                "face_encoding": b"",
+                "encoding_status": FaceImage.ENCODE_FAILED,
+                "failure_reason": FaceImage.FAILURE_NO_FACE,
+                "encoding_params": self.params,
+                "tier": self.tier,
+            }
+
+        face_location = face_locations[0]
+        landmarks = face_landmarks.get(self.landmark_model) or self.extract_landmarks(image, face_location)
+        face_landmarks[self.landmark_model] = landmarks
+        encoded_face = self.encode(image, face_location, landmarks)
+        return {
+            "face_locations": face_locations,
+            "face_landmarks": face_landmarks,
+            "face_encoding": encoded_face.tobytes(),
+            "encoding_status": FaceImage.ENCODE_SUCCESS,
+            "failure_reason": "",
+            "encoding_params": self.params,
+            "tier": self.tier,
+        }
+
+
+class FaceImagePreScreener:
+    """Reject images that can't give an encoding before running face
+    detection.
+
+    Dimensions are read from the image header without decoding it, the
+    contrast & sharpness are measured on a small grayscale copy which JPEG
+    images decode straight at a reduced scale, so a reject costs
+    milliseconds instead of a detection pass.
+    """
+
+    def __init__(self) -> None:
+        self.min_dimension = settings.FACE_PRESCREEN_MIN_DIMENSION
+        self.max_pixels = settings.FACE_PRESCREEN_MAX_PIXELS
+        self.sample_size = settings.FACE_PRESCREEN_SAMPLE_SIZE
+        self.min_contrast = settings.FACE_PRESCREEN_MIN_CONTRAST
+        self.min_sharpness = settings.FACE_PRESCREEN_MIN_SHARPNESS
+
+    @staticmethod
+    def get_sharpness(gray: np.ndarray) -> float:
+        """Variance of the 4-neighbours Laplacian of a grayscale image."""
+        laplacian = gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:] - 4 * gray[1:-1, 1:-1]
+        return float(laplacian.var()) if laplacian.size else 0.0
+
+    def screen(self, image_path: str | IO) -> str:
+        """Check an image against the pre-screening limits.
+
+        Args:
+            image_path (str | IO): Stored image path or image file
+
+        Returns:
+            str: FaceImage failure reason, empty when the image passes
+        """
+        try:
+            with Image.open(image_path) as image:
+                width, height = image.size
+                if min(width, height) < self.min_dimension:
+                    return FaceImage.FAILURE_TOO_SMALL
+                if width * height > self.max_pixels:
+                    return FaceImage.FAILURE_TOO_LARGE
+
+                image.draft("L", (self.sample_size, self.sample_size))
+                sample = image.convert("L")
+                sample.thumbnail((self.sample_size, self.sample_size))
+        except Image.DecompressionBombError:
+            return FaceImage.FAILURE_TOO_LARGE
+        except Exception as exc:
+            logger.warning(f"Image: {image_path} can't be pre-screened: {exc}")
+            return FaceImage.FAILURE_UNREADABLE
+
+        gray = np.asarray(sample, dtype=np.float32)
+        if gray.std() < self.min_contrast:
+            return FaceImage.FAILURE_LOW_CONTRAST
+        if self.get_sharpness(gray) < self.min_sharpness:
+            return FaceImage.FAILURE_BLURRY
+        return ""
+
+
+class FaceEncodingWindow:
+    """Ring buffer of the most recently changed face encodings & the ids of
+    their face images, an encoding of a face image already in the window
+    replaces its previous one."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.encodings: np.ndarray | None = None
+        self.face_image_ids = np.zeros(size, dtype=np.int64)
+        self.slots: dict[int, int] = {}
+        self.count = 0
+        self.next_slot = 0
+        # `(change_xid, change_seq)` of the last change pulled into the window
+        self.last_cursor = (0, 0)
+
+    def add(self, face_image_id: int, encoding: np.ndarray) -> None:
+        if self.encodings is None:
+            self.encodings = np.zeros((self.size, len(encoding)), dtype=np.float32)
+        slot = self.slots.get(face_image_id)
+        if slot is None:
+            slot = self.next_slot
+            if self.count == self.size:
+                del self.slots[int(self.face_image_ids[slot])]
+            else:
+                self.count += 1
+            self.next_slot = (slot + 1) % self.size
+            self.slots[face_image_id] = slot
+            self.face_image_ids[slot] = face_image_id
+        self.encodings[slot] = encoding
+
+    def nearest(self, encoding: np.ndarray) -> tuple[int, float] | None:
+        """Return the face image id & distance of the closest encoding, None
+        while the window is empty."""
+        if not self.count:
+            return None
+        distances = np.linalg.norm(self.encodings[: self.count] - encoding.astype(np.float32), axis=1)
+        slot = int(np.argmin(distances))
+        return int(self.face_image_ids[slot]), float(distances[slot])
+
+
+class FaceImageNearDuplicateIndex:
+    """Find the stored face closest to a new encoding, to reuse its record
+    for the same face re-shot, re-compressed or slightly re-cropped.
+
+    Each process keeps a window of the `FACE_NEAR_DUPLICATE_WINDOW_SIZE`
+    most recently changed SUCCESS encodings per gallery & tier, compared
+    with a single vectorized distance. Before a lookup the window pulls the
+    encodings changed since the last change it saw, in change feed order
+    (see `FaceImageChangeFeedService`), so faces stored by other workers
+    are found too and none is skipped by committing late. Past
+    `FACE_NEAR_DUPLICATE_MAX_WINDOWS` the window of the least recently used
+    gallery & tier is dropped.
+
+    The changes are queried outside the lock & merged under it, a window
+    only takes changes after its cursor so a slower refresh racing a faster
+    one doesn't pull changes twice.
+    """
+
+    _lock = threading.Lock()
+    _windows: OrderedDict[tuple[int | None, str], FaceEncodingWindow] = OrderedDict()
+
+    @classmethod
+    def _get_window(cls, gallery: Gallery | None, tier: str) -> FaceEncodingWindow:
+        key = (gallery.id if gallery else None, tier)
+        window = cls._windows.get(key)
+        if window is None:
+            window = cls._windows[key] = FaceEncodingWindow(settings.FACE_NEAR_DUPLICATE_WINDOW_SIZE)
+            while len(cls._windows) > settings.FACE_NEAR_DUPLICATE_MAX_WINDOWS:
+                cls._windows.popitem(last=False)
+        else:
+            cls._windows.move_to_end(key)
+        return window
+
+    @staticmethod
+    def _get_changes(cursor: tuple[int, int], size: int, gallery: Gallery | None, tier: str) -> list[tuple]:
+        """Return the last `size` SUCCESS encodings changed after the cursor,
+        oldest first, with their cursors."""
+        changes = list(
+            FaceImageChangeFeedService.get_committed_changes(cursor)
+            .filter(gallery=gallery, tier=tier, encoding_status=FaceImage.ENCODE_SUCCESS)
+            .order_by("-change_xid", "-change_seq")
+            .values_list("id", "face_encoding", "change_xid", "change_seq")[:size]
+        )
+        return [(face_image_id, face_encoding, (xid, seq)) for face_image_id, face_encoding, xid, seq in changes[::-1]]
+
+    @classmethod
+    def find(cls, encoding: bytes, tier: str, gallery: Gallery | None = None) -> FaceImage | None:
+        """Return the SUCCESS face image of the gallery & tier within
+        `FACE_NEAR_DUPLICATE_THRESHOLD` of the encoding, None otherwise."""
+        with cls._lock:
+            window = cls._get_window(gallery, tier)
+            cursor = window.last_cursor
+        changes = cls._get_changes(cursor, window.size, gallery, tier)
+        with cls._lock:
+            for face_image_id, face_encoding, change_cursor in changes:
+                if change_cursor > window.last_cursor:
+                    window.add(face_image_id, np.frombuffer(face_encoding))
+                    window.last_cursor = change_cursor
+            nearest = window.nearest(np.frombuffer(encoding))
+        if nearest is None or nearest[1] > settings.FACE_NEAR_DUPLICATE_THRESHOLD:
+            return None
+        face_image_id, distance = nearest
+        # The face image may have been re-encoded or purged since it was pulled
+        face_image = FaceImage.objects.filter(id=face_image_id, encoding_status=FaceImage.ENCODE_SUCCESS).first()
+        if face_image:
+            logger.info(f"FaceImage: {face_image.public_id} is a near duplicate at distance {distance:.3f}...")
+        return face_image
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._windows.clear()
+
+
+class FaceImageDedupStats:
+    """Count the uploads & the ones answered with an existing face image,
+    per gallery, in the shared cache."""
+
+    UPLOADS = "uploads"
+    EXACT_DUPLICATES = "exact_duplicates"
+    NEAR_DUPLICATES = "near_duplicates"
+    KEY = "dedup:{gallery_id}:{counter}"
+
+    @classmethod
+    def _get_key(cls, gallery: Gallery | None, counter: str) -> str:
+        return cls.KEY.format(gallery_id=gallery.id if gallery else "global", counter=counter)
+
+    @classmethod
+    def record(cls, counter: str, gallery: Gallery | None = None) -> None:
+        key = cls._get_key(gallery, counter)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter evicted between `add` and `incr`
+            cache.set(key, 1, timeout=None)
+
+    @classmethod
+    def get_stats(cls, gallery: Gallery | None = None) -> dict:
+        counters = (cls.UPLOADS, cls.EXACT_DUPLICATES, cls.NEAR_DUPLICATES)
+        values = cache.get_many([cls._get_key(gallery, counter) for counter in counters])
+        stats = {counter: values.get(cls._get_key(gallery, counter), 0) for counter in counters}
+        duplicates = stats[cls.EXACT_DUPLICATES] + stats[cls.NEAR_DUPLICATES]
+        stats["dedup_rate"] = duplicates / stats[cls.UPLOADS] if stats[cls.UPLOADS] else 0.0
+        return stats
+
+
+class FaceImageCropper:
+    """Cut a normalized crop of the encoded face out of a loaded image.
+
+    The face box is padded by `FACE_CROP_PADDING` on each side, clipped to
+    the image and downscaled to `FACE_CROP_MAX_DIMENSION`. Face location &
+    landmarks are moved into the crop frame, so re-encoding from the crop
+    starts from them like from the original.
+    """
+
+    def __init__(self) -> None:
+        self.padding = settings.FACE_CROP_PADDING
+        self.max_dimension = settings.FACE_CROP_MAX_DIMENSION
+        self.quality = settings.FACE_CROP_JPEG_QUALITY
+
+    def crop(self, image: np.ndarray, face_location: list[int], face_landmarks: dict) -> tuple[bytes, dict]:
+        """Crop the face & encode the crop as JPEG.
+
+        Args:
+            image (np.ndarray): Loaded RGB image
+            face_location (list[int]): Encoded face box in (top, right, bottom, left) order
+            face_landmarks (dict): Landmarks of the encoded face per landmark model
+
+        Returns:
+            tuple[bytes, dict]: JPEG crop & its `face_locations` and `face_landmarks` fields
+        """
+        height, width = image.shape[:2]
+        top, right, bottom, left = face_location
+        padding_y = round((bottom - top) * self.padding)
+        padding_x = round((right - left) * self.padding)
+        crop_top, crop_left = max(top - padding_y, 0), max(left - padding_x, 0)
+        crop_bottom, crop_right = min(bottom + padding_y, height), min(right + padding_x, width)
+
+        crop = Image.fromarray(image[crop_top:crop_bottom, crop_left:crop_right])
+        scale = min(1.0, self.max_dimension / max(crop.size))
+        if scale < 1:
+            crop = crop.resize((round(crop.width * scale), round(crop.height * scale)), Image.LANCZOS)
+        crop_io = io.BytesIO()
+        crop.save(crop_io, format="JPEG", quality=self.quality)
+
+        def move(x: int, y: int) -> list[int]:
+            return [min(round((x - crop_left) * scale), crop.width), min(round((y - crop_top) * scale), crop.height)]
+
+        (left, top), (right, bottom) = move(left, top), move(right, bottom)
+        return crop_io.getvalue(), {
+            "face_locations": [[top, right, bottom, left]],
+            "face_landmarks": {
+                landmark_model: [move(x, y) for x, y in landmarks]
+                for landmark_model, landmarks in face_landmarks.items()
+            },
+        }
+
+
 class FaceImageEncodingService:
-    """Store & Encode Face Image."""
+    """Store & Encode Face Image.
+
+    What is stored of the image follows `FACE_IMAGE_STORAGE_POLICY`: the
+    original upload, a face crop once the face is encoded or nothing. Under
+    the last two, the original is kept in `FACE_IMAGE_COLD_STORAGE` when
+    it's set. The image is encoded from the upload & only stored once it's
+    kept, an upload answered with a near duplicate leaves no file behind.
+    """
+
+    # Fan-out of stored images into `ab/cd/<sha256>.<ext>` directories
+    SHARD_LEVELS = 2
+    SHARD_WIDTH = 2
 
-    def __init__(self, image_data: InMemoryUploadedFile) -> None:
-        self.image_path = self._store_image(image_data)
+    def __init__(
+        self,
+        image_data: InMemoryUploadedFile,
+        pipeline: FaceEncodingPipeline | None = None,
+        tier: str | None = None,
+        gallery: Gallery | None = None,
+    ) -> None:
+        self.gallery = gallery
+        self.pipeline = pipeline or FaceEncodingPipeline(tier=tier)
+        self.image_data = image_data
+        self.content_hash = self.get_content_hash(image_data)
+        self.storage_policy = settings.FACE_IMAGE_STORAGE_POLICY
+        self.image_path = ""
+        self.image_storage = FaceImage.STORAGE_NONE
+
+    @staticmethod
+    def get_content_hash(image_data) -> str:
+        """Return the sha256 hex digest of a file, leaving it rewound."""
+        digest = hashlib.sha256()
+        for chunk in image_data.chunks():
+            digest.update(chunk)
+        image_data.seek(0)
+        return digest.hexdigest()
+
+    @classmethod
+    def get_image_name(cls, content_hash: str, original_name: str, suffix: str = "") -> str:
+        """Build the content-addressed, sharded storage name of an image.
+
+        Args:
+            content_hash (str): sha256 hex digest of the image content
+            original_name (str): Uploaded file name, only its extension is kept
+            suffix (str): Appended to the hash for files derived from the image
+
+        Returns:
+            str: Image name relative to the storage root
+        """
+        extension = os.path.splitext(original_name)[1].lower()
+        shards = [
+            content_hash[level * cls.SHARD_WIDTH : (level + 1) * cls.SHARD_WIDTH] for level in range(cls.SHARD_LEVELS)
+        ]
+        return os.path.join(*shards, f"{content_hash}{suffix}{extension}")
 
     def _store_image(self, image_data: InMemoryUploadedFile) -> str:
-        """Create a unique name and save image into Storage Dir.
+        """Save image into Storage Dir under a name derived from its content.
 
-        Note:Images Storage may be local dir "Media" or S3
+        Note:Images Storage may be local dir "Media" or S3, the name is unique by
+        content so no existence probing is needed and storing the same image
+        again just rewrites the same file.
 
         Args:
             image (InMemoryUploadedFile): Uploaded image from request
@@ -38,8 +500,9 @@ class FaceImageEncodingService:
         """
         try:
             logger.info("Receiving Image and Starting store it...")
-            image_name = default_storage.get_available_name(image_data.name)
+            image_name = self.get_image_name(self.content_hash, image_data.name)
             image_path = os.path.join(settings.MEDIA_ROOT, image_name)
+            image_data.seek(0)
             default_storage.save(image_path, image_data)
             logger.info("Storing Image successfully...")
             return image_path
@@ -48,6 +511,49 @@ class FaceImageEncodingService:
             logger.warning(error_message, exc_info=True)
             raise ValidationError(error_message)
 
+    def _store_cold_original(self) -> None:
+        """Save the original upload into the cold storage, under the same name
+        it would have in the default storage."""
+        try:
+            storage = import_string(settings.FACE_IMAGE_COLD_STORAGE)(**settings.FACE_IMAGE_COLD_STORAGE_OPTIONS)
+            self.image_data.seek(0)
+            storage.save(self.get_image_name(self.content_hash, self.image_data.name), self.image_data)
+        except Exception as exc:
+            error_message = f"Exception occurred while cold file storing: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+    def _store_face_crop(self, loaded_image: np.ndarray, encoding_results: dict) -> None:
+        """Save the crop of the encoded face in place of the original & move
+        its face location and landmarks into the crop frame."""
+        try:
+            crop, crop_geometry = FaceImageCropper().crop(
+                loaded_image, encoding_results["face_locations"][0], encoding_results["face_landmarks"]
+            )
+            # Named by the crop's own content, crops of the same upload differ between tiers & detection settings
+            image_name = self.get_image_name(hashlib.sha256(crop).hexdigest(), "face.jpg", suffix="-face")
+            image_path = os.path.join(settings.MEDIA_ROOT, image_name)
+            default_storage.save(image_path, ContentFile(crop))
+        except Exception as exc:
+            error_message = f"Exception occurred while face crop storing: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+        encoding_results.update(crop_geometry)
+        self.image_path, self.image_storage = image_path, FaceImage.STORAGE_CROP
+
+    def _store_original(self) -> None:
+        """Save the original upload into the default storage under the
+        `original` policy, into the cold storage otherwise when it's set."""
+        if self.storage_policy == FaceImage.STORAGE_ORIGINAL:
+            self.image_path, self.image_storage = self._store_image(self.image_data), FaceImage.STORAGE_ORIGINAL
+        elif settings.FACE_IMAGE_COLD_STORAGE:
+            self._store_cold_original()
+
+    def _get_image_source(self) -> IO:
+        """Rewound upload, the image is encoded before it's stored."""
+        self.image_data.seek(0)
+        return self.image_data
+
     def perform(self) -> FaceImage:
         """Load image file into face_recognition & extract encoded_face Then
         store into DB.
@@ -55,22 +561,65 @@ class FaceImageEncodingService:
         Returns:
             FaceImage: Created record for FaceImage
         """
+        FaceImageDedupStats.record(FaceImageDedupStats.UPLOADS, self.gallery)
+        existing_face_image = FaceImage.objects.filter(
+            gallery=self.gallery, content_hash=self.content_hash, tier=self.pipeline.tier
+        ).first()
+        if existing_face_image:
+            logger.info(f"FaceImage: {existing_face_image.public_id} already encoded for the same image...")
+            FaceImageDedupStats.record(FaceImageDedupStats.EXACT_DUPLICATES, self.gallery)
+            return existing_face_image
+
+        started_at = time.perf_counter()
+        if settings.FACE_PRESCREEN_ENABLED:
+            failure_reason = FaceImagePreScreener().screen(self._get_image_source())
+            if failure_reason:
+                # Rejected before paying for storage, nothing is kept of the image
+                logger.info(f"Image: {self.content_hash} rejected by pre-screening as {failure_reason}...")
+                return self._create_face_image(
+                    face_encoding=b"",
+                    encoding_status=FaceImage.ENCODE_FAILED,
+                    failure_reason=failure_reason,
+                    tier=self.pipeline.tier,
+                    encoding_duration_ms=(time.perf_counter() - started_at) * 1000,
+                )
+
         try:
-            logger.info("starting FaceImageEncoding Service...")
-            loaded_image = face_recognition.load_image_file(self.image_path)
-            encoding_results = face_recognition.face_encodings(loaded_image)
-            encoded_face, status = (
-                (encoding_results[0], FaceImage.ENCODE_SUCCESS) if encoding_results else (b"", FaceImage.ENCODE_FAILED)
-            )
+            logger.info(f"starting FaceImageEncoding Service with {self.pipeline.tier} tier...")
+            loaded_image = face_recognition.load_image_file(self._get_image_source())
+            encoding_results = self.pipeline.run(loaded_image)
+            encoding_results["encoding_duration_ms"] = (time.perf_counter() - started_at) * 1000
         except Exception as exc:
             error_message = f"Exception occurred while encoding face image: {exc}"
             logger.warning(error_message, exc_info=True)
             raise ValidationError(error_message)
 
-        try:
-            face_image = FaceImage.objects.create(
-                image_url=self.image_path, face_encoding=encoded_face, encoding_status=status
+        if settings.FACE_NEAR_DUPLICATE_ENABLED and encoding_results["encoding_status"] == FaceImage.ENCODE_SUCCESS:
+            near_duplicate = FaceImageNearDuplicateIndex.find(
+                encoding_results["face_encoding"], self.pipeline.tier, gallery=self.gallery
             )
+            if near_duplicate:
+                FaceImageDedupStats.record(FaceImageDedupStats.NEAR_DUPLICATES, self.gallery)
+                return near_duplicate
+
+        self._store_original()
+        encoded = encoding_results["encoding_status"] == FaceImage.ENCODE_SUCCESS
+        if self.storage_policy == FaceImage.STORAGE_CROP and encoded:
+            self._store_face_crop(loaded_image, encoding_results)
+        return self._create_face_image(**encoding_results)
+
+    def _create_face_image(self, **encoding_results) -> FaceImage:
+        try:
+            with transaction.atomic():
+                face_image = FaceImage.objects.create(
+                    image_url=self.image_path,
+                    content_hash=self.content_hash,
+                    image_storage=self.image_storage,
+                    gallery=self.gallery,
+                    **encoding_results,
+                )
+                if self.gallery:
+                    GalleryService.add_face_image(face_image)
             logger.info(f"FaceImage: {face_image.public_id} encoded successfully...")
             return face_image
         except Exception as exc:
@@ -79,18 +628,459 @@ class FaceImageEncodingService:
             raise ValidationError(error_message)
 
 
+class FaceImageUrlIngestionService:
+    """Fetch remote images concurrently & Encode them.
+
+    Images are downloaded across a thread pool sharing the pooled HTTP
+    client and encoded in the calling thread as soon as each download
+    completes, so encoding overlaps the remaining downloads. Each URL
+    gets its own result, a failed URL never fails the others.
+    """
+
+    def __init__(
+        self,
+        image_urls: list[str],
+        fetcher: RemoteFileFetcher | None = None,
+        tier: str | None = None,
+        gallery: Gallery | None = None,
+    ) -> None:
+        self.image_urls = image_urls
+        self.tier = tier
+        self.gallery = gallery
+        self.fetcher = fetcher or RemoteFileFetcher()
+
+    @staticmethod
+    def _load_image_file(content: bytes) -> tuple[ContentFile, int]:
+        """Check that the content is an image.
+
+        Returns:
+            tuple[ContentFile, int]: Image file named after its format & its pixels count
+        """
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                image.verify()
+                image_format, (width, height) = image.format, image.size
+        except Exception as exc:
+            raise ValidationError(f"Fetched file isn't a valid image: {exc}")
+        return ContentFile(content, name=f"image.{image_format.lower()}"), width * height
+
+    def _encode(self, content: bytes) -> FaceImage:
+        image_file, pixels = self._load_image_file(content)
+        with EncodeAdmissionController(cost=pixels):
+            return FaceImageEncodingService(image_file, tier=self.tier, gallery=self.gallery).perform()
+
+    def perform(self) -> list[dict]:
+        """Fetch & Encode every image URL.
+
+        Returns:
+            list[dict]: Per URL result in request order, with the encoded
+            `face_image` or the `error` message
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=settings.REMOTE_FETCH_WORKERS) as executor:
+            futures = {
+                executor.submit(self.fetcher.fetch, image_url): image_url
+                for image_url in dict.fromkeys(self.image_urls)
+            }
+            for future in as_completed(futures):
+                image_url = futures[future]
+                try:
+                    face_image, error = self._encode(future.result()), None
+                except RemoteFileError as exc:
+                    face_image, error = None, f"Exception occurred while fetching image: {exc}"
+                except ValidationError as exc:
+                    face_image, error = None, exc.messages[0]
+                except Throttled as exc:
+                    face_image, error = None, str(exc.detail)
+                if error:
+                    logger.warning(f"Image URL: {image_url} can't be encoded: {error}")
+                results[image_url] = {"image_url": image_url, "face_image": face_image, "error": error}
+        return [results[image_url] for image_url in self.image_urls]
+
+
+class FaceImageBulkLookupService:
+    """Resolve a batch of face images by their public_id with a single query,
+    in request order."""
+
+    FIELDS = ("public_id", "face_encoding", "encoding_status", "failure_reason", "created_at", "updated_at")
+
+    def __init__(self, public_ids: list, gallery: Gallery | None = None) -> None:
+        self.public_ids = [str(public_id) for public_id in public_ids]
+        self.gallery = gallery
+
+    def perform(self) -> list[dict]:
+        """Look the face images up, skipping the fields the lookup doesn't
+        return.
+
+        Returns:
+            list[dict]: Face image or None of each requested public_id
+        """
+        face_images = FaceImage.objects.filter(public_id__in=set(self.public_ids)).only(*self.FIELDS)
+        if self.gallery:
+            face_images = face_images.filter(gallery=self.gallery)
+        found_face_images = {str(face_image.public_id): face_image for face_image in face_images}
+        return [
+            {
+                "public_id": public_id,
+                "found": public_id in found_face_images,
+                "face_image": found_face_images.get(public_id),
+            }
+            for public_id in self.public_ids
+        ]
+
+
+class FaceImageReEncodingService:
+    """Re-encode a stored Face Image from its cached face locations and
+    landmarks.
+
+    Face crops are re-encoded like originals, their cached face location &
+    landmarks are in the crop frame. Face images stored without image
+    can't be re-encoded.
+    """
+
+    UPDATE_FIELDS = [
+        "face_locations",
+        "face_landmarks",
+        "face_encoding",
+        "encoding_status",
+        "failure_reason",
+        "encoding_params",
+        "tier",
+        "updated_at",
+    ]
+
+    def __init__(
+        self, face_image: FaceImage, pipeline: FaceEncodingPipeline | None = None, redetect: bool = False
+    ) -> None:
+        self.face_image = face_image
+        self.pipeline = pipeline or FaceEncodingPipeline()
+        self.redetect = redetect
+
+    def encode(self) -> FaceImage:
+        """Load the stored image & update encoding fields without saving
+        them, detection runs only when no face locations are cached or
+        `redetect` is set.
+
+        Returns:
+            FaceImage: Face image with updated, unsaved encoding fields
+        """
+        if not self.face_image.image_url:
+            raise ValidationError(f"FaceImage: {self.face_image.public_id} has no stored image to re-encode from.")
+        try:
+            logger.info(f"Re-encoding FaceImage: {self.face_image.public_id}...")
+            loaded_image = face_recognition.load_image_file(self.face_image.image_url)
+            face_locations = None if self.redetect else self.face_image.face_locations
+            face_landmarks = {} if self.redetect else self.face_image.face_landmarks
+            encoding_results = self.pipeline.run(loaded_image, face_locations, face_landmarks)
+        except Exception as exc:
+            error_message = f"Exception occurred while re-encoding face image: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+        for field_name, value in encoding_results.items():
+            setattr(self.face_image, field_name, value)
+        self.face_image.updated_at = timezone.now()
+        return self.face_image
+
+    def perform(self) -> FaceImage:
+        """Re-encode the face image and save its encoding fields.
+
+        Returns:
+            FaceImage: Updated record for FaceImage
+        """
+        previous_encoding = b""
+        if self.face_image.gallery_id and self.face_image.encoding_status == FaceImage.ENCODE_SUCCESS:
+            previous_encoding = bytes(self.face_image.face_encoding)
+        face_image = self.encode()
+        try:
+            with transaction.atomic():
+                face_image.save(update_fields=self.UPDATE_FIELDS)
+                if face_image.gallery_id:
+                    GalleryService.replace_encoding(
+                        face_image.gallery_id, previous_encoding, bytes(face_image.face_encoding)
+                    )
+            logger.info(f"FaceImage: {face_image.public_id} re-encoded successfully...")
+            return face_image
+        except Exception as exc:
+            error_message = f"Exception occurred while updating face image record: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+
+class FaceImageStatusWatcher:
+    """Wait for the encoding of a batch of face images to finish.
+
+    A single background thread per process LISTENs to the
+    `face_image_status` notifications sent by the `face_image` trigger and
+    wakes up the watchers of the notified public_id. Watchers also check
+    the DB every `FACE_IMAGE_WATCH_POLL_INTERVAL` seconds, which covers
+    notifications missed while the listener reconnects.
+
+    Usage:
+        with FaceImageStatusWatcher(public_ids) as watcher:
+            for face_images in watcher.iter_finished(timeout=30):
+                ...
+    """
+
+    CHANNEL = "face_image_status"
+
+    _lock = threading.Lock()
+    _thread: threading.Thread | None = None
+    _subscribers: dict[str, set[queue.SimpleQueue]] = {}
+
+    def __init__(self, public_ids: list, gallery: Gallery | None = None) -> None:
+        self.public_ids = list(dict.fromkeys(str(public_id) for public_id in public_ids))
+        self.events: queue.SimpleQueue = queue.SimpleQueue()
+        face_images = FaceImage.objects.filter(public_id__in=self.public_ids)
+        if gallery:
+            face_images = face_images.filter(gallery=gallery)
+        existing_ids = face_images.values_list("public_id", flat=True)
+        existing_ids = {str(public_id) for public_id in existing_ids}
+        self.missing_ids = [public_id for public_id in self.public_ids if public_id not in existing_ids]
+        self.pending_ids = [public_id for public_id in self.public_ids if public_id in existing_ids]
+
+    @classmethod
+    def _listen(cls) -> None:
+        while True:
+            listen_connection = None
+            try:
+                listen_connection = connection.get_new_connection(connection.get_connection_params())
+                listen_connection.autocommit = True
+                with listen_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {cls.CHANNEL};")
+                logger.info("Listening to face image status notifications...")
+                while True:
+                    select.select([listen_connection], [], [], settings.FACE_IMAGE_WATCH_POLL_INTERVAL)
+                    listen_connection.poll()
+                    while listen_connection.notifies:
+                        cls._dispatch(listen_connection.notifies.pop(0).payload)
+            except Exception as exc:
+                logger.warning(f"Face image status listener failed, watchers fall back to polling: {exc}")
+                time.sleep(settings.FACE_IMAGE_WATCH_POLL_INTERVAL)
+            finally:
+                if listen_connection is not None:
+                    listen_connection.close()
+
+    @classmethod
+    def _dispatch(cls, public_id: str) -> None:
+        with cls._lock:
+            for events in cls._subscribers.get(public_id, ()):
+                events.put(public_id)
+
+    @classmethod
+    def ensure_started(cls) -> None:
+        if cls._thread is not None and cls._thread.is_alive():
+            return
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._listen, name="face-image-status-listener", daemon=True)
+                cls._thread.start()
+
+    def __enter__(self) -> "FaceImageStatusWatcher":
+        self.ensure_started()
+        with self._lock:
+            for public_id in self.pending_ids:
+                self._subscribers.setdefault(public_id, set()).add(self.events)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        with self._lock:
+            for public_id in self.public_ids:
+                subscribers = self._subscribers.get(public_id)
+                if subscribers is not None:
+                    subscribers.discard(self.events)
+                    if not subscribers:
+                        del self._subscribers[public_id]
+
+    def _fetch_finished(self, public_ids: set[str]) -> list[FaceImage]:
+        finished = FaceImage.objects.filter(public_id__in=public_ids).exclude(encoding_status=FaceImage.ENCODE_PENDING)
+        finished = list(finished.only("public_id", "encoding_status", "face_encoding"))
+        for face_image in finished:
+            self.pending_ids.remove(str(face_image.public_id))
+        return finished
+
+    def iter_finished(self, timeout: float) -> Iterator[list[FaceImage]]:
+        """Yield the face images whose encoding finished as they finish,
+        until all of them finished or `timeout` seconds passed.
+
+        An empty list is yielded after each poll interval without any
+        finished encoding, so callers can send keep-alives.
+        """
+        deadline = time.monotonic() + timeout
+        finished = self._fetch_finished(set(self.pending_ids))
+        while True:
+            if finished:
+                yield finished
+            remaining_time = deadline - time.monotonic()
+            if not self.pending_ids or remaining_time <= 0:
+                return
+
+            try:
+                notified_ids = {self.events.get(timeout=min(settings.FACE_IMAGE_WATCH_POLL_INTERVAL, remaining_time))}
+                while not self.events.empty():
+                    notified_ids.add(self.events.get_nowait())
+            except queue.Empty:
+                # Nothing notified, check all of them in case a notification was missed
+                notified_ids = set(self.pending_ids)
+            finished = self._fetch_finished(notified_ids & set(self.pending_ids))
+            if not finished:
+                yield []
+
+
+class FaceImageChangeFeedService:
+    """Read the face images created or updated after a consumer's cursor,
+    in the order they changed.
+
+    Every insert & update takes the next `change_seq` from a sequence and
+    records its transaction ID as `change_xid` (see migrations 0011 &
+    0014). Sequence values are taken before commit, so changes are served
+    in `(change_xid, change_seq)` order and only once every transaction
+    older than theirs finished: later changes all get a higher `change_xid`,
+    so the served changes never grow in the middle and a consumer resuming
+    after the last one it received never skips one. The cursor is the
+    `change_xid-change_seq` pair of that last change.
+    """
+
+    # Transactions below the xmin of the current snapshot have all finished
+    FINISHED_XID_SQL = "txid_snapshot_xmin(txid_current_snapshot())"
+    # Changes of the current transaction are visible to it
+    CURRENT_XID_SQL = "txid_current_if_assigned()"
+
+    def __init__(self, cursor: tuple[int, int] = (0, 0), limit: int = 100, gallery: Gallery | None = None) -> None:
+        self.cursor = cursor
+        self.limit = limit
+        self.gallery = gallery
+
+    @staticmethod
+    def get_cursor(face_image: FaceImage) -> str:
+        return f"{face_image.change_xid}-{face_image.change_seq}"
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple[int, int]:
+        change_xid, _, change_seq = cursor.partition("-")
+        return int(change_xid), int(change_seq or 0)
+
+    @classmethod
+    def get_committed_changes(cls, cursor: tuple[int, int]) -> QuerySet:
+        """Face images changed after the cursor by finished transactions or
+        the current one, unordered."""
+        change_xid, change_seq = cursor
+        return FaceImage.objects.filter(
+            Q(change_xid__gt=change_xid) | Q(change_xid=change_xid, change_seq__gt=change_seq),
+            Q(change_xid__lt=RawSQL(cls.FINISHED_XID_SQL, [])) | Q(change_xid=RawSQL(cls.CURRENT_XID_SQL, [])),
+        )
+
+    def _get_changes(self) -> QuerySet:
+        face_images = self.get_committed_changes(self.cursor)
+        if self.gallery:
+            face_images = face_images.filter(gallery=self.gallery)
+        return face_images.order_by("change_xid", "change_seq")
+
+    def wait_for_changes(self, timeout: float) -> bool:
+        """Wait until changes are available after the cursor, checking every
+        `FACE_IMAGE_CHANGES_POLL_INTERVAL` seconds.
+
+        Returns:
+            bool: Whether changes are available before `timeout` seconds passed
+        """
+        deadline = time.monotonic() + timeout
+        while not self._get_changes().exists():
+            remaining_time = deadline - time.monotonic()
+            if remaining_time <= 0:
+                return False
+            time.sleep(min(settings.FACE_IMAGE_CHANGES_POLL_INTERVAL, remaining_time))
+        return True
+
+    def iter_changes(self) -> Iterator[FaceImage]:
+        """Yield the next `limit` changed face images from a server-side
+        cursor, without their cached detection results."""
+        face_images = (
+            self._get_changes()
+            .annotate(gallery_public_id=F("gallery__public_id"))
+            .defer("face_locations", "face_landmarks", "encoding_params")
+        )
+        return face_images[: self.limit].iterator(chunk_size=settings.FACE_STATS_CHUNK_SIZE)
+
+
+class RunningEncodingStatistics:
+    """Accumulate count, mean, variance, min & max of face encodings chunk
+    by chunk with vectorized Chan/Welford merges, memory stays constant
+    whatever the number of encodings."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean: np.ndarray | None = None
+        self.m2: np.ndarray | None = None
+        self.minimum: np.ndarray | None = None
+        self.maximum: np.ndarray | None = None
+
+    def update(self, encodings: np.ndarray) -> None:
+        """Merge a (n, dimensions) chunk of encodings into the statistics."""
+        chunk_count = encodings.shape[0]
+        if not chunk_count:
+            return
+        chunk_mean = encodings.mean(axis=0)
+        chunk_m2 = ((encodings - chunk_mean) ** 2).sum(axis=0)
+        chunk_minimum, chunk_maximum = encodings.min(axis=0), encodings.max(axis=0)
+
+        if self.count == 0:
+            self.count, self.mean, self.m2 = chunk_count, chunk_mean, chunk_m2
+            self.minimum, self.maximum = chunk_minimum, chunk_maximum
+            return
+        if chunk_mean.shape != self.mean.shape:
+            raise ValueError("Face encodings have different dimensions.")
+
+        total = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean = self.mean + delta * (chunk_count / total)
+        self.m2 = self.m2 + chunk_m2 + delta**2 * (self.count * chunk_count / total)
+        self.minimum = np.minimum(self.minimum, chunk_minimum)
+        self.maximum = np.maximum(self.maximum, chunk_maximum)
+        self.count = total
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean.tolist(),
+            "variance": (self.m2 / self.count).tolist(),
+            "min": self.minimum.tolist(),
+            "max": self.maximum.tolist(),
+        }
+
+
+class PercentileCont(Aggregate):
+    """Postgres continuous percentile of an expression."""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile: float, **extra) -> None:
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
 class FaceImageStatsService:
-    """Calculate Face Image stats."""
+    """Calculate Face Image stats.
+
+    Stats are scoped to a gallery when one is given, reading only its rows
+    through the gallery indexes, otherwise they cover all face images.
+    """
+
+    @staticmethod
+    def _get_face_images(gallery: Gallery | None) -> QuerySet:
+        return FaceImage.objects.filter(gallery=gallery) if gallery else FaceImage.objects.all()
 
     @classmethod
-    def get_status_stats(cls) -> list[dict]:
+    def get_status_stats(cls, gallery: Gallery | None = None) -> list[dict]:
         """Return Stats for Face image status and its count.
 
         Returns:
             list: list of dict with encoding stats and its count
         """
         try:
-            status_counts = FaceImage.objects.values("encoding_status").annotate(count=Count("encoding_status"))
+            status_counts = (
+                cls._get_face_images(gallery).values("encoding_status").annotate(count=Count("encoding_status"))
+            )
             logger.info("Return images status stats successfully...")
             return status_counts
         except Exception as exc:
@@ -99,14 +1089,109 @@ class FaceImageStatsService:
             raise ValidationError(error_message)
 
     @classmethod
-    def get_faces_encoding_average(cls) -> list:
-        """Retrieve all success encoded faces and calculate the average.
+    def get_tier_stats(cls, window: timedelta, gallery: Gallery | None = None) -> list[dict]:
+        """Return the encoding latency percentiles & throughput of each tier
+        over the last `window`.
+
+        Returns:
+            list: list of dict with tier, count, throughput & latencies in ms
+        """
+        try:
+            tier_stats = (
+                cls._get_face_images(gallery)
+                .filter(created_at__gte=timezone.now() - window, encoding_duration_ms__isnull=False)
+                # Pre-screening rejects never reach the pipeline, they'd hide its latency
+                .exclude(failure_reason__in=FaceImage.PRESCREEN_FAILURE_REASONS)
+                .values("tier")
+                .annotate(
+                    count=Count("id"),
+                    latency_avg_ms=Avg("encoding_duration_ms"),
+                    latency_p50_ms=PercentileCont("encoding_duration_ms", 0.5),
+                    latency_p95_ms=PercentileCont("encoding_duration_ms", 0.95),
+                    latency_p99_ms=PercentileCont("encoding_duration_ms", 0.99),
+                )
+                .order_by("tier")
+            )
+            window_minutes = window.total_seconds() / 60
+            tier_stats = [{**stats, "throughput_per_minute": stats["count"] / window_minutes} for stats in tier_stats]
+            logger.info("Return tier stats successfully...")
+            return tier_stats
+        except Exception as exc:
+            error_message = f"Exception occurred while calculating tier stats: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+    BUCKET_STEPS = {
+        FaceImageStatusRollup.GRANULARITY_MINUTE: timedelta(minutes=1),
+        FaceImageStatusRollup.GRANULARITY_HOUR: timedelta(hours=1),
+    }
+
+    @staticmethod
+    def get_bucket(moment: datetime, granularity: str) -> datetime:
+        """Return the start of the UTC minute or hour holding `moment`."""
+        bucket = moment.astimezone(dt_timezone.utc).replace(second=0, microsecond=0)
+        return bucket.replace(minute=0) if granularity == FaceImageStatusRollup.GRANULARITY_HOUR else bucket
+
+    @classmethod
+    def get_status_timeseries(
+        cls, granularity: str, start: datetime, end: datetime, gallery: Gallery | None = None
+    ) -> list[dict]:
+        """Return the count of face images created in each minute or hour
+        from `start` until `end` per encoding status, read from the status
+        rollups without scanning face images.
+
+        Returns:
+            list: list of dict with bucket, counts per status & success/failure rates
+        """
+        try:
+            first_bucket, step = cls.get_bucket(start, granularity), cls.BUCKET_STEPS[granularity]
+            rollups = FaceImageStatusRollup.objects.filter(
+                granularity=granularity, bucket__gte=first_bucket, bucket__lt=end
+            )
+            if gallery:
+                rollups = rollups.filter(gallery=gallery)
+            counts = {
+                (rollup["bucket"], rollup["encoding_status"]): rollup["count"]
+                for rollup in rollups.values("bucket", "encoding_status").annotate(count=Sum("count")).order_by()
+            }
+
+            timeseries = []
+            bucket = first_bucket
+            while bucket < end:
+                bucket_counts = {
+                    status.lower(): counts.get((bucket, status), 0) for status, _ in FaceImage.ENCODE_STATUS_CHOICES
+                }
+                total = sum(bucket_counts.values())
+                timeseries.append(
+                    {
+                        "bucket": bucket,
+                        "total": total,
+                        **bucket_counts,
+                        "success_rate": bucket_counts["success"] / total if total else 0.0,
+                        "failure_rate": bucket_counts["failed"] / total if total else 0.0,
+                    }
+                )
+                bucket += step
+            logger.info("Return status timeseries successfully...")
+            return timeseries
+        except Exception as exc:
+            error_message = f"Exception occurred while calculating status timeseries: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+    @classmethod
+    def get_faces_encoding_average(cls, gallery: Gallery | None = None) -> list:
+        """Retrieve all success encoded faces and calculate the average, a
+        gallery average is read from its encoding sum.
 
         Returns:
             list: Average face encoding
         """
+        if gallery:
+            return GalleryService.get_encoding_average(gallery)
         try:
-            face_images = FaceImage.objects.filter(encoding_status=FaceImage.ENCODE_SUCCESS)
+            # Summed in a stable order so the average doesn't depend on where rows sit in the table
+            face_images = FaceImage.objects.filter(encoding_status=FaceImage.ENCODE_SUCCESS).order_by("id")
             if not face_images:
                 error_message = "No face encodings found."
                 logger.warning(error_message, exc_info=True)
@@ -133,3 +1218,543 @@ class FaceImageStatsService:
             error_message = f"Exception occurred while calculating face encoding Average: {exc}"
             logger.warning(error_message, exc_info=True)
             raise ValidationError(error_message)
+
+    @classmethod
+    def _iter_encoding_chunks(cls, face_images: QuerySet, chunk_size: int) -> Iterator[np.ndarray]:
+        """Stream encodings from a server-side cursor as (n, dimensions)
+        arrays of at most `chunk_size` rows."""
+        encodings = face_images.values_list("face_encoding", flat=True).iterator(chunk_size=chunk_size)
+        while chunk := list(islice(encodings, chunk_size)):
+            if len({len(encoding) for encoding in chunk}) > 1:
+                raise ValueError("Face encodings have different dimensions.")
+            yield np.frombuffer(b"".join(chunk), dtype=float).reshape(len(chunk), -1)
+
+    @classmethod
+    def get_encoding_statistics(cls, **filters) -> dict:
+        """Calculate mean, variance and per dimension min/max of the face
+        encodings matching the filters in bounded memory.
+
+        Args:
+            filters: FaceImage lookups, e.g. `encoding_status` or `created_at__gte`
+
+        Returns:
+            dict: count, mean, variance, min & max of the encodings
+        """
+        try:
+            face_images = FaceImage.objects.filter(**filters).exclude(face_encoding=b"").order_by()
+            statistics = RunningEncodingStatistics()
+            for encodings in cls._iter_encoding_chunks(face_images, settings.FACE_STATS_CHUNK_SIZE):
+                statistics.update(encodings)
+
+            if not statistics.count:
+                error_message = "No face encodings found."
+                logger.warning(error_message, exc_info=True)
+                raise ValidationError(error_message)
+
+            logger.info(f"Return encoding statistics of {statistics.count} face images successfully...")
+            return statistics.to_dict()
+        except Exception as exc:
+            error_message = f"Exception occurred while calculating face encoding statistics: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+
+class FaceEncodingDistanceExportService:
+    """Export the pairwise distances between SUCCESS face encodings for
+    offline analysis, in tiles that fit in memory.
+
+    Encodings are staged once as float32 in `encodings.npy`, their row
+    order is listed in `face_images.csv`. Tiles of `tile_size` x
+    `tile_size` distances are computed across a process pool reading the
+    staged encodings through a memory map, and written straight into
+    memory-mapped outputs: the whole `distances.npy` matrix, or with
+    `top_k` the rows of the `top_k` nearest face images of each row in
+    `neighbors.npy` and their `distances.npy`.
+    """
+
+    INDEX_FILE = "face_images.csv"
+    ENCODINGS_FILE = "encodings.npy"
+    DISTANCES_FILE = "distances.npy"
+    NEIGHBORS_FILE = "neighbors.npy"
+
+    def __init__(
+        self,
+        output_dir: str,
+        top_k: int = 0,
+        tile_size: int = 2048,
+        workers: int = 1,
+        niceness: int = 10,
+        gallery: Gallery | None = None,
+        tier: str | None = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.top_k = top_k
+        self.tile_size = tile_size
+        self.workers = workers
+        self.niceness = niceness
+        self.gallery = gallery
+        self.tier = tier
+
+    @staticmethod
+    def _init_worker(niceness: int) -> None:
+        """Lower the priority of pool workers so the live API keeps the CPU."""
+        os.nice(niceness)
+
+    @staticmethod
+    def get_distances(rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Euclidean distances between every row & column encoding, as a
+        single matrix product."""
+        squared = (rows * rows).sum(axis=1)[:, None] + (columns * columns).sum(axis=1)[None, :] - 2 * rows @ columns.T
+        return np.sqrt(np.maximum(squared, 0, out=squared), out=squared)
+
+    def stage_encodings(self) -> int:
+        """Write the encodings to export into `encodings.npy` & their face
+        images into `face_images.csv`, streamed from a server-side cursor.
+
+        Returns:
+            int: Staged encodings count
+        """
+        face_images = FaceImage.objects.filter(encoding_status=FaceImage.ENCODE_SUCCESS).exclude(face_encoding=b"")
+        if self.gallery:
+            face_images = face_images.filter(gallery=self.gallery)
+        if self.tier:
+            face_images = face_images.filter(tier=self.tier)
+        chunk_size = settings.FACE_STATS_CHUNK_SIZE
+        rows = (
+            face_images.order_by("id")
+            .values_list("public_id", "gallery__public_id", "tier", "face_encoding")
+            .iterator(chunk_size=chunk_size)
+        )
+
+        encodings_path = os.path.join(self.output_dir, self.ENCODINGS_FILE)
+        staging_path = f"{encodings_path}.tmp"
+        count, dimensions = 0, 0
+        with open(os.path.join(self.output_dir, self.INDEX_FILE), "w", newline="") as index_file, open(
+            staging_path, "wb"
+        ) as staging_file:
+            writer = csv.writer(index_file)
+            writer.writerow(["row", "public_id", "gallery_public_id", "tier"])
+            while chunk := list(islice(rows, chunk_size)):
+                if len({len(face_encoding) for *_, face_encoding in chunk}) > 1:
+                    raise ValueError("Face encodings have different dimensions.")
+                encodings = np.frombuffer(b"".join(face_encoding for *_, face_encoding in chunk), dtype=float)
+                encodings = encodings.reshape(len(chunk), -1).astype(np.float32)
+                if dimensions and encodings.shape[1] != dimensions:
+                    raise ValueError("Face encodings have different dimensions.")
+                dimensions = encodings.shape[1]
+                staging_file.write(encodings.tobytes())
+                writer.writerows(
+                    [count + index, public_id, gallery_public_id or "", tier]
+                    for index, (public_id, gallery_public_id, tier, _) in enumerate(chunk)
+                )
+                count += len(chunk)
+
+        # The shape is only known once staged, the header is written in front of the staged rows
+        with open(encodings_path, "wb") as encodings_file, open(staging_path, "rb") as staging_file:
+            np.lib.format.write_array_header_1_0(
+                encodings_file, {"descr": "<f4", "fortran_order": False, "shape": (count, dimensions)}
+            )
+            shutil.copyfileobj(staging_file, encodings_file)
+        os.remove(staging_path)
+        return count
+
+    @classmethod
+    def _write_distance_tile(cls, output_dir: str, row_start: int, column_start: int, tile_size: int) -> None:
+        """Compute a tile of the distance matrix & write it with its mirror
+        tile."""
+        encodings = np.load(os.path.join(output_dir, cls.ENCODINGS_FILE), mmap_mode="r")
+        distances = np.load(os.path.join(output_dir, cls.DISTANCES_FILE), mmap_mode="r+")
+        rows = np.asarray(encodings[row_start : row_start + tile_size])
+        columns = np.asarray(encodings[column_start : column_start + tile_size])
+        tile = cls.get_distances(rows, columns)
+        row_end, column_end = row_start + len(rows), column_start + len(columns)
+        if row_start == column_start:
+            np.fill_diagonal(tile, 0)
+        distances[row_start:row_end, column_start:column_end] = tile
+        if row_start != column_start:
+            distances[column_start:column_end, row_start:row_end] = tile.T
+        distances.flush()
+
+    @classmethod
+    def _write_nearest_rows(cls, output_dir: str, row_start: int, tile_size: int, top_k: int) -> None:
+        """Find the `top_k` nearest face images of a block of rows, merging
+        the nearest ones of each column tile into a running selection."""
+        encodings = np.load(os.path.join(output_dir, cls.ENCODINGS_FILE), mmap_mode="r")
+        rows = np.asarray(encodings[row_start : row_start + tile_size])
+        nearest_distances = np.full((len(rows), top_k), np.inf, dtype=np.float32)
+        nearest = np.full((len(rows), top_k), -1, dtype=np.int64)
+        for column_start in range(0, len(encodings), tile_size):
+            columns = np.asarray(encodings[column_start : column_start + tile_size])
+            tile = cls.get_distances(rows, columns)
+            if column_start == row_start:
+                # A face image isn't its own neighbor
+                np.fill_diagonal(tile, np.inf)
+            candidate_distances = np.hstack([nearest_distances, tile])
+            candidates = np.hstack(
+                [nearest, np.broadcast_to(np.arange(column_start, column_start + len(columns)), tile.shape)]
+            )
+            kept = np.argpartition(candidate_distances, top_k - 1, axis=1)[:, :top_k]
+            nearest_distances = np.take_along_axis(candidate_distances, kept, axis=1)
+            nearest = np.take_along_axis(candidates, kept, axis=1)
+
+        order = np.argsort(nearest_distances, axis=1, kind="stable")
+        row_end = row_start + len(rows)
+        distances = np.load(os.path.join(output_dir, cls.DISTANCES_FILE), mmap_mode="r+")
+        neighbors = np.load(os.path.join(output_dir, cls.NEIGHBORS_FILE), mmap_mode="r+")
+        distances[row_start:row_end] = np.take_along_axis(nearest_distances, order, axis=1)
+        neighbors[row_start:row_end] = np.take_along_axis(nearest, order, axis=1)
+        distances.flush()
+        neighbors.flush()
+
+    def perform(self) -> dict:
+        """Stage the encodings, then compute & write the distance tiles
+        across the process pool.
+
+        Returns:
+            dict: Exported face images count, neighbors per face image (0 for
+            the whole matrix), computed tiles & written files
+        """
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            count = self.stage_encodings()
+            top_k = min(self.top_k, max(count - 1, 0))
+            distances_path = os.path.join(self.output_dir, self.DISTANCES_FILE)
+            files = [self.INDEX_FILE, self.ENCODINGS_FILE, self.DISTANCES_FILE]
+            starts = range(0, count, self.tile_size)
+            if top_k:
+                files.append(self.NEIGHBORS_FILE)
+                np.lib.format.open_memmap(distances_path, mode="w+", dtype=np.float32, shape=(count, top_k))
+                np.lib.format.open_memmap(
+                    os.path.join(self.output_dir, self.NEIGHBORS_FILE), mode="w+", dtype=np.int64, shape=(count, top_k)
+                )
+                tasks = [(self._write_nearest_rows, self.output_dir, start, self.tile_size, top_k) for start in starts]
+            else:
+                required_bytes, free_bytes = count * count * 4, shutil.disk_usage(self.output_dir).free
+                if required_bytes > free_bytes:
+                    raise ValueError(
+                        f"the distance matrix takes {required_bytes} bytes with {free_bytes} bytes free, use top_k."
+                    )
+                np.lib.format.open_memmap(distances_path, mode="w+", dtype=np.float32, shape=(count, count))
+                tasks = [
+                    (self._write_distance_tile, self.output_dir, row_start, column_start, self.tile_size)
+                    for row_start in starts
+                    for column_start in starts
+                    if column_start >= row_start
+                ]
+
+            # Workers only read & write the memory-mapped files, never the inherited DB connection
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=self._init_worker,
+                initargs=(self.niceness,),
+            ) as executor:
+                futures = [executor.submit(*task) for task in tasks]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    future.result()
+                    logger.info(f"Distance tiles written: {done}/{len(futures)}")
+
+            logger.info(f"Exported encoding distances of {count} face images into {self.output_dir} successfully...")
+            return {"face_images": count, "top_k": top_k, "tiles": len(tasks), "files": files}
+        except Exception as exc:
+            error_message = f"Exception occurred while exporting encoding distances: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+
+class GalleryService:
+    """Maintain the per gallery counters & SUCCESS encodings sum.
+
+    Each change locks the gallery row for a single update, so concurrent
+    encodings into the same gallery never lose an update.
+    """
+
+    @staticmethod
+    def _update(gallery_id: int, face_images_delta: int, added: list[bytes], removed: list[bytes]) -> None:
+        with transaction.atomic():
+            gallery = Gallery.objects.select_for_update().get(id=gallery_id)
+            encoding_sum = np.frombuffer(gallery.encoding_sum, dtype=float) if gallery.encoding_sum else 0.0
+            for encoding in added:
+                encoding_sum = encoding_sum + np.frombuffer(encoding, dtype=float)
+            for encoding in removed:
+                encoding_sum = encoding_sum - np.frombuffer(encoding, dtype=float)
+            gallery.face_image_count += face_images_delta
+            gallery.encoded_count += len(added) - len(removed)
+            gallery.encoding_sum = np.asarray(encoding_sum).tobytes() if gallery.encoded_count else b""
+            gallery.save(update_fields=["face_image_count", "encoded_count", "encoding_sum", "updated_at"])
+
+    @classmethod
+    def add_face_image(cls, face_image: FaceImage) -> None:
+        """Count a created face image into its gallery."""
+        added = [bytes(face_image.face_encoding)] if face_image.encoding_status == FaceImage.ENCODE_SUCCESS else []
+        cls._update(face_image.gallery_id, 1, added, [])
+
+    @classmethod
+    def replace_encoding(cls, gallery_id: int, previous_encoding: bytes, encoding: bytes) -> None:
+        """Swap a re-encoded face image encoding in its gallery sum, empty
+        encodings stand for non SUCCESS encodings."""
+        cls._update(gallery_id, 0, [encoding] if encoding else [], [previous_encoding] if previous_encoding else [])
+
+    @classmethod
+    def refresh_aggregates(cls, gallery_ids: Iterable[int]) -> None:
+        """Recompute the counters & encodings sum of galleries from their
+        face images, after bulk changes that bypass the services."""
+        for gallery_id in gallery_ids:
+            with transaction.atomic():
+                gallery = Gallery.objects.select_for_update().get(id=gallery_id)
+                face_images = FaceImage.objects.filter(gallery=gallery).order_by()
+                encoded = face_images.filter(encoding_status=FaceImage.ENCODE_SUCCESS).exclude(face_encoding=b"")
+                encoding_sum, encoded_count = 0.0, 0
+                for encodings in FaceImageStatsService._iter_encoding_chunks(encoded, settings.FACE_STATS_CHUNK_SIZE):
+                    encoding_sum = encoding_sum + encodings.sum(axis=0)
+                    encoded_count += len(encodings)
+                gallery.face_image_count = face_images.count()
+                gallery.encoded_count = encoded_count
+                gallery.encoding_sum = np.asarray(encoding_sum).tobytes() if encoded_count else b""
+                gallery.save(update_fields=["face_image_count", "encoded_count", "encoding_sum", "updated_at"])
+            logger.info(f"Gallery: {gallery.public_id} aggregates refreshed...")
+
+    @classmethod
+    def get_encoding_average(cls, gallery: Gallery) -> list:
+        """Return the average encoding of a gallery from its encodings sum.
+
+        Returns:
+            list: Average face encoding
+        """
+        gallery = Gallery.objects.only("encoded_count", "encoding_sum").get(id=gallery.id)
+        if not gallery.encoded_count:
+            error_message = "No face encodings found."
+            logger.warning(error_message)
+            raise ValidationError(error_message)
+        if gallery.encoded_count < 2:
+            error_message = "Insufficient face encodings to calculate average."
+            logger.warning(error_message)
+            raise ValidationError(error_message)
+        return (np.frombuffer(gallery.encoding_sum, dtype=float) / gallery.encoded_count).tolist()
+
+
+class FaceImagePartitionService:
+    """Create & Purge the monthly `created_at` partitions of `face_image`.
+
+    Partitions are named `face_image_pYYYYMM` and cover one UTC month, rows
+    outside of all partitions land in `face_image_default`. An expired
+    partition is detached & renamed `face_image_purge_pYYYYMM` until its
+    images are deleted, a purge interrupted in between is finished by the
+    next one.
+    """
+
+    TABLE = FaceImage._meta.db_table
+    DEFAULT_PARTITION = f"{TABLE}_default"
+    PARTITION_NAME_REGEX = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+    PURGE_PREFIX = f"{TABLE}_purge_"
+
+    @staticmethod
+    def _add_months(month_start: datetime, months: int) -> datetime:
+        year, month = divmod(month_start.month - 1 + months, 12)
+        return month_start.replace(year=month_start.year + year, month=month + 1)
+
+    @classmethod
+    def get_partition_name(cls, month_start: datetime) -> str:
+        return f"{cls.TABLE}_p{month_start:%Y%m}"
+
+    @classmethod
+    def list_partitions(cls) -> list[tuple[str, datetime, datetime]]:
+        """Return the monthly partitions as (name, start, end) sorted by
+        start, the default partition is left out."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = %s::regclass",
+                [cls.TABLE],
+            )
+            names = [name for (name,) in cursor.fetchall()]
+
+        partitions = []
+        for name in names:
+            if match := cls.PARTITION_NAME_REGEX.match(name):
+                month_start = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+                partitions.append((name, month_start, cls._add_months(month_start, 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @classmethod
+    def _create_partition(cls, month_start: datetime) -> None:
+        """Create the partition of a month, rows of that month already in the
+        default partition are moved into it before it's attached."""
+        name = connection.ops.quote_name(cls.get_partition_name(month_start))
+        bounds = [month_start, cls._add_months(month_start, 1)]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {cls.TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {cls.DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+                bounds,
+            )
+            cursor.execute(f"ALTER TABLE {cls.TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", bounds)
+
+    @classmethod
+    def create_partitions(cls, months_ahead: int) -> list[str]:
+        """Create the missing partitions from the current month up to
+        `months_ahead` months later.
+
+        Returns:
+            list[str]: Names of the created partitions
+        """
+        try:
+            existing = {name for name, _, _ in cls.list_partitions()}
+            current_month = timezone.now().astimezone(dt_timezone.utc)
+            current_month = current_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            created = []
+            for months in range(months_ahead + 1):
+                month_start = cls._add_months(current_month, months)
+                if cls.get_partition_name(month_start) not in existing:
+                    cls._create_partition(month_start)
+                    created.append(cls.get_partition_name(month_start))
+            logger.info(f"Created face image partitions: {created}")
+            return created
+        except Exception as exc:
+            error_message = f"Exception occurred while creating face image partitions: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
+
+    @classmethod
+    def _detach_partition(cls, name: str) -> str:
+        """Detach a partition & rename it so its rows stay readable until its
+        images are deleted.
+
+        Returns:
+            str: Name of the detached table
+        """
+        detached_name = f"{cls.PURGE_PREFIX}{name[len(cls.TABLE) + 1 :]}"
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Rows written earlier in the transaction have deferred gallery FK checks, which block the DETACH
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"ALTER TABLE {cls.TABLE} DETACH PARTITION {connection.ops.quote_name(name)}")
+            cursor.execute(
+                f"ALTER TABLE {connection.ops.quote_name(name)} RENAME TO {connection.ops.quote_name(detached_name)}"
+            )
+        return detached_name
+
+    @classmethod
+    def list_detached_partitions(cls) -> list[str]:
+        """Return the detached partitions whose images aren't deleted yet."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname FROM pg_class WHERE relkind = 'r' AND starts_with(relname, %s) ORDER BY relname",
+                [cls.PURGE_PREFIX],
+            )
+            return [name for (name,) in cursor.fetchall()]
+
+    @staticmethod
+    def _iter_detached_rows(name: str, batch_size: int) -> Iterator[list[tuple[str, int | None]]]:
+        """Yield the image path & gallery id of the rows of a detached
+        partition in batches, from a server-side cursor."""
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(f"SELECT image_url, gallery_id FROM {connection.ops.quote_name(name)}")
+            while rows := cursor.fetchmany(batch_size):
+                yield rows
+
+    @classmethod
+    def _iter_default_partition_rows(cls, cutoff: datetime, batch_size: int) -> Iterator[list[tuple[str, int | None]]]:
+        """Delete the rows of the default partition older than `cutoff`, a
+        batch per transaction, yielding the image path & gallery id of each
+        deleted batch."""
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {cls.DEFAULT_PARTITION} WHERE ctid IN ("
+                    f"SELECT ctid FROM {cls.DEFAULT_PARTITION} WHERE created_at < %s LIMIT %s"
+                    ") RETURNING image_url, gallery_id",
+                    [cutoff, batch_size],
+                )
+                rows = cursor.fetchall()
+            if not rows:
+                return
+            yield rows
+
+    @staticmethod
+    def _delete_images(image_paths: list[str]) -> int:
+        deleted = 0
+        for image_path in image_paths:
+            try:
+                default_storage.delete(image_path)
+                deleted += 1
+            except OSError as exc:
+                logger.warning(f"Image: {image_path} can't be deleted: {exc}")
+        return deleted
+
+    @classmethod
+    def get_expired_partitions(cls, cutoff: datetime) -> list[str]:
+        """Return the partitions whose whole month is older than `cutoff`."""
+        return [name for name, _, end in cls.list_partitions() if end <= cutoff]
+
+    @classmethod
+    def _delete_unreferenced_images(
+        cls, row_batches: Iterable[list[tuple[str, int | None]]], executor: ThreadPoolExecutor, workers: int
+    ) -> tuple[int, int, set[int]]:
+        """Delete the images of purged rows batch by batch as they're read,
+        with at most `2 * workers` batches waiting for a thread.
+
+        Returns:
+            tuple[int, int, set[int]]: Purged rows & deleted images counts and the galleries of the rows
+        """
+        purged_rows, deleted_images, gallery_ids, pending = 0, 0, set(), set()
+        for rows in row_batches:
+            purged_rows += len(rows)
+            gallery_ids.update(gallery_id for _, gallery_id in rows if gallery_id)
+            image_paths = {image_path for image_path, _ in rows if image_path}
+            referenced = set(FaceImage.objects.filter(image_url__in=image_paths).values_list("image_url", flat=True))
+            pending.add(executor.submit(cls._delete_images, sorted(image_paths - referenced)))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                deleted_images += sum(future.result() for future in done)
+        deleted_images += sum(future.result() for future in as_completed(pending))
+        return purged_rows, deleted_images, gallery_ids
+
+    @classmethod
+    def purge_partitions(cls, cutoff: datetime, workers: int = 4, batch_size: int = 500) -> dict:
+        """Drop the partitions older than `cutoff` and delete their images.
+
+        Whole partitions are dropped instead of deleting rows, rows of the
+        default partition older than `cutoff` are deleted too. Rows are
+        streamed in batches of `batch_size`: images still referenced by
+        remaining rows are kept, the others are deleted across a thread pool
+        once the rows are gone, so memory doesn't grow with the partitions.
+        Aggregates of the galleries that lost rows are refreshed.
+
+        Args:
+            cutoff (datetime): Rows created before it are purged
+            workers (int): Threads deleting images
+            batch_size (int): Images deleted per task
+
+        Returns:
+            dict: Dropped partitions, purged rows & deleted images counts
+        """
+        try:
+            partitions = cls.get_expired_partitions(cutoff)
+            for name in partitions:
+                cls._detach_partition(name)
+            purged_rows, deleted_images, gallery_ids = 0, 0, set()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Partitions detached by an interrupted purge too
+                detached_partitions = cls.list_detached_partitions()
+                row_batches = [cls._iter_detached_rows(name, batch_size) for name in detached_partitions]
+                row_batches.append(cls._iter_default_partition_rows(cutoff, batch_size))
+                for batches in row_batches:
+                    batch_rows, batch_images, batch_gallery_ids = cls._delete_unreferenced_images(
+                        batches, executor, workers
+                    )
+                    purged_rows, deleted_images = purged_rows + batch_rows, deleted_images + batch_images
+                    gallery_ids |= batch_gallery_ids
+            with connection.cursor() as cursor:
+                for name in detached_partitions:
+                    cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+            logger.info(f"Dropped face image partitions: {detached_partitions}, {purged_rows} rows purged")
+            GalleryService.refresh_aggregates(gallery_ids)
+
+            dropped = [f"{cls.TABLE}_{name[len(cls.PURGE_PREFIX) :]}" for name in detached_partitions]
+            return {"partitions": dropped, "purged_rows": purged_rows, "deleted_images": deleted_images}
+        except Exception as exc:
+            error_message = f"Exception occurred while purging face image partitions: {exc}"
+            logger.warning(error_message, exc_info=True)
+            raise ValidationError(error_message)
@@ -0,0 +1,310 @@
+# Standard Library
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
+
+# Django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+# Third Parties
+import numpy as np
+
+# Face Embeddings
+from face_images.models import FaceImage, Gallery
+from face_images.services import (
+    FaceEncodingPipeline,
+    FaceImageEncodingService,
+    FaceImagePartitionService,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MigrateMediaLayoutCommandTests(TestCase):
+    @classmethod
+    def create_flat_face_image(cls, file_name, content):
+        image_path = os.path.join(settings.MEDIA_ROOT, file_name)
+        with open(image_path, "wb") as image_file:
+            image_file.write(content)
+        return FaceImage.objects.create(image_url=image_path, encoding_status=FaceImage.ENCODE_SUCCESS)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_migrate_media_layout(self):
+        face_image = self.create_flat_face_image("test1.png", b"first image")
+        old_path = face_image.image_url
+
+        call_command("migrate_media_layout", batch_size=1, stdout=io.StringIO())
+
+        face_image.refresh_from_db()
+        content_hash = FaceImageEncodingService.get_content_hash(ContentFile(b"first image"))
+        self.assertEqual(face_image.content_hash, content_hash)
+        self.assertEqual(
+            face_image.image_url,
+            os.path.join(settings.MEDIA_ROOT, FaceImageEncodingService.get_image_name(content_hash, "test1.png")),
+        )
+        self.assertTrue(os.path.exists(face_image.image_url))
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_migrate_media_layout_shares_duplicate_content(self):
+        face_image1 = self.create_flat_face_image("test1.png", b"same image")
+        face_image2 = self.create_flat_face_image("test2.png", b"same image")
+        old_paths = [face_image1.image_url, face_image2.image_url]
+
+        with patch.object(default_storage, "save", wraps=default_storage.save) as save:
+            call_command("migrate_media_layout", batch_size=1, stdout=io.StringIO())
+
+        face_image1.refresh_from_db()
+        face_image2.refresh_from_db()
+        self.assertEqual(face_image1.image_url, face_image2.image_url)
+        self.assertEqual(face_image1.content_hash, face_image2.content_hash)
+        # The second row reuses the image already stored under the same content
+        self.assertEqual(save.call_count, 1)
+        self.assertTrue(os.path.exists(face_image1.image_url))
+        self.assertFalse(any(os.path.exists(old_path) for old_path in old_paths))
+
+    def test_migrate_media_layout_keeps_flat_file_still_referenced(self):
+        face_image1 = self.create_flat_face_image("test1.png", b"shared image")
+        face_image2 = FaceImage.objects.create(
+            image_url=face_image1.image_url, encoding_status=FaceImage.ENCODE_SUCCESS
+        )
+        old_path = face_image1.image_url
+
+        call_command("migrate_media_layout", batch_size=1, stdout=io.StringIO())
+
+        face_image1.refresh_from_db()
+        face_image2.refresh_from_db()
+        self.assertEqual(face_image2.image_url, face_image1.image_url)
+        self.assertTrue(os.path.exists(face_image2.image_url))
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_migrate_media_layout_dry_run(self):
+        face_image = self.create_flat_face_image("test1.png", b"first image")
+
+        call_command("migrate_media_layout", dry_run=True, stdout=io.StringIO())
+
+        face_image.refresh_from_db()
+        self.assertTrue(face_image.image_url.endswith("test1.png"))
+        self.assertEqual(face_image.content_hash, "")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReEncodeFaceImagesCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        image_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_image.jpg")
+        with open(image_file_path, "rb") as image_file:
+            cls.face_image = FaceImageEncodingService(ContentFile(image_file.read(), name="test_image.jpg")).perform()
+        cls.checkpoint_path = os.path.join(settings.MEDIA_ROOT, "reencode.checkpoint")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_reencode_stale_face_images(self):
+        call_command(
+            "reencode_face_images", workers=1, num_jitters=2, checkpoint=self.checkpoint_path, stdout=io.StringIO()
+        )
+
+        self.face_image.refresh_from_db()
+        self.assertEqual(self.face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(self.face_image.encoding_params, FaceEncodingPipeline(num_jitters=2).params)
+        with open(self.checkpoint_path) as checkpoint_file:
+            self.assertEqual(json.load(checkpoint_file)["last_id"], self.face_image.id)
+
+    def test_reencode_failed_face_images(self):
+        FaceImage.objects.filter(id=self.face_image.id).update(
+            encoding_status=FaceImage.ENCODE_FAILED, face_encoding=b"", face_locations=[]
+        )
+
+        call_command("reencode_face_images", workers=1, checkpoint=self.checkpoint_path, stdout=io.StringIO())
+
+        self.face_image.refresh_from_db()
+        self.assertEqual(self.face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(len(self.face_image.face_locations), 1)
+
+    def test_reencode_redetects_when_detection_model_changed(self):
+        # Encoded by an older run with another detection model, cached location no longer valid
+        encoding_params = {**FaceEncodingPipeline().params, "detection_model": "cnn"}
+        FaceImage.objects.filter(id=self.face_image.id).update(
+            encoding_params=encoding_params, face_locations=[[0, 10, 10, 0]], face_landmarks={}
+        )
+
+        call_command("reencode_face_images", workers=1, checkpoint=self.checkpoint_path, stdout=io.StringIO())
+
+        self.face_image.refresh_from_db()
+        top, right, bottom, left = self.face_image.face_locations[0]
+        self.assertGreater(bottom - top, 50)
+        self.assertEqual(self.face_image.encoding_params, FaceEncodingPipeline().params)
+
+    def test_reencode_resumes_from_checkpoint(self):
+        pipeline = FaceEncodingPipeline(num_jitters=2)
+        with open(self.checkpoint_path, "w") as checkpoint_file:
+            json.dump(
+                {"tier": pipeline.tier, "last_id": self.face_image.id, "params": pipeline.params}, checkpoint_file
+            )
+
+        call_command(
+            "reencode_face_images",
+            workers=1,
+            num_jitters=2,
+            resume=True,
+            checkpoint=self.checkpoint_path,
+            stdout=io.StringIO(),
+        )
+
+        self.face_image.refresh_from_db()
+        self.assertNotEqual(self.face_image.encoding_params, pipeline.params)
+
+
+class ExportFaceDistancesCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gallery = Gallery.objects.create(name="Export Gallery")
+        cls.encodings = np.random.default_rng(0).normal(0, 0.1, size=(7, 128))
+        cls.face_images = [
+            FaceImage.objects.create(
+                image_url=f"face_{index}.jpg",
+                face_encoding=encoding.tobytes(),
+                encoding_status=FaceImage.ENCODE_SUCCESS,
+                gallery=cls.gallery if index < 3 else None,
+            )
+            for index, encoding in enumerate(cls.encodings)
+        ]
+        FaceImage.objects.create(image_url="failed.jpg", face_encoding=b"", encoding_status=FaceImage.ENCODE_FAILED)
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        Gallery.objects.all().delete()
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, ignore_errors=True)
+        self.expected_distances = np.linalg.norm(self.encodings[:, None] - self.encodings[None, :], axis=2)
+
+    def export(self, **options):
+        call_command("export_face_distances", self.output_dir, tile_size=3, workers=2, stdout=io.StringIO(), **options)
+
+    def test_export_distance_matrix(self):
+        self.export()
+
+        distances = np.load(os.path.join(self.output_dir, "distances.npy"))
+        np.testing.assert_allclose(distances, self.expected_distances, atol=1e-4)
+        with open(os.path.join(self.output_dir, "face_images.csv")) as index_file:
+            rows = list(csv.DictReader(index_file))
+        self.assertEqual([row["public_id"] for row in rows], [str(face.public_id) for face in self.face_images])
+        self.assertEqual(np.load(os.path.join(self.output_dir, "encodings.npy")).shape, (7, 128))
+
+    def test_export_nearest_neighbors(self):
+        self.export(top_k=2)
+
+        neighbors = np.load(os.path.join(self.output_dir, "neighbors.npy"))
+        distances = np.load(os.path.join(self.output_dir, "distances.npy"))
+        np.fill_diagonal(self.expected_distances, np.inf)
+        expected_neighbors = np.argsort(self.expected_distances, axis=1)[:, :2]
+        np.testing.assert_array_equal(neighbors, expected_neighbors)
+        np.testing.assert_allclose(
+            distances, np.take_along_axis(self.expected_distances, expected_neighbors, axis=1), atol=1e-4
+        )
+
+    def test_export_gallery(self):
+        self.export(gallery=str(self.gallery.public_id), top_k=10)
+
+        neighbors = np.load(os.path.join(self.output_dir, "neighbors.npy"))
+        self.assertEqual(neighbors.shape, (3, 2))
+        np.testing.assert_allclose(
+            np.load(os.path.join(self.output_dir, "encodings.npy")), self.encodings[:3].astype(np.float32)
+        )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class FaceImagePartitionCommandsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    @staticmethod
+    def create_face_image(file_name, created_at):
+        image_path = os.path.join(settings.MEDIA_ROOT, file_name)
+        with open(image_path, "wb") as image_file:
+            image_file.write(file_name.encode())
+        face_image = FaceImage.objects.create(image_url=image_path, encoding_status=FaceImage.ENCODE_SUCCESS)
+        FaceImage.objects.filter(id=face_image.id).update(created_at=created_at)
+        return face_image
+
+    def test_create_face_image_partitions(self):
+        now = timezone.now()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        future_month = FaceImagePartitionService._add_months(month_start, 6)
+        face_image = self.create_face_image("future.png", future_month + timedelta(days=1))
+
+        call_command("create_face_image_partitions", months_ahead=6, stdout=io.StringIO())
+
+        partition_names = [name for name, _, _ in FaceImagePartitionService.list_partitions()]
+        for months in range(7):
+            month = FaceImagePartitionService._add_months(month_start, months)
+            self.assertIn(FaceImagePartitionService.get_partition_name(month), partition_names)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {FaceImagePartitionService.get_partition_name(future_month)}")
+            self.assertEqual(cursor.fetchall(), [(face_image.id,)])
+
+    def test_purge_face_image_partitions(self):
+        old_month = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        FaceImagePartitionService._create_partition(old_month)
+        old_face_image = self.create_face_image("old.png", old_month + timedelta(days=1))
+        shared_face_image = self.create_face_image("shared.png", old_month + timedelta(days=2))
+        FaceImage.objects.create(image_url=shared_face_image.image_url)
+        new_face_image = self.create_face_image("new.png", timezone.now())
+
+        call_command("purge_face_image_partitions", retention_days=30, workers=1, batch_size=1, stdout=io.StringIO())
+
+        self.assertNotIn(
+            FaceImagePartitionService.get_partition_name(old_month),
+            [name for name, _, _ in FaceImagePartitionService.list_partitions()],
+        )
+        self.assertFalse(FaceImage.objects.filter(id__in=[old_face_image.id, shared_face_image.id]).exists())
+        self.assertFalse(os.path.exists(old_face_image.image_url))
+        self.assertTrue(os.path.exists(shared_face_image.image_url))
+        self.assertTrue(os.path.exists(new_face_image.image_url))
+        self.assertTrue(FaceImage.objects.filter(id=new_face_image.id).exists())
+
+    def test_purge_finishes_interrupted_purge(self):
+        old_month = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        FaceImagePartitionService._create_partition(old_month)
+        old_face_image = self.create_face_image("old.png", old_month + timedelta(days=1))
+        # Detached by a purge interrupted before its images were deleted
+        FaceImagePartitionService._detach_partition(FaceImagePartitionService.get_partition_name(old_month))
+
+        result = FaceImagePartitionService.purge_partitions(timezone.now() - timedelta(days=30))
+
+        self.assertEqual(result["partitions"], [FaceImagePartitionService.get_partition_name(old_month)])
+        self.assertEqual(result["deleted_images"], 1)
+        self.assertEqual(FaceImagePartitionService.list_detached_partitions(), [])
+        self.assertFalse(os.path.exists(old_face_image.image_url))
+
+    def test_purge_face_image_partitions_dry_run(self):
+        old_month = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        FaceImagePartitionService._create_partition(old_month)
+        face_image = self.create_face_image("old.png", old_month + timedelta(days=1))
+
+        stdout = io.StringIO()
+        call_command("purge_face_image_partitions", retention_days=30, dry_run=True, stdout=stdout)
+
+        self.assertIn(FaceImagePartitionService.get_partition_name(old_month), stdout.getvalue())
+        self.assertTrue(FaceImage.objects.filter(id=face_image.id).exists())
+        self.assertTrue(os.path.exists(face_image.image_url))
@@ -1,22 +1,46 @@
 # Standard Library
+import hashlib
 import io
 import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
 
 # Django
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 
 # Third Parties
 import numpy as np
 import pytest
-from PIL import Image
+from PIL import Image, ImageFilter
 
 # Face Embeddings
-from face_images.models import FaceImage
-from face_images.services import FaceImageEncodingService, FaceImageStatsService
+from face_images.models import FaceImage, FaceImageStatusRollup, Gallery
+from face_images.services import (
+    FaceEncodingPipeline,
+    FaceEncodingWindow,
+    FaceImageChangeFeedService,
+    FaceImageDedupStats,
+    FaceImageEncodingService,
+    FaceImageNearDuplicateIndex,
+    FaceImagePreScreener,
+    FaceImageReEncodingService,
+    FaceImageStatsService,
+    FaceImageStatusWatcher,
+    GalleryService,
+)
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class FaceImageEncodingServiceTests(TestCase):
     @classmethod
     def get_image_content(cls, file_path):
@@ -40,18 +64,10 @@ class FaceImageEncodingServiceTests(TestCase):
         )
         cls.fake_image = cls.generate_fake_image()
 
-    @classmethod
-    def delete_image_file(cls):
-        media_path = settings.MEDIA_ROOT
-        for filename in os.listdir(media_path):
-            if filename.startswith("test"):
-                file_path = os.path.join(media_path, filename)
-                os.remove(file_path)
-
     @classmethod
     def tearDownClass(cls):
         FaceImage.objects.all().delete()
-        cls.delete_image_file()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
 
     def test_face_image_encoding_service(self):
         service = FaceImageEncodingService(image_data=self.face_image)
@@ -61,6 +77,31 @@ class FaceImageEncodingServiceTests(TestCase):
         self.assertEqual(face_image.image_url, service.image_path)
         self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
 
+    @override_settings(
+        FACE_ENCODING_TIERS={
+            **settings.FACE_ENCODING_TIERS,
+            "fast": {"detection_model": "hog", "upsample": 1, "landmark_model": "small", "max_dimension": 100},
+        }
+    )
+    def test_face_image_encoding_service_with_tier(self):
+        face_image = FaceImageEncodingService(image_data=self.face_image, tier=FaceImage.TIER_FAST).perform()
+
+        self.assertEqual(face_image.tier, FaceImage.TIER_FAST)
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(face_image.encoding_params["max_dimension"], 100)
+        self.assertGreater(face_image.encoding_duration_ms, 0)
+        # Detected on the downscaled image, located on the full one
+        top, right, bottom, left = face_image.face_locations[0]
+        self.assertGreater(bottom - top, 50)
+        self.assertLessEqual(right, 150)
+
+    def test_same_image_encoded_per_tier(self):
+        balanced_face_image = FaceImageEncodingService(image_data=self.face_image).perform()
+        fast_face_image = FaceImageEncodingService(image_data=self.face_image, tier=FaceImage.TIER_FAST).perform()
+
+        self.assertNotEqual(balanced_face_image.id, fast_face_image.id)
+        self.assertEqual(balanced_face_image.image_url, fast_face_image.image_url)
+
     def test_image_stored_in_media(self):
         service = FaceImageEncodingService(image_data=self.face_image)
         stored_path = service._store_image(self.face_image)
@@ -68,6 +109,53 @@ class FaceImageEncodingServiceTests(TestCase):
         self.assertTrue(os.path.exists(stored_path))
         self.assertTrue(stored_path.startswith(settings.MEDIA_ROOT))
 
+    def test_image_stored_under_content_hash(self):
+        service = FaceImageEncodingService(image_data=self.face_image)
+        content_hash = service.get_content_hash(self.face_image)
+        expected_path = os.path.join(settings.MEDIA_ROOT, content_hash[:2], content_hash[2:4], f"{content_hash}.jpg")
+        face_image = service.perform()
+
+        self.assertEqual(service.content_hash, content_hash)
+        self.assertEqual(face_image.image_url, expected_path)
+        self.assertTrue(os.path.exists(expected_path))
+
+    def test_same_image_reuses_face_image(self):
+        face_image = FaceImageEncodingService(image_data=self.face_image).perform()
+        duplicate_face_image = FaceImageEncodingService(image_data=self.face_image).perform()
+
+        self.assertEqual(duplicate_face_image.public_id, face_image.public_id)
+        self.assertEqual(FaceImage.objects.filter(content_hash=face_image.content_hash).count(), 1)
+
+    def test_face_image_detection_cached(self):
+        face_image = FaceImageEncodingService(image_data=self.face_image).perform()
+
+        self.assertEqual(len(face_image.face_locations), 1)
+        self.assertEqual(len(face_image.face_locations[0]), 4)
+        self.assertEqual(len(face_image.face_landmarks["small"]), 5)
+
+    def test_reencode_starts_from_cached_detection(self):
+        face_image = FaceImageEncodingService(image_data=self.face_image).perform()
+        pipeline = FaceEncodingPipeline(num_jitters=2, landmark_model="large")
+
+        with patch.object(FaceEncodingPipeline, "detect") as detect:
+            face_image = FaceImageReEncodingService(face_image, pipeline=pipeline).perform()
+
+        detect.assert_not_called()
+        face_image.refresh_from_db()
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(len(face_image.face_landmarks["large"]), 68)
+        self.assertEqual(len(face_image.face_landmarks["small"]), 5)
+
+    def test_reencode_with_cached_landmarks_matches_encoding(self):
+        face_image = FaceImageEncodingService(image_data=self.face_image).perform()
+        encoded_face = bytes(face_image.face_encoding)
+
+        with patch.object(FaceEncodingPipeline, "extract_landmarks") as extract_landmarks:
+            face_image = FaceImageReEncodingService(face_image).perform()
+
+        extract_landmarks.assert_not_called()
+        self.assertEqual(bytes(face_image.face_encoding), encoded_face)
+
     def test_failed_image_encoding(self):
         service = FaceImageEncodingService(image_data=self.fake_image)
         face_image = service.perform()
@@ -76,6 +164,429 @@ class FaceImageEncodingServiceTests(TestCase):
         self.assertEqual(face_image.image_url, service.image_path)
         self.assertEqual(face_image.face_encoding, b"")
         self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_FAILED)
+        self.assertEqual(face_image.failure_reason, FaceImage.FAILURE_LOW_CONTRAST)
+
+    def test_pre_screening_rejects_before_detection(self):
+        with patch.object(FaceEncodingPipeline, "detect") as detect, patch.object(
+            FaceImageEncodingService, "_store_image"
+        ) as store_image:
+            face_image = FaceImageEncodingService(image_data=self.fake_image).perform()
+
+        detect.assert_not_called()
+        store_image.assert_not_called()
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_FAILED)
+        self.assertEqual(face_image.image_url, "")
+        self.assertEqual(face_image.image_storage, FaceImage.STORAGE_NONE)
+        self.assertIsNone(face_image.face_locations)
+        self.assertIsNotNone(face_image.encoding_duration_ms)
+
+    @override_settings(FACE_PRESCREEN_ENABLED=False)
+    def test_failed_image_encoding_without_pre_screening(self):
+        face_image = FaceImageEncodingService(image_data=self.fake_image).perform()
+
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_FAILED)
+        self.assertEqual(face_image.failure_reason, FaceImage.FAILURE_NO_FACE)
+        self.assertEqual(face_image.face_locations, [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), FACE_IMAGE_STORAGE_POLICY="crop", FACE_CROP_MAX_DIMENSION=96)
+class FaceImageStoragePolicyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        image_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_image.jpg")
+        with open(image_file_path, "rb") as image_file:
+            cls.image_content = image_file.read()
+        cls.cold_storage_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(cls.cold_storage_dir, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def get_uploaded_image(self, content: bytes | None = None) -> SimpleUploadedFile:
+        return SimpleUploadedFile("test_image.jpg", content or self.image_content, content_type="image/jpg")
+
+    def get_stored_files(self) -> list[str]:
+        return [name for _, _, names in os.walk(settings.MEDIA_ROOT) for name in names]
+
+    def test_face_crop_stored_instead_of_original(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(face_image.image_storage, FaceImage.STORAGE_CROP)
+        with open(face_image.image_url, "rb") as crop_file:
+            crop_hash = hashlib.sha256(crop_file.read()).hexdigest()
+        self.assertTrue(face_image.image_url.endswith(f"{crop_hash}-face.jpg"))
+        self.assertEqual(self.get_stored_files(), [os.path.basename(face_image.image_url)])
+        with Image.open(face_image.image_url) as crop:
+            self.assertLessEqual(max(crop.size), 96)
+
+    def test_face_crops_named_by_their_content(self):
+        face_images = [
+            FaceImageEncodingService(image_data=self.get_uploaded_image(), tier=tier).perform()
+            for tier in ("fast", "accurate")
+        ]
+
+        for face_image in face_images:
+            with open(face_image.image_url, "rb") as crop_file:
+                crop_hash = hashlib.sha256(crop_file.read()).hexdigest()
+            self.assertEqual(os.path.basename(face_image.image_url), f"{crop_hash}-face.jpg")
+
+    def test_face_geometry_moved_into_crop(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+
+        with Image.open(face_image.image_url) as crop:
+            width, height = crop.size
+        top, right, bottom, left = face_image.face_locations[0]
+        self.assertTrue(0 <= left < right <= width and 0 <= top < bottom <= height)
+        for x, y in face_image.face_landmarks["small"]:
+            self.assertTrue(left <= x <= right and top <= y <= bottom)
+
+    def test_reencode_from_face_crop(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+        encoded_face = np.frombuffer(bytes(face_image.face_encoding))
+
+        with patch.object(FaceEncodingPipeline, "detect") as detect:
+            face_image = FaceImageReEncodingService(face_image).perform()
+
+        detect.assert_not_called()
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertLess(np.linalg.norm(np.frombuffer(bytes(face_image.face_encoding)) - encoded_face), 0.3)
+
+    def test_failed_image_stores_nothing(self):
+        blank_image_io = io.BytesIO()
+        Image.new("RGB", (100, 100), color="red").save(blank_image_io, format="jpeg")
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image(blank_image_io.getvalue())).perform()
+
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_FAILED)
+        self.assertEqual(face_image.image_storage, FaceImage.STORAGE_NONE)
+        self.assertEqual(face_image.image_url, "")
+        self.assertEqual(self.get_stored_files(), [])
+
+    @override_settings(FACE_IMAGE_STORAGE_POLICY="none")
+    def test_no_image_stored(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+
+        self.assertEqual(face_image.encoding_status, FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(face_image.image_storage, FaceImage.STORAGE_NONE)
+        self.assertEqual(self.get_stored_files(), [])
+        with self.assertRaisesMessage(ValidationError, "has no stored image to re-encode from"):
+            FaceImageReEncodingService(face_image).perform()
+
+    def test_original_kept_in_cold_storage(self):
+        with override_settings(
+            FACE_IMAGE_COLD_STORAGE="common.storage.AtomicFileSystemStorage",
+            FACE_IMAGE_COLD_STORAGE_OPTIONS={"location": self.cold_storage_dir},
+        ):
+            face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+
+        image_name = FaceImageEncodingService.get_image_name(face_image.content_hash, "test_image.jpg")
+        with open(os.path.join(self.cold_storage_dir, image_name), "rb") as original:
+            self.assertEqual(original.read(), self.image_content)
+        self.assertEqual(face_image.image_storage, FaceImage.STORAGE_CROP)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), FACE_NEAR_DUPLICATE_ENABLED=True)
+class FaceImageNearDuplicateTests(TestCase):
+    @classmethod
+    def get_uploaded_image(cls, quality: int | None = None) -> SimpleUploadedFile:
+        image_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_image.jpg")
+        with open(image_file_path, "rb") as image_file:
+            content = image_file.read()
+        if quality is not None:
+            # Re-compressed copy of the same shot, a different file with the same face
+            image_io = io.BytesIO()
+            Image.open(io.BytesIO(content)).save(image_io, format="jpeg", quality=quality)
+            content = image_io.getvalue()
+        return SimpleUploadedFile("test_image.jpg", content, content_type="image/jpg")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gallery = Gallery.objects.create(name="tenant")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        Gallery.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        FaceImageNearDuplicateIndex.clear()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_recompressed_image_reuses_face_image(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+        duplicate_service = FaceImageEncodingService(image_data=self.get_uploaded_image(quality=40))
+        duplicate_face_image = duplicate_service.perform()
+
+        self.assertNotEqual(duplicate_service.content_hash, face_image.content_hash)
+        self.assertEqual(duplicate_face_image.public_id, face_image.public_id)
+        self.assertEqual(FaceImage.objects.count(), 1)
+        # The near duplicate's upload was never stored
+        stored_files = [name for _, _, names in os.walk(settings.MEDIA_ROOT) for name in names]
+        self.assertEqual(stored_files, [os.path.basename(face_image.image_url)])
+        self.assertEqual(
+            FaceImageDedupStats.get_stats(),
+            {"uploads": 2, "exact_duplicates": 0, "near_duplicates": 1, "dedup_rate": 0.5},
+        )
+
+    @override_settings(FACE_NEAR_DUPLICATE_THRESHOLD=0.0)
+    def test_distant_face_is_stored(self):
+        FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+        FaceImageEncodingService(image_data=self.get_uploaded_image(quality=40)).perform()
+
+        self.assertEqual(FaceImage.objects.count(), 2)
+        self.assertEqual(FaceImageDedupStats.get_stats()["near_duplicates"], 0)
+
+    def test_near_duplicate_scoped_to_gallery_and_tier(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+        gallery_face_image = FaceImageEncodingService(
+            image_data=self.get_uploaded_image(quality=40), gallery=self.gallery
+        ).perform()
+        fast_face_image = FaceImageEncodingService(
+            image_data=self.get_uploaded_image(quality=40), tier=FaceImage.TIER_FAST
+        ).perform()
+
+        self.assertEqual(len({face_image.id, gallery_face_image.id, fast_face_image.id}), 3)
+        self.assertEqual(FaceImageDedupStats.get_stats(self.gallery)["uploads"], 1)
+
+    def test_face_stored_by_another_worker_is_found(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+        # Window loaded before another worker stores a closer face
+        FaceImageNearDuplicateIndex.find(face_image.face_encoding, FaceImage.TIER_BALANCED)
+        other_face_image = FaceImage.objects.create(
+            image_url="other.jpg",
+            face_encoding=bytes(face_image.face_encoding),
+            encoding_status=FaceImage.ENCODE_SUCCESS,
+        )
+
+        near_duplicate = FaceImageNearDuplicateIndex.find(face_image.face_encoding, FaceImage.TIER_BALANCED)
+        self.assertIn(near_duplicate.id, {face_image.id, other_face_image.id})
+        other_face_image.encoding_status = FaceImage.ENCODE_FAILED
+        other_face_image.save()
+        face_image.delete()
+        self.assertIsNone(FaceImageNearDuplicateIndex.find(face_image.face_encoding, FaceImage.TIER_BALANCED))
+
+    def test_face_of_running_transaction_found_once_finished(self):
+        face_image = FaceImageEncodingService(image_data=self.get_uploaded_image()).perform()
+
+        # Seen from another transaction, the face stored by the test transaction isn't committed yet
+        with patch.object(FaceImageChangeFeedService, "CURRENT_XID_SQL", "NULL"):
+            self.assertIsNone(FaceImageNearDuplicateIndex.find(face_image.face_encoding, FaceImage.TIER_BALANCED))
+
+        near_duplicate = FaceImageNearDuplicateIndex.find(face_image.face_encoding, FaceImage.TIER_BALANCED)
+        self.assertEqual(near_duplicate.id, face_image.id)
+
+
+class FaceEncodingWindowTests(SimpleTestCase):
+    def test_oldest_encoding_evicted(self):
+        window = FaceEncodingWindow(size=2)
+        for face_image_id in (1, 2, 3):
+            window.add(face_image_id, np.full(128, face_image_id, dtype=np.float64))
+
+        self.assertEqual(window.count, 2)
+        self.assertEqual(window.nearest(np.full(128, 1.0))[0], 2)
+        self.assertEqual(window.nearest(np.full(128, 3.0)), (3, 0.0))
+
+    def test_encoding_replaced_in_place(self):
+        window = FaceEncodingWindow(size=2)
+        window.add(1, np.zeros(128))
+        window.add(1, np.ones(128))
+
+        self.assertEqual(window.count, 1)
+        self.assertEqual(window.nearest(np.ones(128)), (1, 0.0))
+
+    def test_empty_window(self):
+        self.assertIsNone(FaceEncodingWindow(size=2).nearest(np.zeros(128)))
+
+
+class FaceImagePreScreenerTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.image_dir = tempfile.mkdtemp()
+        cls.face_image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_image.jpg")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.image_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def save_image(self, image, name="image.png"):
+        image_path = os.path.join(self.image_dir, name)
+        image.save(image_path)
+        return image_path
+
+    def test_face_image_passes(self):
+        self.assertEqual(FaceImagePreScreener().screen(self.face_image_path), "")
+
+    def test_too_small_image(self):
+        image_path = self.save_image(Image.effect_noise((200, 20), 64))
+
+        self.assertEqual(FaceImagePreScreener().screen(image_path), FaceImage.FAILURE_TOO_SMALL)
+
+    @override_settings(FACE_PRESCREEN_MAX_PIXELS=100 * 100)
+    def test_too_large_image(self):
+        self.assertEqual(FaceImagePreScreener().screen(self.face_image_path), FaceImage.FAILURE_TOO_LARGE)
+
+    def test_low_contrast_image(self):
+        image_path = self.save_image(Image.new("RGB", (100, 100), color="gray"))
+
+        self.assertEqual(FaceImagePreScreener().screen(image_path), FaceImage.FAILURE_LOW_CONTRAST)
+
+    def test_blurry_image(self):
+        with Image.open(self.face_image_path) as image:
+            image_path = self.save_image(image.filter(ImageFilter.GaussianBlur(4)))
+
+        self.assertEqual(FaceImagePreScreener().screen(image_path), FaceImage.FAILURE_BLURRY)
+
+    def test_unreadable_image(self):
+        image_path = os.path.join(self.image_dir, "truncated.jpg")
+        with open(self.face_image_path, "rb") as image_file, open(image_path, "wb") as truncated_file:
+            truncated_file.write(image_file.read(64))
+
+        self.assertEqual(FaceImagePreScreener().screen(image_path), FaceImage.FAILURE_UNREADABLE)
+
+
+class GalleryServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gallery = Gallery.objects.create(name="tenant")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        Gallery.objects.all().delete()
+
+    def create_face_image(self, encoding=None):
+        face_image = FaceImage.objects.create(
+            image_url=f"{len(self.face_encodings)}.png",
+            gallery=self.gallery,
+            face_encoding=b"" if encoding is None else encoding.tobytes(),
+            encoding_status=FaceImage.ENCODE_FAILED if encoding is None else FaceImage.ENCODE_SUCCESS,
+        )
+        self.face_encodings.append(encoding)
+        GalleryService.add_face_image(face_image)
+        return face_image
+
+    def setUp(self):
+        self.face_encodings = []
+
+    def test_add_face_image_updates_aggregates(self):
+        self.create_face_image(np.array([1.0, 2.0]))
+        self.create_face_image(np.array([3.0, 4.0]))
+        self.create_face_image()
+
+        self.gallery.refresh_from_db()
+        self.assertEqual(self.gallery.face_image_count, 3)
+        self.assertEqual(self.gallery.encoded_count, 2)
+        self.assertEqual(GalleryService.get_encoding_average(self.gallery), [2.0, 3.0])
+
+    def test_replace_encoding(self):
+        face_image = self.create_face_image(np.array([1.0, 2.0]))
+        self.create_face_image(np.array([3.0, 4.0]))
+
+        GalleryService.replace_encoding(
+            self.gallery.id, bytes(face_image.face_encoding), np.array([5.0, 6.0]).tobytes()
+        )
+
+        self.assertEqual(GalleryService.get_encoding_average(self.gallery), [4.0, 5.0])
+
+    def test_refresh_aggregates_matches_incremental_updates(self):
+        self.create_face_image(np.array([1.0, 2.0]))
+        self.create_face_image(np.array([3.0, 4.0]))
+        self.create_face_image()
+        self.gallery.refresh_from_db()
+        incremental = (self.gallery.face_image_count, self.gallery.encoded_count, bytes(self.gallery.encoding_sum))
+
+        Gallery.objects.filter(id=self.gallery.id).update(face_image_count=0, encoded_count=0, encoding_sum=b"")
+        GalleryService.refresh_aggregates([self.gallery.id])
+
+        self.gallery.refresh_from_db()
+        refreshed = (self.gallery.face_image_count, self.gallery.encoded_count, bytes(self.gallery.encoding_sum))
+        self.assertEqual(refreshed, incremental)
+
+    def test_average_with_insufficient_encodings(self):
+        self.create_face_image(np.array([1.0, 2.0]))
+
+        with pytest.raises(Exception, match="Insufficient face encodings to calculate average."):
+            GalleryService.get_encoding_average(self.gallery)
+
+
+class FaceImageStatusTimeseriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gallery = Gallery.objects.create(name="tenant")
+        cls.start = datetime(2020, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+        face_images = [
+            (cls.start, None, FaceImage.ENCODE_SUCCESS),
+            (cls.start + timedelta(seconds=30), cls.gallery, FaceImage.ENCODE_SUCCESS),
+            (cls.start + timedelta(seconds=50), None, FaceImage.ENCODE_FAILED),
+            (cls.start + timedelta(minutes=2), cls.gallery, FaceImage.ENCODE_PENDING),
+            (cls.start + timedelta(hours=1), None, FaceImage.ENCODE_SUCCESS),
+        ]
+        cls.face_images = []
+        for index, (created_at, gallery, encoding_status) in enumerate(face_images):
+            face_image = FaceImage.objects.create(
+                image_url=f"rollup{index}.png", gallery=gallery, encoding_status=encoding_status
+            )
+            # Moves the face image to its bucket in the rollups
+            FaceImage.objects.filter(id=face_image.id).update(created_at=created_at)
+            cls.face_images.append(face_image)
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        FaceImageStatusRollup.objects.all().delete()
+        Gallery.objects.all().delete()
+
+    def get_timeseries(self, granularity, end, gallery=None):
+        return FaceImageStatsService.get_status_timeseries(granularity, self.start, end, gallery=gallery)
+
+    def test_minute_timeseries_read_from_rollups(self):
+        with self.assertNumQueries(1):
+            timeseries = self.get_timeseries(
+                FaceImageStatusRollup.GRANULARITY_MINUTE, self.start + timedelta(minutes=3)
+            )
+
+        self.assertEqual(
+            [bucket["bucket"] for bucket in timeseries], [self.start + timedelta(minutes=index) for index in range(3)]
+        )
+        self.assertEqual(
+            timeseries[0],
+            {
+                "bucket": self.start,
+                "total": 3,
+                "pending": 0,
+                "success": 2,
+                "failed": 1,
+                "success_rate": 2 / 3,
+                "failure_rate": 1 / 3,
+            },
+        )
+        self.assertEqual(timeseries[1]["total"], 0)
+        self.assertEqual(timeseries[2]["pending"], 1)
+
+    def test_status_change_moves_count(self):
+        FaceImage.objects.filter(id=self.face_images[3].id).update(encoding_status=FaceImage.ENCODE_SUCCESS)
+
+        timeseries = self.get_timeseries(FaceImageStatusRollup.GRANULARITY_HOUR, self.start + timedelta(hours=2))
+
+        self.assertEqual([bucket["total"] for bucket in timeseries], [4, 1])
+        self.assertEqual([bucket["success"] for bucket in timeseries], [3, 1])
+        self.assertEqual(timeseries[0]["pending"], 0)
+
+    def test_timeseries_scoped_to_gallery(self):
+        timeseries = self.get_timeseries(
+            FaceImageStatusRollup.GRANULARITY_HOUR, self.start + timedelta(hours=2), gallery=self.gallery
+        )
+
+        self.assertEqual([bucket["total"] for bucket in timeseries], [2, 0])
 
 
 class FaceImageStatsServiceTests(TestCase):
@@ -145,6 +656,36 @@ class FaceImageStatsServiceTests(TestCase):
         # Check that the average face encoding returned in the response is equal to the expected average encoding
         self.assertListEqual(average_face_encoding, expected_average_encoding.tolist())
 
+    def test_get_encoding_statistics(self):
+        expected_encodings = np.array([self.face_encoding1, self.face_encoding3, self.face_encoding4])
+
+        with self.settings(FACE_STATS_CHUNK_SIZE=2):
+            statistics = FaceImageStatsService.get_encoding_statistics(encoding_status="SUCCESS")
+
+        self.assertEqual(statistics["count"], 3)
+        np.testing.assert_allclose(statistics["mean"], expected_encodings.mean(axis=0))
+        np.testing.assert_allclose(statistics["variance"], expected_encodings.var(axis=0))
+        np.testing.assert_allclose(statistics["min"], expected_encodings.min(axis=0))
+        np.testing.assert_allclose(statistics["max"], expected_encodings.max(axis=0))
+
+    def test_get_encoding_statistics_with_date_filter(self):
+        FaceImage.objects.filter(id=self.face_image1.id).update(created_at=timezone.now() - timedelta(days=2))
+        expected_encodings = np.array([self.face_encoding3, self.face_encoding4])
+
+        statistics = FaceImageStatsService.get_encoding_statistics(
+            encoding_status="SUCCESS", created_at__gte=timezone.now() - timedelta(days=1)
+        )
+
+        self.assertEqual(statistics["count"], 2)
+        np.testing.assert_allclose(statistics["mean"], expected_encodings.mean(axis=0))
+        np.testing.assert_allclose(statistics["variance"], expected_encodings.var(axis=0))
+
+    def test_get_encoding_statistics_no_face_encodings(self):
+        with pytest.raises(Exception, match="No face encodings found."):
+            FaceImageStatsService.get_encoding_statistics(
+                encoding_status="SUCCESS", created_at__lt=timezone.now() - timedelta(days=1)
+            )
+
     def test_calculate_average_face_encoding_insufficient_face_encodings(self):
         # Delete all face encodings except one from the database
         self.face_image3.delete()
@@ -159,3 +700,35 @@ class FaceImageStatsServiceTests(TestCase):
 
         with pytest.raises(Exception, match="No face encodings found."):
             FaceImageStatsService.get_faces_encoding_average()
+
+
+@patch.object(FaceImageStatusWatcher, "ensure_started")
+class FaceImageStatusWatcherTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pending_face_image = FaceImage.objects.create(image_url="pending.png")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+
+    @override_settings(FACE_IMAGE_WATCH_POLL_INTERVAL=10)
+    def test_notification_wakes_up_watcher(self, _):
+        public_id = str(self.pending_face_image.public_id)
+        with FaceImageStatusWatcher([public_id]) as watcher:
+            threading.Timer(0.1, FaceImageStatusWatcher._dispatch, args=[public_id]).start()
+            started_at = time.monotonic()
+            self.assertEqual(next(watcher.iter_finished(timeout=5)), [])
+            self.assertLess(time.monotonic() - started_at, 5)
+
+        self.assertNotIn(public_id, FaceImageStatusWatcher._subscribers)
+
+    @override_settings(FACE_IMAGE_WATCH_POLL_INTERVAL=0.05)
+    def test_poll_finds_finished_encoding(self, _):
+        with FaceImageStatusWatcher([self.pending_face_image.public_id]) as watcher:
+            finished = watcher.iter_finished(timeout=1)
+            self.assertEqual(next(finished), [])
+            FaceImage.objects.filter(id=self.pending_face_image.id).update(encoding_status=FaceImage.ENCODE_FAILED)
+
+            self.assertEqual([face_image.id for face_image in next(finished)], [self.pending_face_image.id])
+            self.assertEqual(watcher.pending_ids, [])
@@ -1,23 +1,44 @@
 # Standard Library
+import base64
 import io
+import json
 import os
+import shutil
+import tempfile
+import threading
 import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 
 # Django
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import override_settings
 from django.urls import reverse
 
 # Third Parties
 import numpy as np
 from PIL import Image
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.parsers import MultiPartParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework_api_key.models import APIKey
 
 # Face Embeddings
-from face_images.models import FaceImage
-
-
+from api.admission import EncodeAdmissionController
+from api.idempotency import IdempotentRequest
+from face_images.models import FaceImage, Gallery, GalleryAPIKey
+from face_images.services import (
+    FaceImageChangeFeedService,
+    FaceImageDedupStats,
+    FaceImageStatusWatcher,
+    GalleryService,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class FaceImageCreateViewTests(APITestCase):
     @classmethod
     def generate_image(cls):
@@ -37,19 +58,11 @@ class FaceImageCreateViewTests(APITestCase):
             "face_image": cls.face_image,
         }
 
-    @classmethod
-    def delete_image_file(cls):
-        media_path = settings.MEDIA_ROOT
-        for filename in os.listdir(media_path):
-            if filename.startswith("test"):
-                file_path = os.path.join(media_path, filename)
-                os.remove(file_path)
-
     @classmethod
     def tearDownClass(cls):
         FaceImage.objects.all().delete()
         APIKey.objects.all().delete()
-        cls.delete_image_file()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
 
     def test_unauthenticated_encode_face_image(self):
         message = "Authentication credentials were not provided."
@@ -66,8 +79,18 @@ class FaceImageCreateViewTests(APITestCase):
         self.assertIn("public_id", response.data)
         self.assertIn("face_encoding", response.data)
         self.assertIn("encoding_status", response.data)
+        self.assertIn("failure_reason", response.data)
         self.assertIn("created_at", response.data)
         self.assertIn("updated_at", response.data)
+        self.assertEqual(response.data["tier"], FaceImage.TIER_BALANCED)
+
+    def test_encode_face_image_with_invalid_tier(self):
+        response = self.client.post(
+            data={**self.request_data, "tier": "instant"}, path=self.url, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("is not a valid choice", str(response.data))
 
     def test_encode_face_image_with_empty_body(self):
         message = "No file was submitted."
@@ -77,6 +100,175 @@ class FaceImageCreateViewTests(APITestCase):
         self.assertIn(message, str(response.data))
 
 
+# Workers sharing one process share a local memory cache, the threads of these tests don't share the test transaction
+PROCESS_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"},
+}
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class FaceImageCreateViewIdempotencyTests(APITestCase):
+    @classmethod
+    def generate_image(cls, color="red"):
+        new_file = io.BytesIO()
+        image = Image.new("RGBA", size=(100, 100), color=color)
+        image.save(new_file, "png")
+        new_file.name = "test.png"
+        new_file.seek(0)
+        return new_file
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.url = reverse("encode-face-image")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        APIKey.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        caches[settings.IDEMPOTENCY_CACHE].clear()
+
+    def post_image(self, idempotency_key, color="red"):
+        return self.client.post(
+            data={"face_image": self.generate_image(color)},
+            path=self.url,
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+            HTTP_IDEMPOTENCY_KEY=idempotency_key,
+        )
+
+    def test_retry_replays_stored_response(self):
+        first_response = self.post_image("retry-key")
+        retry_response = self.post_image("retry-key")
+
+        self.assertEqual(retry_response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry_response.data["public_id"], first_response.data["public_id"])
+        self.assertEqual(retry_response["Idempotent-Replayed"], "true")
+        self.assertEqual(FaceImage.objects.count(), 1)
+
+    def test_reused_key_with_different_payload(self):
+        message = "Idempotency-Key was already used with a different request payload."
+        self.post_image("reused-key")
+        response = self.post_image("reused-key", color="blue")
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertIn(message, str(response.data))
+        self.assertEqual(FaceImage.objects.count(), 1)
+
+    def start_original(self, idempotency_key, finish):
+        """Run the original request holding `idempotency_key` in a thread
+        until `finish` is set, it then responds with a stored face image."""
+        request = APIRequestFactory().post(
+            self.url, {"face_image": self.generate_image()}, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+        idempotent_request = IdempotentRequest(Request(request, parsers=[MultiPartParser()]), idempotency_key)
+        started = threading.Event()
+
+        def view_func():
+            started.set()
+            finish.wait(timeout=5)
+            return Response({"public_id": "original"}, status=status.HTTP_201_CREATED)
+
+        thread = threading.Thread(target=idempotent_request.execute, args=[view_func])
+        thread.start()
+        self.assertTrue(started.wait(timeout=5))
+        return thread
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0.2, CACHES=PROCESS_CACHES)
+    def test_retry_while_original_in_flight(self):
+        message = "A request with the same Idempotency-Key is still being processed."
+        finish = threading.Event()
+        original = self.start_original("in-flight-key", finish)
+        try:
+            response = self.post_image("in-flight-key")
+        finally:
+            finish.set()
+            original.join()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn(message, str(response.data))
+        self.assertEqual(FaceImage.objects.count(), 0)
+
+    @override_settings(CACHES=PROCESS_CACHES)
+    def test_retry_waits_for_original_and_replays_its_response(self):
+        finish = threading.Event()
+        original = self.start_original("waiting-key", finish)
+        threading.Timer(0.3, finish.set).start()
+        try:
+            response = self.post_image("waiting-key")
+        finally:
+            finish.set()
+            original.join()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["public_id"], "original")
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertEqual(FaceImage.objects.count(), 0)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(), ENCODE_ADMISSION_MMAP_PATH=os.path.join(tempfile.mkdtemp(), "admission")
+)
+class FaceImageCreateViewAdmissionTests(APITestCase):
+    @classmethod
+    def generate_image(cls):
+        new_file = io.BytesIO()
+        image = Image.new("RGBA", size=(100, 100), color="red")
+        image.save(new_file, "png")
+        new_file.name = "test.png"
+        new_file.seek(0)
+        return new_file
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.url = reverse("encode-face-image")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        APIKey.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        EncodeAdmissionController.get_leases().clear()
+
+    def test_encode_admitted_and_released(self):
+        response = self.client.post(
+            data={"face_image": self.generate_image()}, path=self.url, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(EncodeAdmissionController.get_inflight_pixels(), 0)
+
+    @override_settings(ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS=15_000, ENCODE_ADMISSION_INITIAL_THROUGHPUT=2_500)
+    def test_encode_shed_when_capacity_full(self):
+        message = "Encoding capacity is full."
+        EncodeAdmissionController.get_leases().acquire(10_000, capacity=15_000, ttl=60)
+
+        response = self.client.post(
+            data={"face_image": self.generate_image()}, path=self.url, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertIn(message, str(response.data))
+        self.assertEqual(EncodeAdmissionController.get_inflight_pixels(), 10_000)
+        self.assertEqual(FaceImage.objects.count(), 0)
+
+    @override_settings(ENCODE_ADMISSION_MAX_INFLIGHT_PIXELS=15_000)
+    def test_read_endpoints_served_when_capacity_full(self):
+        EncodeAdmissionController.get_leases().acquire(15_000, capacity=15_000, ttl=60)
+
+        response = self.client.get(reverse("retrieve-stats-face-image"), HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
 class FaceImageDetailViewTests(APITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -152,6 +344,205 @@ class FaceImageStatsViewTests(APITestCase):
         self.assertEqual(status_counts.get("FAILED"), 1)
 
 
+class FaceImageBulkLookupViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.gallery = Gallery.objects.create(name="tenant")
+        cls.gallery_api_key_obj, cls.gallery_key = GalleryAPIKey.objects.create_key(
+            name="tenant_key", gallery=cls.gallery
+        )
+        cls.face_images = [
+            FaceImage.objects.create(
+                image_url=f"bulk{index}.png",
+                gallery=cls.gallery if index else None,
+                face_encoding=np.full(128, index / 10).tobytes(),
+                encoding_status=FaceImage.ENCODE_SUCCESS,
+            )
+            for index in range(3)
+        ]
+        cls.url = reverse("retrieve-bulk-encode-face-images")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        GalleryAPIKey.objects.all().delete()
+        Gallery.objects.all().delete()
+        APIKey.objects.all().delete()
+
+    def lookup(self, public_ids, key=None, **data):
+        response = self.client.post(
+            self.url,
+            {"public_ids": [str(public_id) for public_id in public_ids], **data},
+            format="json",
+            HTTP_AUTHORIZATION=f"Api-Key {key or self.key}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(b"".join(response.streaming_content))["result"]["data"]
+
+    def test_unauthenticated_bulk_lookup(self):
+        response = self.client.post(self.url, {"public_ids": [str(uuid.uuid4())]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_face_images_in_request_order_with_not_found_markers(self):
+        missing_id = uuid.uuid4()
+        public_ids = [self.face_images[2].public_id, missing_id, self.face_images[0].public_id]
+
+        with self.assertNumQueries(2):
+            results = self.lookup(public_ids)
+
+        self.assertEqual([result["public_id"] for result in results], [str(public_id) for public_id in public_ids])
+        self.assertEqual([result["found"] for result in results], [True, False, True])
+        self.assertEqual(
+            np.frombuffer(base64.b64decode(results[0]["face_encoding"])).tolist(), np.full(128, 0.2).tolist()
+        )
+        self.assertEqual(results[0]["encoding_status"], FaceImage.ENCODE_SUCCESS)
+        self.assertIsNone(results[1]["face_encoding"])
+        self.assertIsNone(results[1]["created_at"])
+
+    def test_compact_bulk_lookup(self):
+        results = self.lookup([self.face_images[1].public_id], compact=True)
+
+        self.assertEqual(set(results[0]), {"public_id", "found", "face_encoding"})
+
+    def test_bulk_lookup_scoped_to_gallery(self):
+        results = self.lookup([face_image.public_id for face_image in self.face_images], key=self.gallery_key)
+
+        self.assertEqual([result["found"] for result in results], [False, True, True])
+
+    def test_too_many_public_ids(self):
+        response = self.client.post(
+            self.url,
+            {"public_ids": [str(uuid.uuid4()) for _ in range(settings.FACE_IMAGE_BULK_MAX_IDS + 1)]},
+            format="json",
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FaceImageChangeFeedViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.gallery = Gallery.objects.create(name="tenant")
+        cls.gallery_api_key_obj, cls.gallery_key = GalleryAPIKey.objects.create_key(
+            name="tenant_key", gallery=cls.gallery
+        )
+        cls.face_images = [
+            FaceImage.objects.create(image_url=f"change{index}.png", gallery=cls.gallery if index else None)
+            for index in range(3)
+        ]
+        cls.url = reverse("retrieve-face-image-changes")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        GalleryAPIKey.objects.all().delete()
+        Gallery.objects.all().delete()
+        APIKey.objects.all().delete()
+
+    def get_changes(self, key=None, **params):
+        response = self.client.get(self.url, params, HTTP_AUTHORIZATION=f"Api-Key {key or self.key}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(b"".join(response.streaming_content))["result"]["data"]
+
+    def test_unauthenticated_retrieve_face_image_changes(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_changes_in_order_and_resumed_from_cursor(self):
+        first_changes = self.get_changes(limit=2)
+        self.assertEqual(
+            [change["public_id"] for change in first_changes],
+            [str(face_image.public_id) for face_image in self.face_images[:2]],
+        )
+
+        face_image = self.face_images[0]
+        face_image.encoding_status = FaceImage.ENCODE_SUCCESS
+        face_image.save()
+        next_changes = self.get_changes(cursor=first_changes[-1]["cursor"])
+
+        self.assertEqual(
+            [change["public_id"] for change in next_changes],
+            [str(self.face_images[2].public_id), str(face_image.public_id)],
+        )
+        self.assertEqual(next_changes[-1]["encoding_status"], FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(self.get_changes(cursor=next_changes[-1]["cursor"]), [])
+
+    def test_changes_scoped_to_gallery(self):
+        changes = self.get_changes(key=self.gallery_key)
+
+        self.assertEqual(
+            [change["public_id"] for change in changes],
+            [str(face_image.public_id) for face_image in self.face_images[1:]],
+        )
+        self.assertEqual({change["gallery"] for change in changes}, {str(self.gallery.public_id)})
+
+    @patch.object(FaceImageChangeFeedService, "CURRENT_XID_SQL", "NULL")
+    def test_changes_of_running_transactions_held_back(self):
+        # Seen from another transaction, the changes of the test transaction are still running
+        self.assertEqual(self.get_changes(), [])
+
+    @override_settings(FACE_IMAGE_CHANGES_POLL_INTERVAL=0.1)
+    def test_long_poll_times_out_without_changes(self):
+        cursor = self.get_changes()[-1]["cursor"]
+
+        self.assertEqual(self.get_changes(cursor=cursor, timeout=1), [])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "12"}, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_limit(self):
+        response = self.client.get(self.url, {"limit": 0}, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FaceImageTierStatsViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        for index, duration in enumerate([100, 200, 300, 400]):
+            FaceImage.objects.create(image_url=f"fast{index}.png", tier="fast", encoding_duration_ms=duration)
+        FaceImage.objects.create(image_url="accurate.png", tier="accurate", encoding_duration_ms=2000)
+        FaceImage.objects.create(image_url="unmeasured.png", tier="balanced")
+        cls.url = reverse("retrieve-tier-stats-face-image")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        APIKey.objects.all().delete()
+
+    def test_unauthenticated_retrieve_tier_stats_face_image(self):
+        message = "Authentication credentials were not provided."
+        response = self.client.get(path=self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn(message, str(response.data))
+
+    def test_success_retrieve_tier_stats_face_image(self):
+        response = self.client.get(self.url, {"window_minutes": 10}, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tier_stats = {entry["tier"]: entry for entry in response.data}
+        self.assertEqual(set(tier_stats), {"fast", "accurate"})
+        self.assertEqual(tier_stats["fast"]["count"], 4)
+        self.assertEqual(tier_stats["fast"]["throughput_per_minute"], 0.4)
+        self.assertEqual(tier_stats["fast"]["latency_avg_ms"], 250)
+        self.assertEqual(tier_stats["fast"]["latency_p50_ms"], 250)
+        self.assertEqual(tier_stats["accurate"]["latency_p95_ms"], 2000)
+
+    def test_retrieve_tier_stats_face_image_invalid_window(self):
+        response = self.client.get(self.url, {"window_minutes": 0}, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class FaceImageEncodingAverageViewTests(APITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -236,3 +627,372 @@ class FaceImageEncodingAverageViewTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn(message, str(response.data))
+
+
+class FaceImageEncodingStatisticsViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.url = reverse("retrieve-face-encodings-stats")
+
+        cls.face_encoding1 = np.array([0.5, -0.3, 0.7, 0.2, -0.1])
+        cls.face_encoding2 = np.array([0.8, 0.1, -0.5, 0.4, 0.9])
+        cls.face_encoding3 = np.array([-0.2, 0.6, 0.3, -0.4, 0.5])
+
+        FaceImage.objects.create(
+            image_url=os.path.join(settings.MEDIA_ROOT, "test1.png"),
+            face_encoding=cls.face_encoding1.tobytes(),
+            encoding_status="SUCCESS",
+        )
+        FaceImage.objects.create(
+            image_url=os.path.join(settings.MEDIA_ROOT, "test2.png"),
+            face_encoding=cls.face_encoding2.tobytes(),
+            encoding_status="PENDING",
+        )
+        FaceImage.objects.create(
+            image_url=os.path.join(settings.MEDIA_ROOT, "test3.png"),
+            face_encoding=cls.face_encoding3.tobytes(),
+            encoding_status="SUCCESS",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        APIKey.objects.all().delete()
+
+    def test_unauthenticated_retrieve_face_encodings_stats(self):
+        message = "Authentication credentials were not provided."
+        response = self.client.get(path=self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn(message, str(response.data))
+
+    def test_success_retrieve_face_encodings_stats(self):
+        expected_encodings = np.array([self.face_encoding1, self.face_encoding3])
+
+        response = self.client.get(path=self.url, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        np.testing.assert_allclose(response.data["mean"], expected_encodings.mean(axis=0))
+        np.testing.assert_allclose(response.data["variance"], expected_encodings.var(axis=0))
+
+    def test_retrieve_face_encodings_stats_filtered_by_status(self):
+        response = self.client.get(
+            path=self.url, data={"encoding_status": "PENDING"}, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        np.testing.assert_allclose(response.data["max"], self.face_encoding2)
+
+    def test_retrieve_face_encodings_stats_invalid_filter(self):
+        response = self.client.get(
+            path=self.url, data={"created_after": "yesterday"}, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_face_encodings_stats_no_face_encodings(self):
+        message = "No face encodings found."
+        response = self.client.get(
+            path=self.url, data={"encoding_status": "FAILED"}, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(message, str(response.data))
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    """Serve the test image & a few failing responses as a stand-in for the
+    remote image hosts."""
+
+    def do_GET(self):
+        if self.path == "/face.jpg":
+            with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_image.jpg"), "rb") as image_file:
+                body, content_type = image_file.read(), "image/jpeg"
+        elif self.path == "/page.html":
+            body, content_type = b"<html></html>", "text/html"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), REMOTE_FETCH_ALLOWED_HOSTS=["127.0.0.1"])
+class FaceImageUrlIngestionViewTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ImageRequestHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.url = reverse("encode-face-image-urls")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        FaceImage.objects.all().delete()
+        APIKey.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_unauthenticated_encode_face_image_urls(self):
+        message = "Authentication credentials were not provided."
+        response = self.client.post(data={"image_urls": [f"{self.base_url}/face.jpg"]}, path=self.url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn(message, str(response.data))
+
+    def test_success_encode_face_image_urls(self):
+        image_urls = [f"{self.base_url}/face.jpg", f"{self.base_url}/missing.jpg", f"{self.base_url}/page.html"]
+        response = self.client.post(
+            data={"image_urls": image_urls}, path=self.url, format="json", HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["image_url"] for result in response.data], image_urls)
+        encoded, missing, not_image = response.data
+        self.assertEqual(encoded["encoding_status"], FaceImage.ENCODE_SUCCESS)
+        self.assertIsNone(encoded["error"])
+        self.assertTrue(FaceImage.objects.filter(public_id=encoded["public_id"]).exists())
+        self.assertIsNone(missing["public_id"])
+        self.assertIn("404", missing["error"])
+        self.assertIn("isn't a valid image", not_image["error"])
+
+    @override_settings(REMOTE_FETCH_MAX_BYTES=1024)
+    def test_encode_face_image_urls_too_big(self):
+        response = self.client.post(
+            data={"image_urls": [f"{self.base_url}/face.jpg"]},
+            path=self.url,
+            format="json",
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("bigger than 1024 bytes", response.data[0]["error"])
+        self.assertEqual(FaceImage.objects.count(), 0)
+
+    def test_encode_face_image_urls_host_not_allowed(self):
+        response = self.client.post(
+            data={"image_urls": ["http://localhost/face.jpg"]},
+            path=self.url,
+            format="json",
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Host localhost isn't allowed.", response.data[0]["error"])
+
+    def test_encode_face_image_urls_with_empty_body(self):
+        response = self.client.post(data={}, path=self.url, format="json", HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@patch.object(FaceImageStatusWatcher, "ensure_started")
+@override_settings(FACE_IMAGE_WATCH_POLL_INTERVAL=0.05)
+class FaceImageWatchViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.url = reverse("watch-encode-face-images")
+        cls.finished_face_image = FaceImage.objects.create(
+            image_url="finished.png", face_encoding=b"encoding", encoding_status=FaceImage.ENCODE_SUCCESS
+        )
+        cls.pending_face_image = FaceImage.objects.create(image_url="pending.png")
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        APIKey.objects.all().delete()
+
+    def test_unauthenticated_watch_face_images(self, _):
+        message = "Authentication credentials were not provided."
+        response = self.client.get(self.url, {"public_ids": [self.finished_face_image.public_id]})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn(message, str(response.data))
+
+    def test_long_poll_returns_finished_face_images(self, _):
+        missing_id = str(uuid.uuid4())
+        public_ids = [self.finished_face_image.public_id, self.pending_face_image.public_id, missing_id]
+        response = self.client.get(
+            self.url, {"public_ids": public_ids, "timeout": 1}, HTTP_AUTHORIZATION=f"Api-Key {self.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["finished"]), 1)
+        self.assertEqual(response.data["finished"][0]["public_id"], str(self.finished_face_image.public_id))
+        self.assertEqual(response.data["finished"][0]["encoding_status"], FaceImage.ENCODE_SUCCESS)
+        self.assertEqual(response.data["pending_ids"], [str(self.pending_face_image.public_id)])
+        self.assertEqual(response.data["missing_ids"], [missing_id])
+
+    def test_long_poll_times_out_while_pending(self, _):
+        response = self.client.get(
+            self.url,
+            {"public_ids": [self.pending_face_image.public_id], "timeout": 0},
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["finished"], [])
+        self.assertEqual(response.data["pending_ids"], [str(self.pending_face_image.public_id)])
+
+    def test_event_stream_pushes_finished_face_images(self, _):
+        public_ids = [self.finished_face_image.public_id, self.pending_face_image.public_id]
+        response = self.client.get(
+            self.url,
+            {"public_ids": public_ids, "timeout": 0},
+            HTTP_ACCEPT="text/event-stream",
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = b"".join(response.streaming_content).decode()
+        self.assertIn(f'event: face-image\ndata: {{"public_id":"{self.finished_face_image.public_id}"', events)
+        self.assertIn(f'event: done\ndata: {{"pending_ids":["{self.pending_face_image.public_id}"]', events)
+
+    def test_event_stream_invalid_public_ids(self, _):
+        response = self.client.get(
+            self.url,
+            {"public_ids": ["invalid"]},
+            HTTP_ACCEPT="text/event-stream",
+            HTTP_AUTHORIZATION=f"Api-Key {self.key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.content.startswith(b"event: error\ndata: "))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class GalleryScopedViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_key_obj, cls.key = APIKey.objects.create_key(name="test_key")
+        cls.gallery = Gallery.objects.create(name="tenant")
+        cls.other_gallery = Gallery.objects.create(name="other-tenant")
+        cls.gallery_api_key_obj, cls.gallery_key = GalleryAPIKey.objects.create_key(
+            name="tenant_key", gallery=cls.gallery
+        )
+        cls.face_encodings = [np.full(128, 0.1), np.full(128, 0.3)]
+        cls.face_images = [
+            FaceImage.objects.create(
+                image_url=f"tenant{index}.png",
+                gallery=cls.gallery,
+                face_encoding=face_encoding.tobytes(),
+                encoding_status=FaceImage.ENCODE_SUCCESS,
+            )
+            for index, face_encoding in enumerate(cls.face_encodings)
+        ]
+        cls.other_face_image = FaceImage.objects.create(
+            image_url="other.png",
+            gallery=cls.other_gallery,
+            face_encoding=np.full(128, 0.9).tobytes(),
+            encoding_status=FaceImage.ENCODE_SUCCESS,
+        )
+        GalleryService.refresh_aggregates([cls.gallery.id, cls.other_gallery.id])
+
+    @classmethod
+    def tearDownClass(cls):
+        FaceImage.objects.all().delete()
+        GalleryAPIKey.objects.all().delete()
+        Gallery.objects.all().delete()
+        APIKey.objects.all().delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_stats_scoped_to_gallery(self):
+        response = self.client.get(
+            path=reverse("retrieve-stats-face-image"), HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([dict(entry) for entry in response.data], [{"encoding_status": "SUCCESS", "count": 2}])
+
+    def test_average_read_from_gallery_aggregates(self):
+        response = self.client.get(
+            path=reverse("retrieve-avg-face-encodings"), HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        np.testing.assert_allclose(response.data["average_face_encoding"], np.mean(self.face_encodings, axis=0))
+
+    def test_dedup_stats_scoped_to_gallery(self):
+        cache.clear()
+        FaceImageDedupStats.record(FaceImageDedupStats.UPLOADS)
+        for counter in (FaceImageDedupStats.UPLOADS, FaceImageDedupStats.UPLOADS, FaceImageDedupStats.EXACT_DUPLICATES):
+            FaceImageDedupStats.record(counter, self.gallery)
+
+        response = self.client.get(
+            path=reverse("retrieve-dedup-stats-face-image"), HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"uploads": 2, "exact_duplicates": 1, "near_duplicates": 0, "dedup_rate": 0.5})
+
+    def test_timeseries_scoped_to_gallery(self):
+        response = self.client.get(
+            path=reverse("retrieve-timeseries-face-image"),
+            data={"granularity": "hour"},
+            HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), settings.FACE_IMAGE_TIMESERIES_DEFAULT_BUCKETS + 1)
+        self.assertEqual(response.data[-1]["success"], 2)
+        self.assertEqual(sum(bucket["total"] for bucket in response.data), 2)
+
+    def test_timeseries_with_invalid_range(self):
+        response = self.client.get(
+            path=reverse("retrieve-timeseries-face-image"),
+            data={"start": "2024-01-02 00:00:00", "end": "2024-01-01 00:00:00"},
+            HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("start must be before end", str(response.data))
+
+    def test_face_image_of_other_gallery_not_found(self):
+        url = reverse("retrieve-encode-face-image", kwargs={"public_id": self.other_face_image.public_id})
+
+        response = self.client.get(path=url, HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(path=url, HTTP_AUTHORIZATION=f"Api-Key {self.key}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_encode_face_image_into_gallery(self):
+        image_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_image.jpg")
+        with open(image_file_path, "rb") as image_file:
+            response = self.client.post(
+                data={"face_image": image_file},
+                path=reverse("encode-face-image"),
+                HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        face_image = FaceImage.objects.get(public_id=response.data["public_id"])
+        self.assertEqual(face_image.gallery, self.gallery)
+        self.gallery.refresh_from_db()
+        self.assertEqual(self.gallery.face_image_count, 3)
+        self.assertEqual(self.gallery.encoded_count, 3)
+
+    def test_expired_gallery_api_key(self):
+        GalleryAPIKey.objects.filter(pk=self.gallery_api_key_obj.pk).update(expiry_date="2000-01-01T00:00:00Z")
+
+        response = self.client.get(
+            path=reverse("retrieve-stats-face-image"), HTTP_AUTHORIZATION=f"Api-Key {self.gallery_key}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -3,15 +3,31 @@ from django.urls import path
 
 # Face Embeddings
 from face_images.views import (
+    FaceImageBulkLookupView,
+    FaceImageChangeFeedView,
     FaceImageCreateView,
+    FaceImageDedupStatsView,
     FaceImageDetailView,
     FaceImageEncodingAverageView,
+    FaceImageEncodingStatisticsView,
     FaceImageStatsView,
+    FaceImageTierStatsView,
+    FaceImageTimeseriesView,
+    FaceImageUrlIngestionView,
+    FaceImageWatchView,
 )
 
 urlpatterns = [
     path("", FaceImageCreateView.as_view(), name="encode-face-image"),
+    path("from-urls/", FaceImageUrlIngestionView.as_view(), name="encode-face-image-urls"),
+    path("bulk/", FaceImageBulkLookupView.as_view(), name="retrieve-bulk-encode-face-images"),
+    path("watch/", FaceImageWatchView.as_view(), name="watch-encode-face-images"),
+    path("changes/", FaceImageChangeFeedView.as_view(), name="retrieve-face-image-changes"),
     path("stats/", FaceImageStatsView.as_view(), name="retrieve-stats-face-image"),
+    path("dedup-stats/", FaceImageDedupStatsView.as_view(), name="retrieve-dedup-stats-face-image"),
+    path("timeseries/", FaceImageTimeseriesView.as_view(), name="retrieve-timeseries-face-image"),
+    path("tier-stats/", FaceImageTierStatsView.as_view(), name="retrieve-tier-stats-face-image"),
     path("avg-encodings/", FaceImageEncodingAverageView.as_view(), name="retrieve-avg-face-encodings"),
+    path("encoding-stats/", FaceImageEncodingStatisticsView.as_view(), name="retrieve-face-encodings-stats"),
     path("<uuid:public_id>/", FaceImageDetailView.as_view(), name="retrieve-encode-face-image"),
 ]
@@ -1,20 +1,37 @@
 # Standard Library
 import logging
+from datetime import timedelta
 
 # Django
 from django.apps import apps
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 # Third Parties
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from request_logging.decorators import no_logging
 from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 # Face Embeddings
+from api.admission import EncodeAdmissionController
+from api.authenticate import get_request_gallery
+from api.idempotency import idempotent
+from api.renderers import APIRenderer, EventStreamRenderer, StreamingAPIResponse
 from common.fields import FaceEncodedField
-from face_images.services import FaceImageEncodingService, FaceImageStatsService
+from face_images.models import FaceImage, FaceImageStatusRollup
+from face_images.services import (
+    FaceImageBulkLookupService,
+    FaceImageChangeFeedService,
+    FaceImageDedupStats,
+    FaceImageEncodingService,
+    FaceImageStatsService,
+    FaceImageStatusWatcher,
+    FaceImageUrlIngestionService,
+)
 
 logger = logging.getLogger("main_logger")
 
@@ -22,11 +39,14 @@ logger = logging.getLogger("main_logger")
 class FaceImageCreateView(APIView):
     class InputSerializer(serializers.Serializer):
         face_image = serializers.ImageField()
+        tier = serializers.ChoiceField(choices=FaceImage.TIER_CHOICES, default=settings.FACE_ENCODING_DEFAULT_TIER)
 
     class OutputSerializer(serializers.Serializer):
         public_id = serializers.CharField()
         face_encoding = FaceEncodedField()
         encoding_status = serializers.CharField()
+        failure_reason = serializers.CharField()
+        tier = serializers.CharField()
         created_at = serializers.DateTimeField()
         updated_at = serializers.DateTimeField()
 
@@ -35,26 +55,77 @@ class FaceImageCreateView(APIView):
         tags=["Face Image"],
         request=InputSerializer,
         responses={201: OutputSerializer},
+        parameters=[
+            OpenApiParameter(
+                name="Idempotency-Key",
+                location=OpenApiParameter.HEADER,
+                required=False,
+                description="Unique key to safely retry the request without encoding the image again.",
+            )
+        ],
     )
     @no_logging(log_response=False)
+    @idempotent
     def post(self, request):
         """Encode Face Image & Retrieve encoded face."""
         input_serializer = self.InputSerializer(data=request.data)
         input_serializer.is_valid(raise_exception=True)
 
         face_image_data = input_serializer.validated_data["face_image"]
+        width, height = face_image_data.image.size
 
-        face_image_encoder = FaceImageEncodingService(face_image_data)
-        face_image = face_image_encoder.perform()
+        with EncodeAdmissionController(cost=width * height):
+            face_image_encoder = FaceImageEncodingService(
+                face_image_data, tier=input_serializer.validated_data["tier"], gallery=get_request_gallery(request)
+            )
+            face_image = face_image_encoder.perform()
 
         response_serializer = self.OutputSerializer(face_image)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
+class FaceImageUrlIngestionView(APIView):
+    class InputSerializer(serializers.Serializer):
+        image_urls = serializers.ListField(
+            child=serializers.URLField(), min_length=1, max_length=settings.FACE_IMAGE_URLS_MAX_COUNT
+        )
+        tier = serializers.ChoiceField(choices=FaceImage.TIER_CHOICES, default=settings.FACE_ENCODING_DEFAULT_TIER)
+
+    class OutputSerializer(serializers.Serializer):
+        image_url = serializers.CharField()
+        public_id = serializers.CharField(source="face_image.public_id", default=None)
+        face_encoding = FaceEncodedField(source="face_image.face_encoding", default=None)
+        encoding_status = serializers.CharField(source="face_image.encoding_status", default=None)
+        failure_reason = serializers.CharField(source="face_image.failure_reason", default=None)
+        error = serializers.CharField(allow_null=True)
+
+    @extend_schema(
+        operation_id="Face Image Encoding by URL",
+        tags=["Face Image"],
+        request=InputSerializer,
+        responses={200: OutputSerializer(many=True)},
+    )
+    @no_logging(log_response=False)
+    def post(self, request):
+        """Fetch Face Images from their URLs, Encode them & Retrieve encoded
+        faces, failed URLs have an error instead."""
+        input_serializer = self.InputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        results = FaceImageUrlIngestionService(
+            input_serializer.validated_data["image_urls"],
+            tier=input_serializer.validated_data["tier"],
+            gallery=get_request_gallery(request),
+        ).perform()
+        response_serializer = self.OutputSerializer(results, many=True)
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+
 class FaceImageDetailView(APIView):
     class OutputSerializer(serializers.Serializer):
         face_encoding = FaceEncodedField()
         encoding_status = serializers.CharField()
+        failure_reason = serializers.CharField()
         created_at = serializers.DateTimeField()
         updated_at = serializers.DateTimeField()
 
@@ -66,11 +137,182 @@ class FaceImageDetailView(APIView):
     @no_logging(log_response=False)
     def get(self, request, public_id):
         """Gets Face Image Details."""
-        face_image = get_object_or_404(apps.get_model("face_images.FaceImage"), public_id=public_id)
+        face_images = apps.get_model("face_images.FaceImage").objects.all()
+        if gallery := get_request_gallery(request):
+            face_images = face_images.filter(gallery=gallery)
+        face_image = get_object_or_404(face_images, public_id=public_id)
         response_serializer = self.OutputSerializer(face_image)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
 
+class FaceImageBulkLookupView(APIView):
+    class InputSerializer(serializers.Serializer):
+        public_ids = serializers.ListField(
+            child=serializers.UUIDField(), min_length=1, max_length=settings.FACE_IMAGE_BULK_MAX_IDS
+        )
+        compact = serializers.BooleanField(default=False)
+
+    class OutputSerializer(serializers.Serializer):
+        public_id = serializers.CharField()
+        found = serializers.BooleanField()
+        face_encoding = FaceEncodedField(source="face_image.face_encoding", default=None)
+        encoding_status = serializers.CharField(source="face_image.encoding_status", default=None)
+        failure_reason = serializers.CharField(source="face_image.failure_reason", default=None)
+        created_at = serializers.DateTimeField(source="face_image.created_at", default=None)
+        updated_at = serializers.DateTimeField(source="face_image.updated_at", default=None)
+
+    class CompactOutputSerializer(serializers.Serializer):
+        public_id = serializers.CharField()
+        found = serializers.BooleanField()
+        face_encoding = FaceEncodedField(source="face_image.face_encoding", default=None)
+
+    @extend_schema(
+        operation_id="Bulk Retrieve Encode Face Images",
+        tags=["Face Image"],
+        request=InputSerializer,
+        responses={200: OutputSerializer(many=True)},
+    )
+    @no_logging(log_response=False)
+    def post(self, request):
+        """Gets the Face Image Details of a batch of public_ids in request
+        order, unknown public_ids are returned with `found` false.
+
+        With `compact` only the public_id, `found` & face encoding of each
+        face image are returned.
+        """
+        input_serializer = self.InputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        results = FaceImageBulkLookupService(
+            input_serializer.validated_data["public_ids"], gallery=get_request_gallery(request)
+        ).perform()
+        output_serializer_class = (
+            self.CompactOutputSerializer if input_serializer.validated_data["compact"] else self.OutputSerializer
+        )
+        return StreamingAPIResponse(output_serializer_class(result).data for result in results)
+
+
+class FaceImageWatchView(APIView):
+    renderer_classes = [APIRenderer, EventStreamRenderer]
+
+    class InputSerializer(serializers.Serializer):
+        public_ids = serializers.ListField(
+            child=serializers.UUIDField(), min_length=1, max_length=settings.FACE_IMAGE_WATCH_MAX_IDS
+        )
+        timeout = serializers.IntegerField(min_value=0, max_value=settings.FACE_IMAGE_WATCH_MAX_TIMEOUT, default=30)
+
+    class OutputSerializer(serializers.Serializer):
+        public_id = serializers.CharField()
+        face_encoding = FaceEncodedField()
+        encoding_status = serializers.CharField()
+
+    class WatchOutputSerializer(serializers.Serializer):
+        finished = serializers.ListField()
+        pending_ids = serializers.ListField(child=serializers.CharField())
+        missing_ids = serializers.ListField(child=serializers.CharField())
+
+    def _stream_events(self, watcher: FaceImageStatusWatcher, timeout: int):
+        with watcher:
+            for face_images in watcher.iter_finished(timeout):
+                if not face_images:
+                    yield b": keep-alive\n\n"
+                for face_image in face_images:
+                    yield EventStreamRenderer.render_event("face-image", self.OutputSerializer(face_image).data)
+            yield EventStreamRenderer.render_event(
+                "done", {"pending_ids": watcher.pending_ids, "missing_ids": watcher.missing_ids}
+            )
+
+    @extend_schema(
+        operation_id="Watch Encode Face Images",
+        tags=["Face Image"],
+        parameters=[InputSerializer],
+        responses={200: WatchOutputSerializer},
+    )
+    @no_logging(log_response=False)
+    def get(self, request):
+        """Wait for the encoding of face images to finish.
+
+        With `Accept: text/event-stream` a `face-image` event is pushed for
+        each finished face image and a `done` event closes the stream.
+        Otherwise the request is long-polled, it's answered as soon as some
+        face images finished or the timeout passed.
+        """
+        input_serializer = self.InputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        public_ids, timeout = input_serializer.validated_data["public_ids"], input_serializer.validated_data["timeout"]
+
+        watcher = FaceImageStatusWatcher(public_ids, gallery=get_request_gallery(request))
+        if isinstance(request.accepted_renderer, EventStreamRenderer):
+            response = StreamingHttpResponse(self._stream_events(watcher, timeout), content_type="text/event-stream")
+            response["Cache-Control"] = "no-cache"
+            # Ask nginx-like proxies not to buffer the events
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        finished = []
+        with watcher:
+            for face_images in watcher.iter_finished(timeout):
+                if face_images:
+                    finished = face_images
+                    break
+        response_serializer = self.WatchOutputSerializer(
+            {
+                "finished": self.OutputSerializer(finished, many=True).data,
+                "pending_ids": watcher.pending_ids,
+                "missing_ids": watcher.missing_ids,
+            }
+        )
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+
+class FaceImageChangeFeedView(APIView):
+    class InputSerializer(serializers.Serializer):
+        cursor = serializers.RegexField(r"^\d+-\d+$", max_length=41, default="0-0")
+        limit = serializers.IntegerField(min_value=1, max_value=settings.FACE_IMAGE_CHANGES_MAX_LIMIT, default=100)
+        timeout = serializers.IntegerField(min_value=0, max_value=settings.FACE_IMAGE_CHANGES_MAX_TIMEOUT, default=0)
+
+    class OutputSerializer(serializers.Serializer):
+        cursor = serializers.SerializerMethodField()
+        change_seq = serializers.IntegerField()
+        public_id = serializers.CharField()
+        gallery = serializers.UUIDField(source="gallery_public_id", allow_null=True)
+        face_encoding = FaceEncodedField()
+        encoding_status = serializers.CharField()
+        failure_reason = serializers.CharField()
+        tier = serializers.CharField()
+        updated_at = serializers.DateTimeField()
+
+        def get_cursor(self, face_image) -> str:
+            return FaceImageChangeFeedService.get_cursor(face_image)
+
+    @extend_schema(
+        operation_id="Face Image Change Feed",
+        tags=["Face Image"],
+        parameters=[InputSerializer],
+        responses={200: OutputSerializer(many=True)},
+    )
+    @no_logging(log_response=False)
+    def get(self, request):
+        """Stream the face images created or updated after `cursor` in change
+        order, at most `limit` of them.
+
+        Pass the `cursor` of the last received face image as the next
+        `cursor` to resume exactly after it. With a `timeout` the request
+        waits up to `timeout` seconds for changes when there are none yet.
+        """
+        input_serializer = self.InputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        change_feed = FaceImageChangeFeedService(
+            cursor=FaceImageChangeFeedService.parse_cursor(input_serializer.validated_data["cursor"]),
+            limit=input_serializer.validated_data["limit"],
+            gallery=get_request_gallery(request),
+        )
+        if input_serializer.validated_data["timeout"]:
+            change_feed.wait_for_changes(input_serializer.validated_data["timeout"])
+        return StreamingAPIResponse(self.OutputSerializer(face_image).data for face_image in change_feed.iter_changes())
+
+
 class FaceImageStatsView(APIView):
     class OutputSerializer(serializers.Serializer):
         encoding_status = serializers.CharField()
@@ -83,11 +325,113 @@ class FaceImageStatsView(APIView):
     )
     def get(self, request):
         """Retrieve the total number of processed images with its status."""
-        status_stats = FaceImageStatsService.get_status_stats()
+        status_stats = FaceImageStatsService.get_status_stats(gallery=get_request_gallery(request))
         response_serializer = self.OutputSerializer(status_stats, many=True)
         return Response(response_serializer.data)
 
 
+class FaceImageTimeseriesView(APIView):
+    class InputSerializer(serializers.Serializer):
+        granularity = serializers.ChoiceField(
+            choices=FaceImageStatusRollup.GRANULARITY_CHOICES, default=FaceImageStatusRollup.GRANULARITY_MINUTE
+        )
+        start = serializers.DateTimeField(required=False)
+        end = serializers.DateTimeField(required=False)
+
+        def validate(self, attrs):
+            step = FaceImageStatsService.BUCKET_STEPS[attrs["granularity"]]
+            attrs.setdefault("end", timezone.now())
+            attrs.setdefault("start", attrs["end"] - step * settings.FACE_IMAGE_TIMESERIES_DEFAULT_BUCKETS)
+            if attrs["start"] >= attrs["end"]:
+                raise serializers.ValidationError("start must be before end.")
+            if attrs["end"] - attrs["start"] > step * settings.FACE_IMAGE_TIMESERIES_MAX_BUCKETS:
+                raise serializers.ValidationError(
+                    f"At most {settings.FACE_IMAGE_TIMESERIES_MAX_BUCKETS} buckets are returned at once."
+                )
+            return attrs
+
+    class OutputSerializer(serializers.Serializer):
+        bucket = serializers.DateTimeField()
+        total = serializers.IntegerField()
+        pending = serializers.IntegerField()
+        success = serializers.IntegerField()
+        failed = serializers.IntegerField()
+        success_rate = serializers.FloatField()
+        failure_rate = serializers.FloatField()
+
+    @extend_schema(
+        operation_id="Retrieve Timeseries Face Image",
+        tags=["Face Image"],
+        parameters=[InputSerializer],
+        responses={200: OutputSerializer(many=True)},
+    )
+    def get(self, request):
+        """Retrieve the number of images created per minute or hour between
+        `start` & `end` with the count & rate of each encoding status."""
+        input_serializer = self.InputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        timeseries = FaceImageStatsService.get_status_timeseries(
+            input_serializer.validated_data["granularity"],
+            input_serializer.validated_data["start"],
+            input_serializer.validated_data["end"],
+            gallery=get_request_gallery(request),
+        )
+        response_serializer = self.OutputSerializer(timeseries, many=True)
+        return Response(response_serializer.data)
+
+
+class FaceImageDedupStatsView(APIView):
+    class OutputSerializer(serializers.Serializer):
+        uploads = serializers.IntegerField()
+        exact_duplicates = serializers.IntegerField()
+        near_duplicates = serializers.IntegerField()
+        dedup_rate = serializers.FloatField()
+
+    @extend_schema(
+        operation_id="Retrieve Dedup Stats Face Image",
+        tags=["Face Image"],
+        responses={200: OutputSerializer},
+    )
+    def get(self, request):
+        """Retrieve the number of uploaded images & the ones answered with an
+        already stored face image, by content or as a near duplicate."""
+        dedup_stats = FaceImageDedupStats.get_stats(gallery=get_request_gallery(request))
+        response_serializer = self.OutputSerializer(dedup_stats)
+        return Response(response_serializer.data)
+
+
+class FaceImageTierStatsView(APIView):
+    class InputSerializer(serializers.Serializer):
+        window_minutes = serializers.IntegerField(min_value=1, max_value=7 * 24 * 60, default=60)
+
+    class OutputSerializer(serializers.Serializer):
+        tier = serializers.CharField()
+        count = serializers.IntegerField()
+        throughput_per_minute = serializers.FloatField()
+        latency_avg_ms = serializers.FloatField()
+        latency_p50_ms = serializers.FloatField()
+        latency_p95_ms = serializers.FloatField()
+        latency_p99_ms = serializers.FloatField()
+
+    @extend_schema(
+        operation_id="Retrieve Tier Stats Face Image",
+        tags=["Face Image"],
+        parameters=[InputSerializer],
+        responses={200: OutputSerializer(many=True)},
+    )
+    def get(self, request):
+        """Retrieve the encoding latency percentiles & throughput of each tier
+        over the last `window_minutes`."""
+        input_serializer = self.InputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        window = timedelta(minutes=input_serializer.validated_data["window_minutes"])
+        tier_stats = FaceImageStatsService.get_tier_stats(window, gallery=get_request_gallery(request))
+        response_serializer = self.OutputSerializer(tier_stats, many=True)
+        return Response(response_serializer.data)
+
+
 class FaceImageEncodingAverageView(APIView):
     class OutputSerializer(serializers.Serializer):
         average_face_encoding = serializers.ListField(child=serializers.FloatField())
@@ -100,6 +444,47 @@ class FaceImageEncodingAverageView(APIView):
     @no_logging(log_response=False)
     def get(self, request):
         """Retrieve the average of total success encoding images."""
-        encodings_average = FaceImageStatsService.get_faces_encoding_average()
+        encodings_average = FaceImageStatsService.get_faces_encoding_average(gallery=get_request_gallery(request))
         response_serializer = self.OutputSerializer({"average_face_encoding": encodings_average})
         return Response(response_serializer.data)
+
+
+class FaceImageEncodingStatisticsView(APIView):
+    class InputSerializer(serializers.Serializer):
+        encoding_status = serializers.ChoiceField(
+            choices=FaceImage.ENCODE_STATUS_CHOICES, default=FaceImage.ENCODE_SUCCESS
+        )
+        created_after = serializers.DateTimeField(required=False)
+        created_before = serializers.DateTimeField(required=False)
+
+    class OutputSerializer(serializers.Serializer):
+        count = serializers.IntegerField()
+        mean = serializers.ListField(child=serializers.FloatField())
+        variance = serializers.ListField(child=serializers.FloatField())
+        min = serializers.ListField(child=serializers.FloatField())
+        max = serializers.ListField(child=serializers.FloatField())
+
+    @extend_schema(
+        operation_id="Retrieve Face encodings Statistics",
+        tags=["Face Image"],
+        parameters=[InputSerializer],
+        responses={200: OutputSerializer},
+    )
+    @no_logging(log_response=False)
+    def get(self, request):
+        """Retrieve mean, variance and min/max of the face encodings matching
+        the filters."""
+        input_serializer = self.InputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        filters = {"encoding_status": input_serializer.validated_data["encoding_status"]}
+        if "created_after" in input_serializer.validated_data:
+            filters["created_at__gte"] = input_serializer.validated_data["created_after"]
+        if "created_before" in input_serializer.validated_data:
+            filters["created_at__lt"] = input_serializer.validated_data["created_before"]
+        if gallery := get_request_gallery(request):
+            filters["gallery"] = gallery
+
+        encoding_statistics = FaceImageStatsService.get_encoding_statistics(**filters)
+        response_serializer = self.OutputSerializer(encoding_statistics)
+        return Response(response_serializer.data)